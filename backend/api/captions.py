@@ -1,8 +1,9 @@
 from fastapi import APIRouter, HTTPException, Query
-from fastapi.responses import FileResponse
-from typing import Optional, Dict
+from fastapi.responses import FileResponse, StreamingResponse
+from typing import Optional, Dict, List
 from pydantic import BaseModel
 import os
+import json
 import asyncio
 
 router = APIRouter()
@@ -17,7 +18,21 @@ def set_subtitle_processor(processor):
 class TransformRequest(BaseModel):
     subtitle_path: str
     mode: str
-    batch_size: Optional[int] = 5
+    batch_size: Optional[int] = None
+    playhead: Optional[float] = None
+
+class PlayheadUpdate(BaseModel):
+    subtitle_path: str
+    position: float
+    playing: Optional[bool] = True
+
+class TimingRequest(BaseModel):
+    offset: float = 0.0
+    stretch: Optional[float] = None
+    # Shorthand for stretch: frame rate the subtitles were timed for, and that of the video
+    source_fps: Optional[float] = None
+    target_fps: Optional[float] = None
+    anchors: Optional[List[List[float]]] = None
 
 class ExportRequest(BaseModel):
     subtitle_path: str
@@ -52,11 +67,54 @@ async def transform_captions(request: TransformRequest):
         if "error" in result:
             raise HTTPException(status_code=400, detail=result["error"])
         
+        result = dict(result, subtitles=subtitle_processor.apply_timing(request.subtitle_path, result["subtitles"]))
         return {"result": result, "status": "success"}
         
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Transformation failed: {str(e)}")
 
+@router.post("/transform/stream")
+async def stream_transform_captions(request: TransformRequest):
+    """Transform subtitles, streaming each cue as newline-delimited JSON as soon as it is ready"""
+    if not subtitle_processor:
+        raise HTTPException(status_code=500, detail="Subtitle processor not initialized")
+    
+    if not os.path.exists(request.subtitle_path):
+        raise HTTPException(status_code=404, detail="Subtitle file not found")
+    
+    async def cue_stream():
+        try:
+            async for subtitle in subtitle_processor.transform_subtitles_stream(
+                request.subtitle_path,
+                request.mode,
+                request.batch_size,
+                request.playhead
+            ):
+                subtitle = subtitle_processor.apply_timing(request.subtitle_path, [subtitle])[0]
+                yield json.dumps(subtitle) + "\n"
+        except Exception as e:
+            yield json.dumps({"error": f"Transformation failed: {str(e)}"}) + "\n"
+    
+    return StreamingResponse(cue_stream(), media_type="application/x-ndjson")
+
+@router.post("/playhead")
+async def update_playhead(update: PlayheadUpdate):
+    """Report the player position so streamed transformations can meet display deadlines"""
+    if not subtitle_processor:
+        raise HTTPException(status_code=500, detail="Subtitle processor not initialized")
+    
+    subtitle_processor.update_playhead(update.subtitle_path, update.position, update.playing)
+    return {"subtitle_path": update.subtitle_path, "position": update.position, "playing": update.playing}
+
+@router.delete("/playhead/{subtitle_path:path}")
+async def clear_playhead(subtitle_path: str):
+    """Stop deadline tracking for a subtitle file"""
+    if not subtitle_processor:
+        raise HTTPException(status_code=500, detail="Subtitle processor not initialized")
+    
+    subtitle_processor.clear_playhead(subtitle_path)
+    return {"message": "Playhead cleared", "subtitle_path": subtitle_path}
+
 @router.get("/stream/{cache_key}")
 async def stream_transformed_captions(cache_key: str, format: str = Query("vtt")):
     """Stream transformed captions by cache key"""
@@ -93,6 +151,77 @@ async def stream_transformed_captions(cache_key: str, format: str = Query("vtt")
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Error streaming captions: {str(e)}")
 
+@router.get("/cues/{subtitle_path:path}")
+async def lookup_cues(subtitle_path: str, t: float = Query(..., ge=0, description="Time in seconds"),
+                      end: Optional[float] = Query(None, ge=0, description="End of a time range"),
+                      next: int = Query(3, ge=0, le=50), modes: str = Query("original")):
+    """Cues active at a time (or during a range) plus the next N, for one or more modes
+    
+    `modes` is comma separated, e.g. "original,simple", so overlays can show both side by side.
+    Transformed modes must have been generated already.
+    """
+    if not subtitle_processor:
+        raise HTTPException(status_code=500, detail="Subtitle processor not initialized")
+    
+    if not os.path.exists(subtitle_path):
+        raise HTTPException(status_code=404, detail="Subtitle file not found")
+    
+    requested = [mode.strip() for mode in modes.split(",") if mode.strip()]
+    unknown = [mode for mode in requested if mode != "original" and mode not in subtitle_processor.caption_modes]
+    if unknown:
+        raise HTTPException(status_code=400, detail=f"Unknown caption modes: {', '.join(unknown)}")
+    
+    try:
+        results = await asyncio.to_thread(subtitle_processor.lookup_cues, subtitle_path, requested, t, end, next)
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Cue lookup failed: {str(e)}")
+    
+    return {"subtitle_path": subtitle_path, "time": t, "end": end, "modes": results}
+
+@router.get("/timing/{subtitle_path:path}")
+async def get_subtitle_timing(subtitle_path: str):
+    """Timing adjustments applied to a subtitle file when it is served"""
+    if not subtitle_processor:
+        raise HTTPException(status_code=500, detail="Subtitle processor not initialized")
+    
+    timing = subtitle_processor.timing.get(subtitle_path)
+    return {"subtitle_path": subtitle_path, "timing": timing}
+
+@router.put("/timing/{subtitle_path:path}")
+async def set_subtitle_timing(subtitle_path: str, request: TimingRequest):
+    """Retime a subtitle file without editing it, so no cached transformation is invalidated
+    
+    A cue at t is shown at t * stretch + offset + drift(t); `anchors` are [time, delay]
+    pairs interpolated linearly for drift.
+    """
+    if not subtitle_processor:
+        raise HTTPException(status_code=500, detail="Subtitle processor not initialized")
+    
+    if not os.path.exists(subtitle_path):
+        raise HTTPException(status_code=404, detail="Subtitle file not found")
+    
+    stretch = request.stretch
+    if stretch is None and request.source_fps and request.target_fps:
+        stretch = request.source_fps / request.target_fps
+    
+    from subtitle_engine.timing import normalise_timing
+    try:
+        timing = normalise_timing(request.offset, stretch or 1.0, request.anchors)
+    except (ValueError, TypeError) as e:
+        raise HTTPException(status_code=400, detail=f"Invalid timing: {str(e)}")
+    
+    subtitle_processor.timing.set(subtitle_path, timing)
+    return {"subtitle_path": subtitle_path, "timing": subtitle_processor.timing.get(subtitle_path), "status": "success"}
+
+@router.delete("/timing/{subtitle_path:path}")
+async def clear_subtitle_timing(subtitle_path: str):
+    """Serve a subtitle file with its own timing again"""
+    if not subtitle_processor:
+        raise HTTPException(status_code=500, detail="Subtitle processor not initialized")
+    
+    subtitle_processor.timing.set(subtitle_path, None)
+    return {"message": "Timing cleared", "subtitle_path": subtitle_path}
+
 @router.post("/export")
 async def export_transformed_captions(request: ExportRequest):
     """Export transformed captions to file"""
@@ -133,11 +262,15 @@ async def get_subtitle_info(subtitle_path: str):
     if not subtitle_processor:
         raise HTTPException(status_code=500, detail="Subtitle processor not initialized")
     
-    if not os.path.exists(subtitle_path):
+    from .library import media_scanner
+    
+    # Library subtitles are answered from their scan-time stats
+    stats = media_scanner.get_subtitle_stats(subtitle_path) if media_scanner else None
+    if not stats and not os.path.exists(subtitle_path):
         raise HTTPException(status_code=404, detail="Subtitle file not found")
     
     try:
-        info = subtitle_processor.get_subtitle_info(subtitle_path)
+        info = subtitle_processor.get_subtitle_info(subtitle_path, stats)
         
         if "error" in info:
             raise HTTPException(status_code=400, detail=info["error"])
@@ -192,6 +325,22 @@ async def get_ollama_models():
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Error fetching models: {str(e)}")
 
+@router.get("/ollama/autotune")
+async def get_ollama_autotune():
+    """Get the tuned concurrency and cues-per-prompt for the current model"""
+    if not subtitle_processor:
+        raise HTTPException(status_code=500, detail="Subtitle processor not initialized")
+    
+    return subtitle_processor.get_tuner().get_state()
+
+@router.get("/ollama/telemetry")
+async def get_ollama_telemetry():
+    """Get per model/mode LLM throughput and the ETA of every running transformation"""
+    if not subtitle_processor:
+        raise HTTPException(status_code=500, detail="Subtitle processor not initialized")
+    
+    return subtitle_processor.telemetry.get_stats()
+
 @router.post("/ollama/set-model")
 async def set_ollama_model(model_name: str):
     """Set the current Ollama model for caption transformation"""
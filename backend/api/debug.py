@@ -0,0 +1,82 @@
+from fastapi import APIRouter, HTTPException, Header, Query
+from fastapi.responses import PlainTextResponse
+from typing import Optional
+import os
+import asyncio
+
+from monitoring.profiler import SamplingProfiler
+
+router = APIRouter()
+
+# These will be injected from main.py
+loop_watchdog = None
+loop_thread_id = None
+
+profiler = SamplingProfiler()
+
+def set_loop_watchdog(watchdog, thread_id: int):
+    global loop_watchdog, loop_thread_id
+    loop_watchdog = watchdog
+    loop_thread_id = thread_id
+
+def check_admin(token: Optional[str]):
+    """Debug endpoints exist only in debug mode or behind ADMIN_TOKEN"""
+    admin_token = os.getenv("ADMIN_TOKEN")
+    if admin_token:
+        if token != admin_token:
+            raise HTTPException(status_code=403, detail="Invalid admin token")
+    elif os.getenv("DEBUG_MODE", "").lower() not in ("1", "true", "yes"):
+        raise HTTPException(status_code=404, detail="Not found")
+
+@router.get("/blocking")
+async def get_blocking_events(x_admin_token: Optional[str] = Header(None)):
+    """Get stack traces recorded while the event loop was blocked"""
+    check_admin(x_admin_token)
+
+    if not loop_watchdog:
+        raise HTTPException(status_code=400, detail="Loop watchdog not running (set DEBUG_MODE=1)")
+
+    events = loop_watchdog.get_events()
+    return {
+        "threshold_ms": loop_watchdog.threshold * 1000,
+        "events": events,
+        "count": len(events)
+    }
+
+@router.delete("/blocking")
+async def clear_blocking_events(x_admin_token: Optional[str] = Header(None)):
+    """Clear recorded blocking events"""
+    check_admin(x_admin_token)
+
+    if loop_watchdog:
+        loop_watchdog.clear()
+    return {"message": "Blocking events cleared"}
+
+@router.get("/profile")
+async def capture_profile(
+    seconds: float = Query(10, gt=0, le=120, description="Sampling duration"),
+    mode: str = Query("wall", description="wall or cpu"),
+    loop_only: bool = Query(False, description="Sample only the event loop thread"),
+    x_admin_token: Optional[str] = Header(None)
+):
+    """Sample the live server and return folded stacks for flamegraph tools"""
+    check_admin(x_admin_token)
+
+    try:
+        # Sampling runs in a worker thread so the loop keeps serving (and shows up in the profile)
+        result = await asyncio.to_thread(
+            profiler.profile, seconds, mode, loop_thread_id if loop_only else None
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except RuntimeError as e:
+        raise HTTPException(status_code=409, detail=str(e))
+
+    return PlainTextResponse(
+        result["folded"] + "\n",
+        headers={
+            "X-Profile-Mode": result["mode"],
+            "X-Profile-Samples": str(result["samples"]),
+            "Content-Disposition": f"inline; filename=profile-{result['mode']}.folded"
+        }
+    )
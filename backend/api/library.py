@@ -1,18 +1,35 @@
 from fastapi import APIRouter, HTTPException, Query
+from fastapi.responses import FileResponse
 from typing import List, Dict, Optional
 from pathlib import Path
 import os
 import asyncio
+from search.dialogue import display_title
 
 router = APIRouter()
 
-# This will be injected from main.py
+# These will be injected from main.py
 media_scanner = None
+artwork_cache = None
+dialogue_index = None
+semantic_index = None
 
 def set_media_scanner(scanner):
     global media_scanner
     media_scanner = scanner
 
+def set_artwork_cache(cache):
+    global artwork_cache
+    artwork_cache = cache
+
+def set_dialogue_index(index):
+    global dialogue_index
+    dialogue_index = index
+
+def set_semantic_index(index):
+    global semantic_index
+    semantic_index = index
+
 @router.get("/")
 async def get_library():
     """Get the complete media library"""
@@ -48,6 +65,60 @@ async def search_library(q: str = Query(..., description="Search query")):
         "count": len(results)
     }
 
+@router.get("/dialogue/search")
+async def search_dialogue(q: str = Query(..., description="Words, \"exact phrases\" or prefix*"),
+                          limit: int = Query(20, ge=1, le=100), offset: int = Query(0, ge=0),
+                          item: Optional[str] = None):
+    """Search every subtitle line in the library; results link to the moment it is spoken"""
+    if not dialogue_index:
+        raise HTTPException(status_code=500, detail="Dialogue index not initialized")
+    
+    results = await asyncio.to_thread(dialogue_index.search, q, limit, offset, item)
+    return {
+        "query": q,
+        "results": results,
+        "count": len(results)
+    }
+
+@router.get("/dialogue/stats")
+async def dialogue_stats():
+    if not dialogue_index:
+        raise HTTPException(status_code=500, detail="Dialogue index not initialized")
+    return await asyncio.to_thread(dialogue_index.get_stats)
+
+@router.get("/semantic/search")
+async def search_scenes(q: str = Query(..., description="Describe the scene"),
+                        limit: int = Query(20, ge=1, le=100), root: Optional[str] = None):
+    """Find scenes by meaning, e.g. "they argue in the car", ranked by embedding similarity"""
+    if not semantic_index:
+        raise HTTPException(status_code=500, detail="Semantic index not initialized")
+    
+    if root is not None:
+        root = semantic_index.shard_key(root)
+        if root is None:
+            raise HTTPException(status_code=404, detail="Unknown library root")
+    
+    try:
+        results = await semantic_index.search(q, limit, root)
+    except Exception as e:
+        raise HTTPException(status_code=503, detail=f"Embedding failed: {str(e)}")
+    
+    for result in results:
+        entry = media_scanner.get_entry(result["item"]) if media_scanner else None
+        result["title"] = display_title(entry) if entry else Path(result["item"]).stem
+    
+    return {
+        "query": q,
+        "results": results,
+        "count": len(results)
+    }
+
+@router.get("/semantic/stats")
+async def semantic_stats():
+    if not semantic_index:
+        raise HTTPException(status_code=500, detail="Semantic index not initialized")
+    return semantic_index.get_stats()
+
 @router.get("/movies")
 async def get_movies():
     """Get all movies in the library"""
@@ -68,8 +139,10 @@ async def get_movies():
             "overview": movie_data.get("metadata", {}).get("overview", ""),
             "release_date": movie_data.get("metadata", {}).get("release_date", ""),
             "poster_path": movie_data.get("metadata", {}).get("poster_path", ""),
+            "artwork": movie_data.get("metadata", {}).get("artwork", {}),
             "vote_average": movie_data.get("metadata", {}).get("vote_average", 0),
             "subtitles": movie_data.get("subtitles", []),
+            "subtitle_languages": {path: stats.get("language") for path, stats in movie_data.get("subtitle_stats", {}).items()},
             "watch_progress": movie_data.get("watch_progress", 0),
             "last_watched": movie_data.get("last_watched")
         }
@@ -109,6 +182,7 @@ async def get_tv_shows():
             "episode": show_data.get("basic_info", {}).get("episode", 1),
             "title": show_data.get("basic_info", {}).get("title", ""),
             "subtitles": show_data.get("subtitles", []),
+            "subtitle_languages": {path: stats.get("language") for path, stats in show_data.get("subtitle_stats", {}).items()},
             "watch_progress": show_data.get("watch_progress", 0),
             "last_watched": show_data.get("last_watched")
         }
@@ -151,6 +225,20 @@ async def get_media_item(item_id: str):
     
     raise HTTPException(status_code=404, detail="Media item not found")
 
+@router.get("/artwork/{image_id}/{variant}.webp")
+async def get_artwork(image_id: str, variant: str):
+    """Locally cached, resized poster or backdrop"""
+    if not artwork_cache:
+        raise HTTPException(status_code=500, detail="Artwork cache not initialized")
+    
+    path = artwork_cache.variant_path(image_id, variant)
+    if not path:
+        raise HTTPException(status_code=404, detail="Artwork not found")
+    
+    # Image ids are derived from content-addressed TMDB paths, so they never change
+    return FileResponse(path, media_type="image/webp",
+                        headers={"Cache-Control": "public, max-age=31536000, immutable"})
+
 @router.post("/rescan")
 async def trigger_rescan():
     """Trigger a manual rescan of the media library"""
@@ -1,20 +1,78 @@
 from fastapi import APIRouter, HTTPException, Query
-from fastapi.responses import FileResponse, StreamingResponse
-from typing import Optional
+from fastapi.responses import FileResponse, StreamingResponse, Response
+from starlette.background import BackgroundTask
+from typing import Dict, Optional
 import os
 import asyncio
+import mimetypes
 from pathlib import Path
+from monitoring import metrics
+from streaming.probe import media_probe
+from streaming.remux import RemuxManager, RemuxBusyError, RemuxUnsupportedError
+from streaming.hls import MediaDurationUnknownError
+from media_analysis.chapters import format_container_chapters
 
 router = APIRouter()
 
+# These will be injected from main.py
+remux_manager = None
+hls_packager = None
+trickplay_generator = None
+
+def set_remux_manager(manager):
+    global remux_manager
+    remux_manager = manager
+
+def set_hls_packager(packager):
+    global hls_packager
+    hls_packager = packager
+
+def set_trickplay_generator(generator):
+    global trickplay_generator
+    trickplay_generator = generator
+
+HLS_PLAYLIST_TYPE = 'application/vnd.apple.mpegurl'
+# Versioned segment and playlist URLs may be kept forever by proxies and browsers
+IMMUTABLE_CACHE = 'public, max-age=31536000, immutable'
+
+# Background caption transforms started by HLS rendition requests, by transform cache key
+hls_pending_transforms: Dict[str, asyncio.Task] = {}
+
+async def remux_response(item_id: str, start: float):
+    """Fragmented MP4 of a non-browser container, from the remux cache or a live ffmpeg pipe"""
+    try:
+        cached_path, stream, actual_start = await remux_manager.open_stream(item_id, start)
+    except RemuxBusyError as e:
+        raise HTTPException(status_code=503, detail=str(e), headers={'Retry-After': '5'})
+    except RemuxUnsupportedError as e:
+        raise HTTPException(status_code=415, detail=str(e))
+    
+    # The output timeline starts at the keyframe; the player offsets its clock by this
+    headers = {'X-Remux-Start': str(actual_start)}
+    if cached_path:
+        metrics.stream_bytes.inc(cached_path.stat().st_size, route='/api/player/remux')
+        return FileResponse(cached_path, media_type='video/mp4', headers=headers)
+    # The background task frees the remux slot even if the client leaves before the first chunk
+    return StreamingResponse(stream.chunks(), media_type='video/mp4', headers=headers,
+                             background=BackgroundTask(stream.aclose))
+
 @router.get("/stream/{item_id:path}")
-async def stream_media(item_id: str, range: Optional[str] = None):
-    """Stream media file with range support for video playback"""
+async def stream_media(item_id: str, range: Optional[str] = None, start: float = Query(0, ge=0),
+                       raw: bool = False):
+    """Stream media file with range support for video playback
+    
+    mkv/avi/wmv/flv are remuxed to fragmented MP4 unless `raw` is set; seek those
+    with `start` (seconds) instead of byte ranges.
+    """
     
     # Verify file exists and is accessible
     if not os.path.exists(item_id):
         raise HTTPException(status_code=404, detail="Media file not found")
     
+    if remux_manager and not raw and remux_manager.needs_remux(item_id):
+        return await remux_response(item_id, start)
+    
+    media_type = mimetypes.guess_type(item_id)[0] or 'video/mp4'
     file_size = os.path.getsize(item_id)
     
     # Handle range requests for video streaming
@@ -32,22 +90,27 @@ async def stream_media(item_id: str, range: Optional[str] = None):
             
             def iter_file(file_path: str, start: int, end: int, chunk_size: int = 8192):
                 """Generator to stream file in chunks"""
-                with open(file_path, 'rb') as f:
-                    f.seek(start)
-                    remaining = end - start + 1
-                    while remaining:
-                        chunk_size = min(chunk_size, remaining)
-                        chunk = f.read(chunk_size)
-                        if not chunk:
-                            break
-                        remaining -= len(chunk)
-                        yield chunk
+                metrics.active_streams.inc()
+                try:
+                    with open(file_path, 'rb') as f:
+                        f.seek(start)
+                        remaining = end - start + 1
+                        while remaining:
+                            chunk_size = min(chunk_size, remaining)
+                            chunk = f.read(chunk_size)
+                            if not chunk:
+                                break
+                            remaining -= len(chunk)
+                            metrics.stream_bytes.inc(len(chunk), route='/api/player/stream')
+                            yield chunk
+                finally:
+                    metrics.active_streams.dec()
             
             headers = {
                 'Content-Range': f'bytes {start}-{end}/{file_size}',
                 'Accept-Ranges': 'bytes',
                 'Content-Length': str(content_length),
-                'Content-Type': 'video/mp4'
+                'Content-Type': media_type
             }
             
             return StreamingResponse(
@@ -61,12 +124,206 @@ async def stream_media(item_id: str, range: Optional[str] = None):
             pass
     
     # Return full file
+    metrics.stream_bytes.inc(file_size, route='/api/player/stream')
     return FileResponse(
         item_id,
-        media_type='video/mp4',
+        media_type=media_type,
         headers={'Accept-Ranges': 'bytes'}
     )
 
+@router.get("/remux/stats")
+async def get_remux_stats():
+    """Running remux processes and segment cache usage"""
+    if not remux_manager:
+        raise HTTPException(status_code=500, detail="Remux manager not initialized")
+    return remux_manager.get_stats()
+
+def get_hls_packager():
+    if not hls_packager:
+        raise HTTPException(status_code=500, detail="HLS packager not initialized")
+    return hls_packager
+
+async def get_hls_index(item_id: str) -> Dict:
+    """Segment index of an item; 503 while its duration cannot be probed"""
+    try:
+        return await get_hls_packager().get_index(item_id)
+    except MediaDurationUnknownError as e:
+        raise HTTPException(status_code=503, detail=str(e), headers={'Retry-After': '30', 'Cache-Control': 'no-store'})
+
+def hls_subtitle_tracks(item_id: str) -> list:
+    """Subtitle files of an item that can be served as WebVTT renditions"""
+    from .library import media_scanner
+    
+    subtitles = None
+    if media_scanner:
+        entry = media_scanner.get_entry(item_id)
+        subtitles = entry.get("subtitles", []) if entry else media_scanner.find_subtitles(item_id)
+    return [path for path in subtitles or [] if Path(path).suffix.lower() in ('.srt', '.vtt')]
+
+@router.get("/hls/{item_id:path}/master.m3u8")
+async def hls_master_playlist(item_id: str):
+    """Master playlist: the video variant plus every caption mode as a WebVTT rendition"""
+    from .captions import subtitle_processor
+    
+    if not os.path.exists(item_id):
+        raise HTTPException(status_code=404, detail="Media file not found")
+    index = await get_hls_index(item_id)
+    info = await media_probe.probe(item_id) or {}
+    bandwidth = int(info.get('format', {}).get('bit_rate') or 8_000_000)
+    
+    lines = ['#EXTM3U', '#EXT-X-VERSION:3']
+    tracks = hls_subtitle_tracks(item_id)
+    modes = subtitle_processor.get_available_modes() if subtitle_processor else {'original': {'name': 'Original'}}
+    for track, subtitle_path in enumerate(tracks):
+        for mode, mode_info in modes.items():
+            name = f"{Path(subtitle_path).name} - {mode_info.get('name', mode)}"
+            default = 'YES' if track == 0 and mode == 'original' else 'NO'
+            lines.append(f'#EXT-X-MEDIA:TYPE=SUBTITLES,GROUP-ID="subs",NAME="{name}",DEFAULT={default},'
+                         f'AUTOSELECT={default},URI="subs/{track}/{mode}.m3u8?v={index["file_key"][:8]}"')
+    
+    subtitles = ',SUBTITLES="subs"' if tracks else ''
+    lines.append(f'#EXT-X-STREAM-INF:BANDWIDTH={bandwidth}{subtitles}')
+    lines.append(f'index.m3u8?v={index["file_key"][:8]}')
+    return Response('\n'.join(lines) + '\n', media_type=HLS_PLAYLIST_TYPE,
+                    headers={'Cache-Control': 'public, max-age=300'})
+
+def hls_cache_control(version: Optional[str]) -> str:
+    """Only URLs carrying the file version are safe to cache forever"""
+    return IMMUTABLE_CACHE if version else 'public, max-age=300'
+
+@router.get("/hls/{item_id:path}/index.m3u8")
+async def hls_media_playlist(item_id: str, v: Optional[str] = None):
+    """VOD playlist with segments cut at keyframes"""
+    if not os.path.exists(item_id):
+        raise HTTPException(status_code=404, detail="Media file not found")
+    index = await get_hls_index(item_id)
+    playlist = await get_hls_packager().playlist(item_id)
+    # Version segment URLs so a replaced file never serves stale cached segments
+    playlist = playlist.replace('.ts\n', f'.ts?v={index["file_key"][:8]}\n')
+    return Response(playlist, media_type=HLS_PLAYLIST_TYPE, headers={'Cache-Control': hls_cache_control(v)})
+
+@router.get("/hls/{item_id:path}/segment_{number:int}.ts")
+async def hls_segment(item_id: str, number: int, v: Optional[str] = None):
+    """One MPEG-TS segment, remuxed on first request and served from the segment cache after"""
+    if not os.path.exists(item_id):
+        raise HTTPException(status_code=404, detail="Media file not found")
+    packager = get_hls_packager()
+    
+    try:
+        segment_path = await packager.get_segment(item_id, number)
+    except IndexError as e:
+        raise HTTPException(status_code=404, detail=str(e))
+    except RemuxBusyError as e:
+        raise HTTPException(status_code=503, detail=str(e), headers={'Retry-After': '2'})
+    except RemuxUnsupportedError as e:
+        raise HTTPException(status_code=415, detail=str(e))
+    except MediaDurationUnknownError as e:
+        raise HTTPException(status_code=503, detail=str(e), headers={'Retry-After': '30', 'Cache-Control': 'no-store'})
+    except RuntimeError as e:
+        raise HTTPException(status_code=500, detail=str(e))
+    
+    metrics.stream_bytes.inc(segment_path.stat().st_size, route='/api/player/hls')
+    return FileResponse(segment_path, media_type='video/mp2t', headers={'Cache-Control': hls_cache_control(v)})
+
+@router.get("/hls/{item_id:path}/subs/{track:int}/{mode}.m3u8")
+async def hls_subtitle_playlist(item_id: str, track: int, mode: str):
+    """Single-segment WebVTT rendition playlist"""
+    tracks = hls_subtitle_tracks(item_id)
+    if not 0 <= track < len(tracks):
+        raise HTTPException(status_code=404, detail="Subtitle track not found")
+    index = await get_hls_index(item_id)
+    
+    duration = max(index['duration'], 1)
+    lines = [
+        '#EXTM3U',
+        '#EXT-X-VERSION:3',
+        f'#EXT-X-TARGETDURATION:{int(duration) + 1}',
+        '#EXT-X-MEDIA-SEQUENCE:0',
+        '#EXT-X-PLAYLIST-TYPE:VOD',
+        f'#EXTINF:{duration:.3f},',
+        f'{mode}.vtt',
+        '#EXT-X-ENDLIST'
+    ]
+    return Response('\n'.join(lines) + '\n', media_type=HLS_PLAYLIST_TYPE,
+                    headers={'Cache-Control': 'public, max-age=300'})
+
+@router.get("/hls/{item_id:path}/subs/{track:int}/{mode}.vtt")
+async def hls_subtitle_rendition(item_id: str, track: int, mode: str):
+    """Original or transformed captions as WebVTT aligned to the segment timeline"""
+    from .captions import subtitle_processor
+    
+    if not subtitle_processor:
+        raise HTTPException(status_code=500, detail="Subtitle processor not initialized")
+    tracks = hls_subtitle_tracks(item_id)
+    if not 0 <= track < len(tracks):
+        raise HTTPException(status_code=404, detail="Subtitle track not found")
+    if mode not in subtitle_processor.get_available_modes():
+        raise HTTPException(status_code=404, detail=f"Unknown caption mode: {mode}")
+    
+    subtitle_path = tracks[track]
+    if mode == 'original':
+        subtitles = subtitle_processor.parse_subtitle_file(subtitle_path)
+    else:
+        # Only served from the transform cache; a cold cache starts the transform in the background
+        cache_key = subtitle_processor._get_cache_key(subtitle_path, mode)
+        cached_result = subtitle_processor._load_cached_result(subtitle_processor._get_cache_path(cache_key))
+        if not cached_result:
+            if cache_key not in hls_pending_transforms:
+                task = asyncio.create_task(subtitle_processor.transform_subtitles(subtitle_path, mode))
+                hls_pending_transforms[cache_key] = task
+                task.add_done_callback(lambda _: hls_pending_transforms.pop(cache_key, None))
+            raise HTTPException(status_code=404, detail="Captions are being transformed",
+                                headers={'Retry-After': '30', 'Cache-Control': 'no-store'})
+        subtitles = cached_result['subtitles']
+    
+    # Segments keep source timestamps (offset 0), so cue times map 1:1 to MPEG-TS time
+    subtitles = subtitle_processor.apply_timing(subtitle_path, subtitles)
+    vtt = subtitle_processor.format_vtt(subtitles, header=['X-TIMESTAMP-MAP=MPEGTS:0,LOCAL:00:00:00.000'])
+    return Response(vtt, media_type='text/vtt', headers={'Cache-Control': 'public, max-age=300'})
+
+@router.get("/hls/stats")
+async def get_hls_stats():
+    """HLS index and segment cache usage"""
+    return get_hls_packager().get_stats()
+
+def trickplay_dir(item_id: str) -> Path:
+    """Sprite directory of an item, queueing generation if it has none yet"""
+    from .library import media_scanner
+    
+    if not trickplay_generator or not media_scanner:
+        raise HTTPException(status_code=500, detail="Trickplay generator not initialized")
+    if not os.path.exists(item_id):
+        raise HTTPException(status_code=404, detail="Media file not found")
+    
+    file_hash = media_scanner.get_file_hash(item_id)
+    if not trickplay_generator.get_manifest(file_hash):
+        trickplay_generator.enqueue(item_id, file_hash)
+        raise HTTPException(status_code=404, detail="Thumbnails are being generated", headers={'Retry-After': '60'})
+    return trickplay_generator.output_dir_for(file_hash)
+
+@router.get("/trickplay/{item_id:path}/thumbnails.vtt")
+async def get_trickplay_track(item_id: str):
+    """WebVTT thumbnails track whose cues point into the sprite sheets"""
+    # Sprites live in a file_hash directory, so a changed file gets a fresh one
+    return FileResponse(trickplay_dir(item_id) / 'thumbnails.vtt', media_type='text/vtt',
+                        headers={'Cache-Control': 'public, max-age=3600'})
+
+@router.get("/trickplay/{item_id:path}/sprite_{number:int}.{extension}")
+async def get_trickplay_sprite(item_id: str, number: int, extension: str):
+    """One sprite sheet of seek previews"""
+    sprite_path = trickplay_dir(item_id) / f"sprite_{number}.{extension}"
+    if extension not in ('jpg', 'webp') or not sprite_path.exists():
+        raise HTTPException(status_code=404, detail="Sprite not found")
+    return FileResponse(sprite_path, media_type='image/webp' if extension == 'webp' else 'image/jpeg',
+                        headers={'Cache-Control': 'public, max-age=3600'})
+
+@router.get("/analysis/status")
+async def get_analysis_status():
+    """Background analysis queue: queued, running and finished jobs"""
+    if not trickplay_generator:
+        raise HTTPException(status_code=500, detail="Analysis pool not initialized")
+    return trickplay_generator.pool.get_stats()
+
 @router.get("/info/{item_id:path}")
 async def get_media_info(item_id: str):
     """Get technical information about a media file"""
@@ -127,70 +384,134 @@ async def get_media_info(item_id: str):
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Error analyzing media: {str(e)}")
 
+def library_entry(item_id: str) -> Optional[dict]:
+    from .library import media_scanner
+    
+    if not media_scanner:
+        raise HTTPException(status_code=500, detail="Media scanner not initialized")
+    
+    return media_scanner.get_entry(item_id)
+
+def current_marker(entry: Optional[dict], name: str) -> Optional[dict]:
+    """A stored marker, unless the file changed since it was computed"""
+    marker = (entry or {}).get("markers", {}).get(name)
+    if marker and marker.get("file_hash") == entry.get("file_hash"):
+        return marker
+    return None
+
+def marker_status(entry: Optional[dict]) -> str:
+    if not entry:
+        return "not_applicable"
+    return "ready" if entry.get("markers", {}).get("analyzed_hash") == entry.get("file_hash") else "pending"
+
 @router.post("/skip-intro/{item_id:path}")
 async def skip_intro(item_id: str):
-    """Get intro skip information for a media file"""
+    """Get intro skip information for a media file
+    
+    Answers from markers stored on the library entry by the background season
+    analysis; nothing is decoded on request.
+    """
+    entry = library_entry(item_id)
+    if not entry or entry.get("content_type") != "tv_show":
+        return {"has_intro": False, "status": "not_applicable"}
+    
+    intro = current_marker(entry, "intro")
+    if not intro:
+        return {"has_intro": False, "status": "pending"}
+    if intro.get("status") == "unavailable":
+        return {"has_intro": False, "status": "unavailable"}
     
-    # This is a placeholder for intro detection logic
-    # In a real implementation, you'd use ML models or crowd-sourced data
+    has_intro = intro["start"] is not None
+    return {
+        "has_intro": has_intro,
+        "intro_start": intro["start"],
+        "intro_end": intro["end"],
+        "confidence": intro["confidence"],
+        "skip_message": "Skip intro" if has_intro else None,
+        "status": "ready"
+    }
+
+@router.post("/skip-credits/{item_id:path}")
+async def skip_credits(item_id: str):
+    """End-credits position and the episode to continue with"""
+    entry = library_entry(item_id)
+    credits = current_marker(entry, "credits")
+    if not credits:
+        return {"has_credits": False, "status": marker_status(entry)}
+    
+    next_episode = entry.get("markers", {}).get("next_episode")
+    return {
+        "has_credits": True,
+        "credits_start": credits["start"],
+        "credits_end": credits["end"],
+        "confidence": credits["confidence"],
+        "next_episode": next_episode,
+        "skip_message": "Next episode" if next_episode else "Skip credits",
+        "status": "ready"
+    }
+
+@router.post("/skip-recap/{item_id:path}")
+async def skip_recap(item_id: str):
+    """"Previously on" recap span at the start of an episode"""
+    entry = library_entry(item_id)
+    recap = current_marker(entry, "recap")
+    if not recap:
+        return {"has_recap": False, "status": marker_status(entry)}
     
     return {
-        "has_intro": True,
-        "intro_start": 0,
-        "intro_end": 90,  # 90 seconds
-        "confidence": 0.85,
-        "skip_message": "Skip intro"
+        "has_recap": True,
+        "recap_start": recap["start"],
+        "recap_end": recap["end"],
+        "confidence": recap["confidence"],
+        "skip_message": "Skip recap",
+        "status": "ready"
+    }
+
+@router.get("/markers/{item_id:path}")
+async def get_markers(item_id: str):
+    """All skip markers of an item in one call"""
+    entry = library_entry(item_id)
+    return {
+        "intro": current_marker(entry, "intro"),
+        "recap": current_marker(entry, "recap"),
+        "credits": current_marker(entry, "credits"),
+        "next_episode": (entry or {}).get("markers", {}).get("next_episode"),
+        "status": marker_status(entry)
     }
 
 @router.post("/chapters/{item_id:path}")
 async def get_chapters(item_id: str):
-    """Get chapter information for a media file"""
+    """Get chapter information for a media file
+    
+    Library items answer from chapters computed in the background (container
+    chapters, or automatic ones for files without them).
+    """
+    entry = library_entry(item_id)
+    if entry:
+        chapters = entry.get("chapters")
+        if not chapters or chapters.get("file_hash") != entry.get("file_hash"):
+            return {"chapters": [], "count": 0, "status": "pending"}
+        return {
+            "chapters": chapters["chapters"],
+            "count": len(chapters["chapters"]),
+            "source": chapters["source"],
+            "status": "ready"
+        }
     
     if not os.path.exists(item_id):
         raise HTTPException(status_code=404, detail="Media file not found")
     
-    try:
-        import subprocess
-        import json
-        
-        # Use ffprobe to get chapter information
-        cmd = [
-            'ffprobe', '-v', 'quiet', '-print_format', 'json',
-            '-show_chapters', item_id
-        ]
-        
-        result = subprocess.run(cmd, capture_output=True, text=True)
-        
-        if result.returncode == 0:
-            chapter_info = json.loads(result.stdout)
-            chapters = chapter_info.get('chapters', [])
-            
-            formatted_chapters = []
-            for i, chapter in enumerate(chapters):
-                formatted_chapters.append({
-                    "id": i,
-                    "title": chapter.get('tags', {}).get('title', f"Chapter {i+1}"),
-                    "start_time": float(chapter.get('start_time', 0)),
-                    "end_time": float(chapter.get('end_time', 0))
-                })
-            
-            return {
-                "chapters": formatted_chapters,
-                "count": len(formatted_chapters)
-            }
-        else:
-            # No chapters found or error
-            return {
-                "chapters": [],
-                "count": 0
-            }
-            
-    except Exception as e:
-        return {
-            "chapters": [],
-            "count": 0,
-            "error": str(e)
-        }
+    # Files outside the library only have their container chapters
+    info = await media_probe.probe(item_id)
+    if info is None:
+        return {"chapters": [], "count": 0, "error": "Could not read chapters", "status": "unavailable"}
+    formatted_chapters = format_container_chapters(info.get("chapters", []))
+    return {
+        "chapters": formatted_chapters,
+        "count": len(formatted_chapters),
+        "source": "container",
+        "status": "ready"
+    }
 
 @router.post("/resume/{item_id:path}")
 async def get_resume_position(item_id: str):
@@ -0,0 +1,284 @@
+"""
+Fake Ollama - deterministic local stand-in for load and throughput testing
+
+Usage (from backend/):
+    python -m benchmarks.fake_ollama --port 11435 --latency 0.3 --jitter lognormal \\
+        --tokens-per-second 40 --max-concurrent 2 --error-rate 0.02
+    OLLAMA_HOST=http://localhost:11435 uvicorn main:app
+
+Implements /api/generate, /api/chat, /api/tags, /api/pull and /api/embed(dings) with
+Ollama's response shapes and timing fields. Output text is derived from a hash of the
+prompt, so identical runs give identical captions.
+"""
+
+import re
+import json
+import time
+import random
+import asyncio
+import hashlib
+import argparse
+from typing import Dict, List, Optional
+from fastapi import FastAPI, Request
+from fastapi.responses import JSONResponse, StreamingResponse
+
+FILLER = ['arr', 'matey', 'like', 'totally', 'dude', 'indeed', 'verily', 'honestly', 'basically', 'anyway']
+NUMBERED_LINE = re.compile(r'^\s*(\d+)[.):]\s*(.+)$')
+
+class FakeOllamaConfig:
+    """Latency, throughput, error and concurrency behaviour of the fake server"""
+
+    def __init__(self, models: List[str] = None, latency: float = 0.2, jitter: str = 'none',
+                 jitter_scale: float = 0.5, tokens_per_second: float = 50.0, load_duration: float = 0.0,
+                 error_rate: float = 0.0, error_status: int = 500, max_concurrent: int = 1,
+                 max_queue: int = 64, ramble: bool = False, embedding_dim: int = 384, seed: int = 42):
+        self.models = models or ['llama3.2']
+        self.latency = latency
+        self.jitter = jitter
+        self.jitter_scale = jitter_scale
+        self.tokens_per_second = tokens_per_second
+        self.load_duration = load_duration
+        self.error_rate = error_rate
+        self.error_status = error_status
+        self.max_concurrent = max_concurrent
+        self.max_queue = max_queue
+        self.ramble = ramble
+        self.embedding_dim = embedding_dim
+        self.seed = seed
+
+def create_app(config: FakeOllamaConfig) -> FastAPI:
+    app = FastAPI(title="Fake Ollama")
+    rng = random.Random(config.seed)
+    slots = asyncio.Semaphore(config.max_concurrent)
+    stats = {'requests': 0, 'errors': 0, 'rejected': 0, 'in_flight': 0, 'queued': 0,
+             'max_in_flight': 0, 'tokens': 0}
+    loaded_models = set()
+
+    def sample_latency() -> float:
+        """Prompt-processing delay before the first token"""
+        if config.jitter == 'uniform':
+            value = rng.uniform(config.latency * (1 - config.jitter_scale), config.latency * (1 + config.jitter_scale))
+        elif config.jitter == 'normal':
+            value = rng.gauss(config.latency, config.latency * config.jitter_scale)
+        elif config.jitter == 'lognormal':
+            # Long tail: median stays at `latency`
+            value = config.latency * rng.lognormvariate(0, config.jitter_scale)
+        else:
+            value = config.latency
+        return max(0.0, value)
+
+    def seeded(prompt: str) -> random.Random:
+        return random.Random(int(hashlib.md5(f"{config.seed}{prompt}".encode()).hexdigest()[:8], 16))
+
+    def completion_tokens(prompt: str, options: Dict) -> List[str]:
+        """Deterministic answer for a prompt, shaped like a caption transformation"""
+        prompt_rng = seeded(prompt)
+        limit = int(options.get('num_predict') or 128)
+        if limit < 0:
+            limit = 4096
+
+        if 'Original captions:' in prompt:
+            block = prompt.split('Original captions:')[1].split('Transformed captions:')[0]
+            lines = []
+            for line in block.splitlines():
+                match = NUMBERED_LINE.match(line)
+                if match:
+                    lines.append(f"{match.group(1)}. {prompt_rng.choice(FILLER).title()}, {match.group(2)}")
+            text = '\n'.join(lines)
+        elif 'Original caption:' in prompt:
+            original = prompt.split('Original caption:')[1].split('\n')[0].strip()
+            text = f"{prompt_rng.choice(FILLER).title()}, {original} {prompt_rng.choice(FILLER)}!"
+        else:
+            text = ' '.join(prompt_rng.choice(FILLER) for _ in range(prompt_rng.randint(5, 30)))
+
+        if config.ramble:
+            # Keep talking until num_predict, to exercise client-side early stopping
+            text += ' ' + ' '.join(prompt_rng.choice(FILLER) for _ in range(limit))
+
+        tokens = re.findall(r'\S+\s*|\s+', text)
+        tokens = tokens[:limit]
+
+        # Honour stop sequences server-side like Ollama does
+        generated = ''
+        kept = []
+        for token in tokens:
+            generated += token
+            if any(stop in generated for stop in options.get('stop') or []):
+                break
+            kept.append(token)
+        return kept
+
+    def timing_fields(prompt: str, tokens: int, prompt_seconds: float, eval_seconds: float, load: float) -> Dict:
+        return {
+            'total_duration': int((load + prompt_seconds + eval_seconds) * 1e9),
+            'load_duration': int(load * 1e9),
+            'prompt_eval_count': len(prompt.split()),
+            'prompt_eval_duration': int(prompt_seconds * 1e9),
+            'eval_count': tokens,
+            'eval_duration': int(eval_seconds * 1e9)
+        }
+
+    async def run_generation(model: str, prompt: str, options: Dict, stream: bool, wrap):
+        """Shared generate/chat implementation; `wrap` shapes each chunk for the endpoint"""
+        stats['requests'] += 1
+        if model not in config.models:
+            stats['errors'] += 1
+            return JSONResponse({'error': f"model '{model}' not found, try pulling it first"}, status_code=404)
+        if stats['queued'] >= config.max_queue:
+            stats['rejected'] += 1
+            return JSONResponse({'error': 'server busy, please try again'}, status_code=503)
+        if rng.random() < config.error_rate:
+            stats['errors'] += 1
+            return JSONResponse({'error': 'injected failure'}, status_code=config.error_status)
+
+        tokens = completion_tokens(prompt, options)
+        prompt_seconds = sample_latency()
+        per_token = 1 / config.tokens_per_second if config.tokens_per_second > 0 else 0
+        load = 0.0 if model in loaded_models else config.load_duration
+
+        async def acquire():
+            stats['queued'] += 1
+            await slots.acquire()
+            stats['queued'] -= 1
+            stats['in_flight'] += 1
+            stats['max_in_flight'] = max(stats['max_in_flight'], stats['in_flight'])
+
+        def release():
+            stats['in_flight'] -= 1
+            slots.release()
+
+        if not stream:
+            await acquire()
+            try:
+                await asyncio.sleep(load + prompt_seconds + per_token * len(tokens))
+                loaded_models.add(model)
+            finally:
+                release()
+            stats['tokens'] += len(tokens)
+            body = wrap(model, ''.join(tokens), True)
+            body.update({'done_reason': 'stop'}, **timing_fields(prompt, len(tokens), prompt_seconds,
+                                                                   per_token * len(tokens), load))
+            return JSONResponse(body)
+
+        async def chunks():
+            await acquire()
+            sent = 0
+            try:
+                await asyncio.sleep(load + prompt_seconds)
+                loaded_models.add(model)
+                for token in tokens:
+                    await asyncio.sleep(per_token)
+                    sent += 1
+                    yield json.dumps(wrap(model, token, False)) + '\n'
+                final = wrap(model, '', True)
+                final.update({'done_reason': 'stop'}, **timing_fields(prompt, sent, prompt_seconds, per_token * sent, load))
+                yield json.dumps(final) + '\n'
+            finally:
+                # Runs on client disconnect too, freeing the slot like Ollama cancelling generation
+                stats['tokens'] += sent
+                release()
+
+        return StreamingResponse(chunks(), media_type='application/x-ndjson')
+
+    def now() -> str:
+        return time.strftime('%Y-%m-%dT%H:%M:%SZ', time.gmtime())
+
+    @app.post('/api/generate')
+    async def generate(request: Request):
+        body = await request.json()
+        wrap = lambda model, text, done: {'model': model, 'created_at': now(), 'response': text, 'done': done}
+        return await run_generation(body.get('model', ''), body.get('prompt', ''), body.get('options') or {},
+                                    body.get('stream', True), wrap)
+
+    @app.post('/api/chat')
+    async def chat(request: Request):
+        body = await request.json()
+        prompt = '\n'.join(message.get('content', '') for message in body.get('messages', []))
+        wrap = lambda model, text, done: {'model': model, 'created_at': now(),
+                                          'message': {'role': 'assistant', 'content': text}, 'done': done}
+        return await run_generation(body.get('model', ''), prompt, body.get('options') or {},
+                                    body.get('stream', True), wrap)
+
+    def embedding(text: str) -> List[float]:
+        text_rng = seeded(text)
+        return [text_rng.uniform(-1, 1) for _ in range(config.embedding_dim)]
+
+    @app.post('/api/embeddings')
+    async def embeddings(request: Request):
+        body = await request.json()
+        await asyncio.sleep(sample_latency() / 10)
+        return {'embedding': embedding(body.get('prompt', ''))}
+
+    @app.post('/api/embed')
+    async def embed(request: Request):
+        body = await request.json()
+        inputs = body.get('input', '')
+        inputs = [inputs] if isinstance(inputs, str) else inputs
+        await asyncio.sleep(sample_latency() / 10)
+        return {'model': body.get('model', ''), 'embeddings': [embedding(text) for text in inputs]}
+
+    @app.get('/api/tags')
+    async def tags():
+        return {'models': [{
+            'name': model,
+            'model': model,
+            'modified_at': now(),
+            'size': 2_000_000_000,
+            'digest': hashlib.sha256(model.encode()).hexdigest(),
+            'details': {'format': 'gguf', 'family': 'fake', 'parameter_size': '3B', 'quantization_level': 'Q4_K_M'}
+        } for model in config.models]}
+
+    @app.post('/api/pull')
+    async def pull(request: Request):
+        body = await request.json()
+        model = body.get('model') or body.get('name', '')
+        if model not in config.models:
+            config.models.append(model)
+        statuses = [{'status': 'pulling manifest'}, {'status': 'verifying sha256 digest'},
+                    {'status': 'writing manifest'}, {'status': 'success'}]
+        if not body.get('stream', True):
+            return statuses[-1]
+        return StreamingResponse((json.dumps(status) + '\n' for status in statuses), media_type='application/x-ndjson')
+
+    @app.get('/api/version')
+    async def version():
+        return {'version': '0.0.0-fake'}
+
+    @app.get('/fake/stats')
+    async def fake_stats():
+        """Counters for asserting on load-test behaviour"""
+        return stats
+
+    return app
+
+def main():
+    parser = argparse.ArgumentParser(description="Deterministic fake Ollama server")
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=11435)
+    parser.add_argument('--models', default='llama3.2', help="Comma-separated model names to advertise")
+    parser.add_argument('--latency', type=float, default=0.2, help="Median seconds before the first token")
+    parser.add_argument('--jitter', choices=['none', 'uniform', 'normal', 'lognormal'], default='none')
+    parser.add_argument('--jitter-scale', type=float, default=0.5)
+    parser.add_argument('--tokens-per-second', type=float, default=50.0)
+    parser.add_argument('--load-duration', type=float, default=0.0, help="Cold-start seconds on first use of a model")
+    parser.add_argument('--error-rate', type=float, default=0.0)
+    parser.add_argument('--error-status', type=int, default=500)
+    parser.add_argument('--max-concurrent', type=int, default=1, help="Parallel generations (OLLAMA_NUM_PARALLEL)")
+    parser.add_argument('--max-queue', type=int, default=64, help="Waiting requests before answering 503")
+    parser.add_argument('--ramble', action='store_true', help="Generate until num_predict")
+    parser.add_argument('--seed', type=int, default=42)
+    args = parser.parse_args()
+
+    config = FakeOllamaConfig(
+        models=args.models.split(','), latency=args.latency, jitter=args.jitter, jitter_scale=args.jitter_scale,
+        tokens_per_second=args.tokens_per_second, load_duration=args.load_duration, error_rate=args.error_rate,
+        error_status=args.error_status, max_concurrent=args.max_concurrent, max_queue=args.max_queue,
+        ramble=args.ramble, seed=args.seed
+    )
+
+    import uvicorn
+    print(f"🦙 Fake Ollama listening on http://{args.host}:{args.port} (models: {args.models})")
+    uvicorn.run(create_app(config), host=args.host, port=args.port, log_level='warning')
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,117 @@
+"""
+Generators - reproducible synthetic media libraries and subtitle corpora
+Media files are created empty (or sparse) so a 200k-file tree fits on any dev box.
+"""
+
+import os
+import random
+from pathlib import Path
+from typing import Dict, List
+
+SHOW_WORDS = ['Dark', 'House', 'Breaking', 'Lost', 'Crown', 'Office', 'Wire', 'Station', 'Empire', 'Night',
+              'River', 'Signal', 'Harbor', 'Frontier', 'Echo', 'Garden', 'Code', 'North', 'Silver', 'Hollow']
+MOVIE_WORDS = ['The', 'Last', 'Return', 'Of', 'Journey', 'Shadow', 'Storm', 'City', 'King', 'Dream',
+               'Blue', 'Iron', 'Secret', 'Winter', 'Road', 'Island', 'Star', 'Machine', 'Heart', 'Fire']
+QUALITY_TAGS = ['1080p.WEB-DL', '720p.HDTV', '2160p.BluRay', '1080p.BluRay.x264', 'WEBRip']
+VIDEO_EXTENSIONS = ['.mkv', '.mp4', '.mp4', '.mkv', '.avi', '.m4v']
+DIALOGUE = [
+    "I told you we should have taken the other road.",
+    "Where were you last night?",
+    "We don't have much time left.",
+    "That's not what I meant and you know it.",
+    "Get in the car, now!",
+    "Have you seen the boat since the storm?",
+    "I can't believe you kept this from me for so long.",
+    "Listen to me very carefully.",
+    "It's over. It's finally over.",
+    "Nobody leaves this room until we figure this out.",
+]
+NON_DIALOGUE = ['[MUSIC]', '♪ la la la ♪', '(gasps)', '[DOOR SLAMS]', 'Yeah.', 'Oh!', 'JOHN:', '...']
+
+def _title(rng: random.Random, words: List[str], count: int) -> str:
+    return ' '.join(rng.choice(words) for _ in range(count))
+
+def generate_media_tree(root: str, file_count: int, seed: int = 42, subtitle_ratio: float = 0.3,
+                        tv_ratio: float = 0.7, file_size: int = 0) -> Dict:
+    """Create a TV/movie tree with realistic release naming
+
+    Returns counts of created files. `file_size` > 0 makes sparse files of that size
+    (useful for streaming tests) without consuming disk blocks.
+    """
+    rng = random.Random(seed)
+    root_path = Path(root)
+    created = {'videos': 0, 'subtitles': 0, 'tv': 0, 'movies': 0}
+
+    def touch(path: Path):
+        path.parent.mkdir(parents=True, exist_ok=True)
+        with open(path, 'wb') as f:
+            if file_size:
+                f.truncate(file_size)
+
+    shows = [_title(rng, SHOW_WORDS, rng.randint(1, 3)) for _ in range(max(1, file_count // 60))]
+    while created['videos'] < file_count:
+        if rng.random() < tv_ratio:
+            show = rng.choice(shows)
+            season = rng.randint(1, 8)
+            episode = rng.randint(1, 24)
+            dotted = show.replace(' ', '.')
+            name = f"{dotted}.S{season:02d}E{episode:02d}.{rng.choice(QUALITY_TAGS)}"
+            video = root_path / 'tv' / show / f"Season {season:02d}" / (name + rng.choice(VIDEO_EXTENSIONS))
+            created['tv'] += 1
+        else:
+            title = _title(rng, MOVIE_WORDS, rng.randint(2, 4))
+            year = rng.randint(1970, 2025)
+            name = f"{title.replace(' ', '.')}.{year}.{rng.choice(QUALITY_TAGS)}"
+            video = root_path / 'movies' / f"{title} ({year})" / (name + rng.choice(VIDEO_EXTENSIONS))
+            created['movies'] += 1
+
+        if video.exists():
+            continue
+        touch(video)
+        created['videos'] += 1
+
+        if rng.random() < subtitle_ratio:
+            subtitle = video.with_suffix(rng.choice(['.srt', '.en.srt', '.vtt']))
+            generate_subtitle_file(str(subtitle), rng.randint(200, 900), seed=rng.randint(0, 1 << 30))
+            created['subtitles'] += 1
+
+    return created
+
+def generate_cues(cue_count: int, seed: int = 42, non_dialogue_ratio: float = 0.2) -> List[Dict]:
+    """Synthetic cue list with realistic gaps, durations and a share of non-dialogue cues"""
+    rng = random.Random(seed)
+    cues = []
+    t = rng.uniform(1, 5)
+    for i in range(cue_count):
+        duration = rng.uniform(0.8, 5.0)
+        if rng.random() < non_dialogue_ratio:
+            text = rng.choice(NON_DIALOGUE)
+        else:
+            text = ' '.join(rng.choice(DIALOGUE) for _ in range(rng.randint(1, 2)))
+        cues.append({'index': i + 1, 'start_time': t, 'end_time': t + duration, 'text': text})
+        t += duration + rng.uniform(0.05, 4.0)
+    return cues
+
+def _srt_time(seconds: float) -> str:
+    ms = int(round(seconds * 1000))
+    return f"{ms // 3600000:02d}:{ms // 60000 % 60:02d}:{ms // 1000 % 60:02d},{ms % 1000:03d}"
+
+def generate_subtitle_file(path: str, cue_count: int, seed: int = 42) -> str:
+    """Write an SRT or VTT file (chosen by extension) with `cue_count` cues"""
+    cues = generate_cues(cue_count, seed)
+    is_vtt = path.lower().endswith('.vtt')
+    lines = ['WEBVTT', ''] if is_vtt else []
+    for cue in cues:
+        start, end = _srt_time(cue['start_time']), _srt_time(cue['end_time'])
+        if is_vtt:
+            lines.append(f"{start.replace(',', '.')} --> {end.replace(',', '.')}")
+        else:
+            lines.append(str(cue['index']))
+            lines.append(f"{start} --> {end}")
+        lines.append(cue['text'])
+        lines.append('')
+
+    os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+    with open(path, 'w', encoding='utf-8') as f:
+        f.write('\n'.join(lines))
+    return path
@@ -0,0 +1,262 @@
+"""
+Benchmark Runner - measures the library and subtitle hot paths on synthetic data
+
+Usage (from backend/):
+    python -m benchmarks.run --files 5000 --cues 5000 --output bench.json
+    python -m benchmarks.run --only parse_srt,export_srt --baseline bench.json
+
+Every benchmark reports throughput, p50/p99 latency and peak traced memory as JSON.
+"""
+
+import os
+import sys
+import json
+import time
+import asyncio
+import argparse
+import contextlib
+import platform
+import tempfile
+import tracemalloc
+from pathlib import Path
+from typing import Callable, Dict, List, Optional
+
+from benchmarks.generators import generate_media_tree, generate_subtitle_file
+
+SEARCH_QUERIES = ['dark', 'the last', 'station', 'zzz-no-match', 'river s02', 'king']
+
+class StubOllama:
+    """In-process stand-in for ollama.AsyncClient with fixed per-call latency"""
+
+    def __init__(self, latency: float = 0.0, tokens_per_second: float = 50.0):
+        self.latency = latency
+        self.tokens_per_second = tokens_per_second
+
+    async def generate(self, model: str = '', prompt: str = '', options: Optional[Dict] = None, stream: bool = False):
+        await asyncio.sleep(self.latency)
+        if 'Original captions:' in prompt:
+            count = prompt.split('Original captions:')[1].count('\n') - 2
+            text = '\n'.join(f"{i + 1}. Stub caption {i + 1}" for i in range(max(count, 1)))
+        else:
+            text = 'Stub caption'
+        tokens = len(text.split())
+        return {
+            'response': text,
+            'done': True,
+            'eval_count': tokens,
+            'eval_duration': int(tokens / self.tokens_per_second * 1e9)
+        }
+
+def percentile(values: List[float], fraction: float) -> float:
+    ordered = sorted(values)
+    if not ordered:
+        return 0.0
+    index = min(len(ordered) - 1, int(round(fraction * (len(ordered) - 1))))
+    return ordered[index]
+
+def measure(name: str, func: Callable[[], int], runs: int, unit: str, params: Dict,
+            setup: Optional[Callable[[], None]] = None, track_memory: bool = True) -> Dict:
+    """Time `runs` calls of func (which returns items processed) and one traced call for memory"""
+    latencies = []
+    items = 0
+    for _ in range(runs):
+        if setup:
+            setup()
+        started = time.perf_counter()
+        items += func()
+        latencies.append(time.perf_counter() - started)
+
+    peak_memory = None
+    if track_memory:
+        if setup:
+            setup()
+        tracemalloc.start()
+        func()
+        peak_memory = tracemalloc.get_traced_memory()[1]
+        tracemalloc.stop()
+
+    total = sum(latencies)
+    result = {
+        'benchmark': name,
+        'params': params,
+        'runs': runs,
+        'throughput': round(items / total, 2) if total else None,
+        'throughput_unit': unit,
+        'latency_p50_ms': round(percentile(latencies, 0.5) * 1000, 3),
+        'latency_p99_ms': round(percentile(latencies, 0.99) * 1000, 3),
+        'peak_memory_mb': round(peak_memory / 1e6, 3) if peak_memory is not None else None
+    }
+    print(f"⏱️ {name}: {result['throughput']} {unit}, p50 {result['latency_p50_ms']}ms, "
+          f"p99 {result['latency_p99_ms']}ms, peak {result['peak_memory_mb']}MB", file=sys.stderr)
+    return result
+
+def run_library_benchmarks(workdir: Path, args, loop) -> List[Dict]:
+    from media_scanner.scanner import MediaScanner
+    import api.library as library_api
+
+    if not args.only & set(LIBRARY_BENCHMARKS):
+        return []
+
+    media_root = workdir / 'media'
+    if not media_root.exists():
+        print(f"📂 Generating {args.files} synthetic media files...", file=sys.stderr)
+        generate_media_tree(str(media_root), args.files, seed=args.seed)
+
+    async def no_metadata(title: str, content_type: str) -> Dict:
+        return {}
+
+    def make_scanner() -> MediaScanner:
+        scanner = MediaScanner([str(media_root)])
+        scanner.library_file = str(workdir / 'media_library.json')
+        scanner.library_data = {"movies": {}, "tv_shows": {}, "videos": {}, "last_scan": None}
+        # Metadata lookups would benchmark TMDB, not the scanner
+        scanner.fetch_tmdb_metadata = no_metadata
+        return scanner
+
+    results = []
+    state = {}
+
+    def fresh_scanner():
+        state['scanner'] = make_scanner()
+
+    def scan() -> int:
+        loop.run_until_complete(state['scanner'].initial_scan())
+        return args.files
+
+    if 'initial_scan' in args.only:
+        results.append(measure('initial_scan', scan, 1, 'files/s', {'files': args.files},
+                               setup=fresh_scanner, track_memory=not args.no_memory))
+
+    scanner = make_scanner()
+    loop.run_until_complete(scanner.initial_scan())
+    library_api.set_media_scanner(scanner)
+
+    def search() -> int:
+        for query in SEARCH_QUERIES:
+            scanner.search_library(query)
+        return len(SEARCH_QUERIES)
+
+    def list_movies() -> int:
+        return loop.run_until_complete(library_api.get_movies())['count']
+
+    def list_tv_shows() -> int:
+        return loop.run_until_complete(library_api.get_tv_shows())['count']
+
+    if 'search_library' in args.only:
+        results.append(measure('search_library', search, args.runs, 'queries/s', {'files': args.files},
+                               track_memory=not args.no_memory))
+    if 'list_movies' in args.only:
+        results.append(measure('list_movies', list_movies, args.runs, 'movies/s', {'files': args.files},
+                               track_memory=not args.no_memory))
+    if 'list_tv_shows' in args.only:
+        results.append(measure('list_tv_shows', list_tv_shows, args.runs, 'shows/s', {'files': args.files},
+                               track_memory=not args.no_memory))
+    return results
+
+def run_subtitle_benchmarks(workdir: Path, args, loop) -> List[Dict]:
+    if not args.only & set(SUBTITLE_BENCHMARKS):
+        return []
+
+    os.environ['CAPTION_MODE_CACHE_DIR'] = str(workdir / 'cache')
+    os.environ['CAPTION_AUTOTUNE_FILE'] = str(workdir / 'autotune.json')
+    from subtitle_engine.processor import SubtitleProcessor
+
+    processor = SubtitleProcessor()
+    processor.async_ollama_client = StubOllama(latency=args.llm_latency)
+
+    srt_path = generate_subtitle_file(str(workdir / 'corpus.srt'), args.cues, seed=args.seed)
+    vtt_path = generate_subtitle_file(str(workdir / 'corpus.vtt'), args.cues, seed=args.seed)
+    parsed = {'subtitles': processor.parse_subtitle_file(srt_path)}
+    params = {'cues': args.cues}
+    results = []
+
+    def clear_cache():
+        for cache_file in processor.cache_dir.glob('*.json'):
+            cache_file.unlink()
+
+    benchmarks = {
+        # Uncached parses; parse_subtitle_file would only measure LRU hits after the first run
+        'parse_srt': lambda: len(processor._parse_subtitle_file(Path(srt_path))),
+        'parse_vtt': lambda: len(processor._parse_subtitle_file(Path(vtt_path))),
+        'parse_srt_cached': lambda: len(processor.parse_subtitle_file(srt_path)),
+        'export_srt': lambda: processor.export_subtitles(parsed, str(workdir / 'out.srt'), 'srt') and args.cues,
+        'export_vtt': lambda: processor.export_subtitles(parsed, str(workdir / 'out.vtt'), 'vtt') and args.cues,
+    }
+    for name, func in benchmarks.items():
+        if name in args.only:
+            results.append(measure(name, func, args.runs, 'cues/s', params, track_memory=not args.no_memory))
+
+    if 'transform_subtitles' in args.only:
+        def transform() -> int:
+            result = loop.run_until_complete(processor.transform_subtitles(srt_path, args.mode))
+            return len(result['subtitles'])
+
+        results.append(measure('transform_subtitles', transform, max(1, args.runs // 10), 'cues/s',
+                               {**params, 'mode': args.mode, 'llm_latency': args.llm_latency},
+                               setup=clear_cache, track_memory=not args.no_memory))
+    return results
+
+def compare(results: List[Dict], baseline_path: str):
+    """Print throughput change against a previous run"""
+    with open(baseline_path, 'r') as f:
+        baseline = {entry['benchmark']: entry for entry in json.load(f)['results']}
+    for result in results:
+        previous = baseline.get(result['benchmark'])
+        if previous and previous.get('throughput') and result.get('throughput'):
+            change = result['throughput'] / previous['throughput'] - 1
+            print(f"📊 {result['benchmark']}: {change:+.1%} throughput vs baseline", file=sys.stderr)
+
+LIBRARY_BENCHMARKS = ['initial_scan', 'search_library', 'list_movies', 'list_tv_shows']
+SUBTITLE_BENCHMARKS = ['parse_srt', 'parse_vtt', 'parse_srt_cached', 'export_srt', 'export_vtt', 'transform_subtitles']
+ALL_BENCHMARKS = LIBRARY_BENCHMARKS + SUBTITLE_BENCHMARKS
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark library and subtitle hot paths")
+    parser.add_argument('--files', type=int, default=2000, help="Synthetic media files (10k-200k for full runs)")
+    parser.add_argument('--cues', type=int, default=5000, help="Cues per synthetic subtitle file")
+    parser.add_argument('--runs', type=int, default=20, help="Repetitions per benchmark")
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--mode', default='pirate', help="Caption mode for transform_subtitles")
+    parser.add_argument('--llm-latency', type=float, default=0.0, help="Stub LLM seconds per call")
+    parser.add_argument('--only', default=','.join(ALL_BENCHMARKS), help="Comma-separated benchmark names")
+    parser.add_argument('--workdir', help="Reuse a directory for generated data (default: temporary)")
+    parser.add_argument('--no-memory', action='store_true', help="Skip the traced peak-memory pass")
+    parser.add_argument('--output', help="Write JSON results here instead of stdout")
+    parser.add_argument('--baseline', help="Previous JSON results to compare throughput against")
+    args = parser.parse_args()
+    args.only = set(args.only.split(','))
+
+    with tempfile.TemporaryDirectory() as temp_dir:
+        workdir = Path(args.workdir or temp_dir)
+        workdir.mkdir(parents=True, exist_ok=True)
+        loop = asyncio.new_event_loop()
+        try:
+            # Keep the code under test from printing into the JSON report
+            with contextlib.redirect_stdout(sys.stderr):
+                results = run_library_benchmarks(workdir, args, loop) + run_subtitle_benchmarks(workdir, args, loop)
+        finally:
+            loop.close()
+
+    report = {
+        'environment': {
+            'python': platform.python_version(),
+            'platform': platform.platform(),
+            'cpu_count': os.cpu_count(),
+            'timestamp': time.time()
+        },
+        'results': results
+    }
+
+    if args.baseline:
+        compare(results, args.baseline)
+
+    output = json.dumps(report, indent=2)
+    if args.output:
+        with open(args.output, 'w') as f:
+            f.write(output)
+        print(f"💾 Results written to {args.output}", file=sys.stderr)
+    else:
+        print(output)
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,272 @@
+"""
+Stream Load - simulates concurrent players against the media streaming endpoints
+
+Usage (from backend/):
+    python -m benchmarks.stream_load --spawn-server --players 8 --duration 60
+    python -m benchmarks.stream_load --url http://127.0.0.1:8000 --server-pid 1234 \\
+        --media-dir ./data/media --endpoint media --players 4
+
+Each player probes the file, then fetches sequential chunks to keep a playback buffer
+filled at the target bitrate, with occasional seeks. Reports aggregate throughput,
+time-to-first-byte, per-stream stalls and server CPU seconds per Gbit as JSON.
+"""
+
+import os
+import sys
+import json
+import time
+import random
+import asyncio
+import argparse
+import tempfile
+import subprocess
+from pathlib import Path
+from typing import Dict, List, Optional
+from urllib.parse import quote
+
+import httpx
+
+from benchmarks.run import percentile
+
+def create_sparse_files(directory: Path, count: int, size: int) -> List[Path]:
+    """Create sparse video files that take no disk blocks"""
+    directory.mkdir(parents=True, exist_ok=True)
+    files = []
+    for i in range(count):
+        path = directory / f"Load.Test.Movie.{i:03d}.2020.1080p.mp4"
+        if not path.exists() or path.stat().st_size != size:
+            with open(path, 'wb') as f:
+                f.truncate(size)
+        files.append(path)
+    return files
+
+def process_cpu_seconds(pid: int) -> Optional[float]:
+    """User+system CPU seconds of a process (Linux /proc)"""
+    try:
+        with open(f"/proc/{pid}/stat", 'r') as f:
+            fields = f.read().rsplit(')', 1)[1].split()
+        return (int(fields[11]) + int(fields[12])) / os.sysconf('SC_CLK_TCK')
+    except (OSError, IndexError, ValueError):
+        return None
+
+class PlayerStats:
+    def __init__(self, player_id: int, path: str):
+        self.player_id = player_id
+        self.path = path
+        self.bytes = 0
+        self.requests = 0
+        self.errors = 0
+        self.seeks = 0
+        self.stalls = 0
+        self.stall_seconds = 0.0
+        self.ttfb: List[float] = []
+
+    def to_dict(self) -> Dict:
+        return {
+            'player': self.player_id,
+            'file': os.path.basename(self.path),
+            'bytes': self.bytes,
+            'requests': self.requests,
+            'errors': self.errors,
+            'seeks': self.seeks,
+            'stalls': self.stalls,
+            'stall_seconds': round(self.stall_seconds, 3),
+            'ttfb_p50_ms': round(percentile(self.ttfb, 0.5) * 1000, 2)
+        }
+
+def build_url(base_url: str, endpoint: str, path: Path, media_dir: Path) -> str:
+    if endpoint == 'media':
+        return f"{base_url}/media/{quote(str(path.relative_to(media_dir)))}"
+    return f"{base_url}/api/player/stream/{quote(str(path))}"
+
+async def fetch_range(client: httpx.AsyncClient, url: str, endpoint: str, start: int, end: int,
+                      stats: PlayerStats) -> int:
+    """GET a byte range, recording TTFB; returns bytes received"""
+    byte_range = f"bytes={start}-{end}"
+    # The player endpoint reads the range from its `range` parameter, static files from the header
+    params = {'range': byte_range} if endpoint == 'player' else None
+    started = time.perf_counter()
+    received = 0
+    stats.requests += 1
+    try:
+        async with client.stream('GET', url, params=params, headers={'Range': byte_range}) as response:
+            if response.status_code >= 400:
+                stats.errors += 1
+                return 0
+            first = True
+            async for chunk in response.aiter_raw():
+                if first:
+                    stats.ttfb.append(time.perf_counter() - started)
+                    first = False
+                received += len(chunk)
+                # Servers ignoring Range send the whole file; stop once the chunk is covered
+                if received >= end - start + 1:
+                    break
+    except httpx.HTTPError:
+        stats.errors += 1
+    stats.bytes += received
+    return received
+
+async def run_player(player_id: int, client: httpx.AsyncClient, url: str, path: Path, args,
+                     deadline: float, rng: random.Random) -> PlayerStats:
+    """Simulate one viewer: probe, buffer ahead at the target bitrate, seek occasionally"""
+    stats = PlayerStats(player_id, str(path))
+    file_size = path.stat().st_size
+    bytes_per_second = args.bitrate_mbps * 1e6 / 8
+    chunk_bytes = int(bytes_per_second * args.chunk_seconds)
+
+    # Initial probe, like a <video> element reading the container header
+    await fetch_range(client, url, args.endpoint, 0, 1, stats)
+
+    position = 0
+    buffered = 0.0
+    stalled = False
+    started_playing = False
+    last_tick = time.monotonic()
+
+    while time.monotonic() < deadline:
+        now = time.monotonic()
+        elapsed, last_tick = now - last_tick, now
+        if started_playing and not stalled:
+            buffered -= elapsed
+            if buffered <= 0:
+                buffered = 0.0
+                stalled = True
+                stats.stalls += 1
+        elif stalled:
+            stats.stall_seconds += elapsed
+
+        if rng.random() < args.seek_probability:
+            # Seek: jump and rebuffer; not counted as a stall
+            position = rng.randrange(0, max(1, file_size - chunk_bytes))
+            buffered = 0.0
+            started_playing = False
+            stalled = False
+            stats.seeks += 1
+
+        if buffered < args.buffer_seconds:
+            end = min(file_size - 1, position + chunk_bytes - 1)
+            received = await fetch_range(client, url, args.endpoint, position, end, stats)
+            if received:
+                position = (end + 1) % file_size
+                buffered += received / bytes_per_second
+                if buffered >= args.start_seconds:
+                    started_playing = True
+                    stalled = False
+            else:
+                await asyncio.sleep(0.1)
+        else:
+            await asyncio.sleep(0.05)
+
+    return stats
+
+async def run_load(args, files: List[Path], media_dir: Path) -> Dict:
+    rng = random.Random(args.seed)
+    limits = httpx.Limits(max_connections=args.players * 2)
+    async with httpx.AsyncClient(timeout=args.timeout, limits=limits) as client:
+        deadline = time.monotonic() + args.duration
+        cpu_before = process_cpu_seconds(args.server_pid) if args.server_pid else None
+        wall_started = time.perf_counter()
+
+        players = [
+            run_player(i, client, build_url(args.url, args.endpoint, files[i % len(files)], media_dir),
+                       files[i % len(files)], args, deadline, random.Random(rng.random()))
+            for i in range(args.players)
+        ]
+        results = await asyncio.gather(*players)
+
+        wall = time.perf_counter() - wall_started
+        cpu_after = process_cpu_seconds(args.server_pid) if args.server_pid else None
+
+    total_bytes = sum(stats.bytes for stats in results)
+    all_ttfb = [t for stats in results for t in stats.ttfb]
+    gbits = total_bytes * 8 / 1e9
+    cpu_seconds = cpu_after - cpu_before if cpu_before is not None and cpu_after is not None else None
+
+    return {
+        'endpoint': args.endpoint,
+        'players': args.players,
+        'duration_seconds': round(wall, 2),
+        'bitrate_mbps': args.bitrate_mbps,
+        'total_bytes': total_bytes,
+        'aggregate_mbps': round(total_bytes * 8 / 1e6 / wall, 2) if wall else None,
+        'requests': sum(stats.requests for stats in results),
+        'errors': sum(stats.errors for stats in results),
+        'ttfb_p50_ms': round(percentile(all_ttfb, 0.5) * 1000, 2),
+        'ttfb_p99_ms': round(percentile(all_ttfb, 0.99) * 1000, 2),
+        'stalls': sum(stats.stalls for stats in results),
+        'stall_seconds': round(sum(stats.stall_seconds for stats in results), 2),
+        'server_cpu_seconds': round(cpu_seconds, 3) if cpu_seconds is not None else None,
+        'server_cpu_seconds_per_gbit': round(cpu_seconds / gbits, 3) if cpu_seconds is not None and gbits else None,
+        'streams': [stats.to_dict() for stats in results]
+    }
+
+def spawn_server(media_dir: Path, port: int) -> subprocess.Popen:
+    """Start the backend on `port`, serving the generated files"""
+    env = dict(os.environ, WATCHED_DIRS=str(media_dir))
+    backend_dir = Path(__file__).resolve().parent.parent
+    process = subprocess.Popen(
+        [sys.executable, '-m', 'uvicorn', 'main:app', '--port', str(port), '--log-level', 'warning'],
+        cwd=str(backend_dir), env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL
+    )
+    for _ in range(100):
+        try:
+            if httpx.get(f"http://127.0.0.1:{port}/health", timeout=1).status_code == 200:
+                return process
+        except httpx.HTTPError:
+            pass
+        time.sleep(0.3)
+    process.terminate()
+    raise RuntimeError("Backend did not become healthy")
+
+def main():
+    parser = argparse.ArgumentParser(description="Concurrent media streaming load test")
+    parser.add_argument('--url', default='http://127.0.0.1:8000', help="Backend base URL")
+    parser.add_argument('--endpoint', choices=['player', 'media'], default='player')
+    parser.add_argument('--players', type=int, default=4)
+    parser.add_argument('--duration', type=float, default=30, help="Seconds to run")
+    parser.add_argument('--bitrate-mbps', type=float, default=8, help="Playback bitrate each player consumes")
+    parser.add_argument('--chunk-seconds', type=float, default=2, help="Playback seconds per range request")
+    parser.add_argument('--buffer-seconds', type=float, default=20, help="Read-ahead target")
+    parser.add_argument('--start-seconds', type=float, default=2, help="Buffer needed to (re)start playback")
+    parser.add_argument('--seek-probability', type=float, default=0.01, help="Chance of a seek per tick")
+    parser.add_argument('--files', type=int, default=4, help="Sparse test files to generate")
+    parser.add_argument('--file-size-gb', type=float, default=4)
+    parser.add_argument('--media-dir', help="Directory for test files (must be under WATCHED_DIRS[0] for --endpoint media)")
+    parser.add_argument('--server-pid', type=int, help="Backend PID for CPU accounting")
+    parser.add_argument('--spawn-server', action='store_true', help="Start a local backend on --port")
+    parser.add_argument('--port', type=int, default=8765)
+    parser.add_argument('--timeout', type=float, default=30)
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--output', help="Write JSON results here instead of stdout")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as temp_dir:
+        media_dir = Path(args.media_dir or temp_dir).resolve()
+        files = create_sparse_files(media_dir, args.files, int(args.file_size_gb * 1e9))
+
+        server = None
+        if args.spawn_server:
+            server = spawn_server(media_dir, args.port)
+            args.url = f"http://127.0.0.1:{args.port}"
+            args.server_pid = server.pid
+        try:
+            print(f"🎞️ {args.players} players streaming from {args.url} ({args.endpoint}) for {args.duration}s...",
+                  file=sys.stderr)
+            report = asyncio.run(run_load(args, files, media_dir))
+        finally:
+            if server:
+                server.terminate()
+                server.wait()
+
+    print(f"📈 {report['aggregate_mbps']} Mbit/s, TTFB p50 {report['ttfb_p50_ms']}ms / p99 {report['ttfb_p99_ms']}ms, "
+          f"{report['stalls']} stalls, CPU/Gbit {report['server_cpu_seconds_per_gbit']}s", file=sys.stderr)
+    output = json.dumps(report, indent=2)
+    if args.output:
+        with open(args.output, 'w') as f:
+            f.write(output)
+    else:
+        print(output)
+
+if __name__ == '__main__':
+    main()
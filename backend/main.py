@@ -1,37 +1,115 @@
 from fastapi import FastAPI, HTTPException, WebSocket, WebSocketDisconnect
+from fastapi.responses import PlainTextResponse
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.staticfiles import StaticFiles
 from contextlib import asynccontextmanager
 import os
+import asyncio
+import threading
 from dotenv import load_dotenv
 
-from api.library import router as library_router, set_media_scanner
-from api.player import router as player_router
+from api.library import router as library_router, set_media_scanner, set_artwork_cache, set_dialogue_index, \
+    set_semantic_index
+from api.player import router as player_router, set_remux_manager, set_hls_packager, set_trickplay_generator
 from api.captions import router as captions_router, set_subtitle_processor
+from api.debug import router as debug_router, set_loop_watchdog
 from media_scanner.scanner import MediaScanner
 from subtitle_engine.processor import SubtitleProcessor
+from streaming.remux import RemuxManager
+from streaming.hls import HLSPackager
+from media_analysis.pool import AnalysisPool
+from media_analysis.trickplay import TrickplayGenerator
+from media_analysis.artwork import ArtworkCache
+from media_analysis.intro import IntroDetector
+from media_analysis.markers import MarkerAnalyzer
+from media_analysis.chapters import ChapterGenerator
+from media_analysis.subsync import SubtitleSync
+from search.dialogue import DialogueIndex
+from search.semantic import SemanticIndex
+from monitoring import metrics
+from monitoring.middleware import MetricsMiddleware
+from monitoring.watchdog import LoopWatchdog
 
 load_dotenv()
 
 # Global instances
 media_scanner = None
 subtitle_processor = None
+analysis_pool = None
+artwork_pool = None
+dialogue_index = None
+semantic_index = None
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
     # Startup
-    global media_scanner, subtitle_processor
+    global media_scanner, subtitle_processor, analysis_pool, artwork_pool, dialogue_index, semantic_index
+    
+    # Sample event loop lag for the whole lifetime of the server
+    lag_monitor = asyncio.create_task(metrics.monitor_event_loop_lag())
+    
+    # In debug mode, capture stack traces of anything that blocks the loop
+    loop_watchdog = None
+    if os.getenv("DEBUG_MODE", "").lower() in ("1", "true", "yes"):
+        loop_watchdog = LoopWatchdog(threshold=float(os.getenv("LOOP_BLOCK_THRESHOLD_MS", "100")) / 1000)
+        loop_watchdog.start(asyncio.get_running_loop())
+    set_loop_watchdog(loop_watchdog, threading.get_ident())
+    
+    # Background analysis (trickplay, markers, chapters, subtitle sync) runs in a low-priority process pool
+    analysis_pool = AnalysisPool()
+    await analysis_pool.start()
+    trickplay_generator = TrickplayGenerator(analysis_pool)
+    
+    # Artwork resizing is light and user-facing, so it gets its own pool that never pauses
+    artwork_pool = AnalysisPool(max_workers=int(os.getenv("ARTWORK_WORKERS", "2")), max_active_streams=0)
+    await artwork_pool.start()
+    
+    # Initialize subtitle processor (also titles generated chapters)
+    subtitle_processor = SubtitleProcessor()
     
     # Initialize media scanner
     watched_dirs = os.getenv("WATCHED_DIRS", "").split(",")
     media_scanner = MediaScanner(watched_dirs)
+    artwork_cache = ArtworkCache(artwork_pool, on_update=media_scanner.save_library)
+    intro_detector = IntroDetector(analysis_pool, media_scanner.get_library, on_update=media_scanner.save_library)
+    marker_analyzer = MarkerAnalyzer(analysis_pool, media_scanner.get_library, media_scanner.get_entry,
+                                     on_update=media_scanner.save_library)
+    chapter_titles = os.getenv("CHAPTER_LLM_TITLES", "true").lower() in ("1", "true", "yes")
+    chapter_generator = ChapterGenerator(analysis_pool, media_scanner.get_entry, on_update=media_scanner.save_library,
+                                         titler=subtitle_processor.title_segments if chapter_titles else None)
+    media_scanner.add_listener(trickplay_generator.on_media_added, trickplay_generator.on_media_removed)
+    media_scanner.add_listener(artwork_cache.on_media_added)
+    media_scanner.add_listener(intro_detector.on_media_added)
+    media_scanner.add_listener(marker_analyzer.on_media_added)
+    media_scanner.add_listener(chapter_generator.on_media_added)
+    subtitle_sync = SubtitleSync(analysis_pool, media_scanner.get_entry, subtitle_processor.timing,
+                                 on_update=media_scanner.save_library)
+    media_scanner.add_listener(subtitle_sync.on_media_added, on_subtitles_changed=subtitle_sync.on_media_added)
+    dialogue_index = DialogueIndex()
+    media_scanner.add_listener(dialogue_index.on_media_added, dialogue_index.on_media_removed,
+                               on_subtitles_changed=dialogue_index.on_media_added)
+    semantic_index = SemanticIndex(watched_dirs)
+    await semantic_index.start()
+    media_scanner.add_listener(semantic_index.on_media_added, semantic_index.on_media_removed,
+                               on_subtitles_changed=semantic_index.on_media_added)
     await media_scanner.start_monitoring()
-    
-    # Initialize subtitle processor
-    subtitle_processor = SubtitleProcessor()
+    trickplay_generator.enqueue_missing(media_scanner.get_library())
+    artwork_cache.enqueue_missing(media_scanner.get_library())
+    intro_detector.enqueue_missing(media_scanner.get_library())
+    marker_analyzer.enqueue_missing(media_scanner.get_library())
+    chapter_generator.enqueue_missing(media_scanner.get_library())
+    subtitle_sync.enqueue_missing(media_scanner.get_library())
+    dialogue_index.sync_in_background(media_scanner.get_library())
+    semantic_index.sync(media_scanner.get_library())
     
     # Inject dependencies into API routers
     set_media_scanner(media_scanner)
+    set_artwork_cache(artwork_cache)
+    set_dialogue_index(dialogue_index)
+    set_semantic_index(semantic_index)
+    set_remux_manager(RemuxManager())
+    set_hls_packager(HLSPackager())
+    set_trickplay_generator(trickplay_generator)
     set_subtitle_processor(subtitle_processor)
     
     print("🎬 LLM Media Player started successfully!")
@@ -39,8 +117,19 @@ async def lifespan(app: FastAPI):
     yield
     
     # Shutdown
+    lag_monitor.cancel()
+    if loop_watchdog:
+        loop_watchdog.stop()
     if media_scanner:
         await media_scanner.stop_monitoring()
+    if analysis_pool:
+        await analysis_pool.stop()
+    if artwork_pool:
+        await artwork_pool.stop()
+    if dialogue_index:
+        dialogue_index.close()
+    if semantic_index:
+        await semantic_index.stop()
     print("👋 Media Player shutting down...")
 
 app = FastAPI(
@@ -59,10 +148,14 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# Per-route latency, status and static media byte counters for /metrics
+app.add_middleware(MetricsMiddleware)
+
 # Include API routers
 app.include_router(library_router, prefix="/api/library", tags=["Library"])
 app.include_router(player_router, prefix="/api/player", tags=["Player"])
 app.include_router(captions_router, prefix="/api/captions", tags=["Captions"])
+app.include_router(debug_router, prefix="/api/debug", tags=["Debug"])
 
 # Serve static files (media content)
 media_dir = os.getenv("WATCHED_DIRS", "./data/media").split(",")[0]
@@ -77,6 +170,10 @@ else:
 async def root():
     return {"message": "🎥 LLM Media Player & Library Manager", "status": "running"}
 
+@app.get("/metrics", response_class=PlainTextResponse)
+async def prometheus_metrics():
+    return PlainTextResponse(metrics.render_metrics(), media_type="text/plain; version=0.0.4")
+
 @app.get("/health")
 async def health_check():
     return {"status": "healthy", "scanner_active": media_scanner is not None}
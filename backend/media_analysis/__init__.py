@@ -0,0 +1 @@
+# Media analysis package
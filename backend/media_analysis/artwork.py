@@ -0,0 +1,228 @@
+"""
+Artwork - local cache of TMDB posters and backdrops with resized WebP variants
+Each image is downloaded once, resized in the analysis pool and given a BlurHash
+placeholder, so library pages render instantly and keep working offline.
+"""
+
+import os
+import re
+import json
+import math
+import hashlib
+from pathlib import Path
+from typing import Callable, Dict, List, Optional, Tuple
+
+import requests
+from PIL import Image
+
+MANIFEST_NAME = 'manifest.json'
+IMAGE_ID = re.compile(r'[0-9a-f]{16}')
+
+# Variant name -> target width, per artwork kind
+VARIANTS = {
+    'poster': {'grid': 342, 'detail': 780},
+    'backdrop': {'backdrop': 1280},
+}
+
+BASE83 = '0123456789ABCDEFGHIJKLMNOPQRSTUVWXYZabcdefghijklmnopqrstuvwxyz#$%*+,-.:;=?@[]^_{|}~'
+
+def _encode83(value: int, length: int) -> str:
+    return ''.join(BASE83[(value // 83 ** (length - i - 1)) % 83] for i in range(length))
+
+def _srgb_to_linear(value: int) -> float:
+    v = value / 255
+    return v / 12.92 if v <= 0.04045 else ((v + 0.055) / 1.055) ** 2.4
+
+def _linear_to_srgb(value: float) -> int:
+    v = max(0.0, min(1.0, value))
+    if v <= 0.0031308:
+        return int(v * 12.92 * 255 + 0.5)
+    return int((1.055 * v ** (1 / 2.4) - 0.055) * 255 + 0.5)
+
+def blurhash(image: Image.Image, x_components: int = 4, y_components: int = 3) -> str:
+    """BlurHash of an image, computed on a 32px thumbnail (~20-30 characters)"""
+    small = image.convert('RGB').resize((32, 32))
+    width, height = small.size
+    pixels = [tuple(_srgb_to_linear(c) for c in pixel) for pixel in small.getdata()]
+
+    factors = []
+    for j in range(y_components):
+        for i in range(x_components):
+            normalisation = 1 if i == 0 and j == 0 else 2
+            r = g = b = 0.0
+            for y in range(height):
+                cos_y = math.cos(math.pi * j * y / height)
+                row = y * width
+                for x in range(width):
+                    basis = math.cos(math.pi * i * x / width) * cos_y
+                    pr, pg, pb = pixels[row + x]
+                    r += basis * pr
+                    g += basis * pg
+                    b += basis * pb
+            scale = normalisation / (width * height)
+            factors.append((r * scale, g * scale, b * scale))
+
+    dc, ac = factors[0], factors[1:]
+    result = _encode83((x_components - 1) + (y_components - 1) * 9, 1)
+
+    if ac:
+        actual_max = max(abs(value) for factor in ac for value in factor)
+        quantised_max = max(0, min(82, int(actual_max * 166 - 0.5)))
+        max_value = (quantised_max + 1) / 166
+        result += _encode83(quantised_max, 1)
+    else:
+        max_value = 1
+        result += _encode83(0, 1)
+
+    result += _encode83((_linear_to_srgb(dc[0]) << 16) + (_linear_to_srgb(dc[1]) << 8) + _linear_to_srgb(dc[2]), 4)
+
+    def quantise(value: float) -> int:
+        return max(0, min(18, int(math.floor(math.copysign(abs(value / max_value) ** 0.5, value) * 9 + 9.5))))
+
+    for r, g, b in ac:
+        result += _encode83(quantise(r) * 19 * 19 + quantise(g) * 19 + quantise(b), 2)
+    return result
+
+def build_artwork(url: str, output_dir: str, widths: Dict[str, int], quality: int = 80) -> Dict:
+    """Download an image once and write WebP variants plus a placeholder hash
+
+    Runs in an analysis worker process. manifest.json is written last and marks
+    the image as complete; the full-size download is only kept until then.
+    """
+    output = Path(output_dir)
+    output.mkdir(parents=True, exist_ok=True)
+    original_path = output / 'original'
+
+    if not original_path.exists():
+        response = requests.get(url, timeout=30)
+        response.raise_for_status()
+        temp_path = output / 'original.part'
+        with open(temp_path, 'wb') as f:
+            f.write(response.content)
+        temp_path.replace(original_path)
+
+    with Image.open(original_path) as image:
+        image = image.convert('RGB')
+        for name, width in widths.items():
+            variant = image
+            if image.width > width:
+                # Never upscale; small originals are stored at their own size
+                variant = image.resize((width, round(image.height * width / image.width)), Image.LANCZOS)
+            variant.save(output / f"{name}.webp", 'WEBP', quality=quality, method=4)
+
+        manifest = {
+            'source': url,
+            'width': image.width,
+            'height': image.height,
+            'placeholder': blurhash(image),
+            'variants': sorted(widths)
+        }
+
+    with open(output / MANIFEST_NAME, 'w') as f:
+        json.dump(manifest, f)
+    original_path.unlink()
+    return manifest
+
+class ArtworkCache:
+    """Downloads TMDB artwork for library items and records local variant URLs on them"""
+
+    def __init__(self, pool, on_update: Optional[Callable[[], None]] = None, output_dir: Optional[str] = None,
+                 base_url: Optional[str] = None, quality: Optional[int] = None):
+        self.pool = pool
+        self.on_update = on_update
+        self.output_dir = Path(output_dir or os.getenv('ARTWORK_DIR', './data/artwork'))
+        # Point at a local stub to test or run without network access
+        self.base_url = (base_url or os.getenv('TMDB_IMAGE_BASE_URL', 'https://image.tmdb.org/t/p/original')).rstrip('/')
+        self.quality = quality or int(os.getenv('ARTWORK_QUALITY', '80'))
+        self.output_dir.mkdir(parents=True, exist_ok=True)
+        self._waiting: Dict[str, List[Tuple[Dict, str]]] = {}
+
+    @staticmethod
+    def image_id(kind: str, tmdb_path: str) -> str:
+        # TMDB image paths are content-addressed, so the id never needs invalidating
+        return hashlib.md5(f"{kind}:{tmdb_path}".encode()).hexdigest()[:16]
+
+    def image_dir(self, image_id: str) -> Path:
+        return self.output_dir / image_id
+
+    def variant_path(self, image_id: str, variant: str) -> Optional[Path]:
+        if not IMAGE_ID.fullmatch(image_id) or not any(variant in widths for widths in VARIANTS.values()):
+            return None
+        path = self.image_dir(image_id) / f"{variant}.webp"
+        return path if path.exists() else None
+
+    def get_manifest(self, image_id: str) -> Optional[Dict]:
+        manifest_path = self.image_dir(image_id) / MANIFEST_NAME
+        if not manifest_path.exists():
+            return None
+        with open(manifest_path, 'r') as f:
+            return json.load(f)
+
+    def describe(self, image_id: str, manifest: Dict) -> Dict:
+        """Library-facing artwork info: placeholder and variant URLs"""
+        return {
+            'id': image_id,
+            'placeholder': manifest['placeholder'],
+            'width': manifest['width'],
+            'height': manifest['height'],
+            'variants': {name: f"/api/library/artwork/{image_id}/{name}.webp" for name in manifest['variants']}
+        }
+
+    def _attach(self, media_entry: Dict, kind: str, image_id: str, manifest: Dict):
+        media_entry.setdefault('metadata', {}).setdefault('artwork', {})[kind] = self.describe(image_id, manifest)
+
+    def _save(self):
+        if self.on_update:
+            self.on_update()
+
+    def _finished(self, image_id: str, manifest: Dict):
+        for media_entry, kind in self._waiting.pop(image_id, []):
+            self._attach(media_entry, kind, image_id, manifest)
+        self._save()
+
+    def _failed(self, image_id: str):
+        # Forget the waiting entries; the next enqueue of any of them retries the download
+        self._waiting.pop(image_id, None)
+
+    def enqueue(self, media_entry: Dict, save: bool = True) -> bool:
+        """Attach cached artwork or queue its download; True if the entry changed now"""
+        metadata = media_entry.get('metadata') or {}
+        artwork = metadata.get('artwork', {})
+        changed = False
+        for kind, widths in VARIANTS.items():
+            tmdb_path = metadata.get(f"{kind}_path")
+            if not tmdb_path:
+                continue
+            image_id = self.image_id(kind, tmdb_path)
+            if artwork.get(kind, {}).get('id') == image_id:
+                continue
+
+            manifest = self.get_manifest(image_id)
+            if manifest:
+                # Shared artwork (e.g. a show poster) is already on disk
+                self._attach(media_entry, kind, image_id, manifest)
+                changed = True
+                continue
+
+            # Episodes sharing a poster wait on a single download
+            self._waiting.setdefault(image_id, []).append((media_entry, kind))
+            self.pool.submit(f"artwork:{image_id}", 'artwork', build_artwork,
+                             f"{self.base_url}{tmdb_path}", str(self.image_dir(image_id)), widths,
+                             self.quality, on_done=lambda manifest, image_id=image_id: self._finished(image_id, manifest),
+                             on_error=lambda error, image_id=image_id: self._failed(image_id))
+
+        if changed and save:
+            self._save()
+        return changed
+
+    def on_media_added(self, media_entry: Dict):
+        self.enqueue(media_entry)
+
+    def enqueue_missing(self, library: Dict):
+        """Attach or queue artwork for the whole library, saving it at most once"""
+        changed = False
+        for category in ['movies', 'tv_shows', 'videos']:
+            for item in library.get(category, {}).values():
+                changed = self.enqueue(item, save=False) or changed
+        if changed:
+            self._save()
@@ -0,0 +1,168 @@
+"""
+Chapters - container chapters, or automatic ones for files without them
+Boundaries are picked from scene cuts and fades (media_analysis.signals) that fall in
+pauses of the dialogue, spaced to a target chapter length. Titles can be filled in
+afterwards by the LLM from the dialogue of each chapter.
+"""
+
+import os
+import json
+import asyncio
+import subprocess
+from bisect import bisect_left, bisect_right, insort
+from typing import Awaitable, Callable, Dict, List, Optional
+
+from media_analysis.signals import dialogue_gaps, load_cues, load_video_signals
+
+DIALOGUE_GAP_SECONDS = 3.0
+EXCERPT_CHARS = 600
+
+def format_container_chapters(chapters: List[Dict]) -> List[Dict]:
+    """ffprobe chapters in the shape served by the player API"""
+    return [{
+        "id": i,
+        "title": chapter.get('tags', {}).get('title', f"Chapter {i+1}"),
+        "start_time": float(chapter.get('start_time', 0)),
+        "end_time": float(chapter.get('end_time', 0))
+    } for i, chapter in enumerate(chapters)]
+
+def probe_container_chapters(path: str) -> List[Dict]:
+    cmd = ['ffprobe', '-v', 'quiet', '-print_format', 'json', '-show_chapters', path]
+    result = subprocess.run(cmd, capture_output=True, text=True)
+    if result.returncode != 0:
+        return []
+    return format_container_chapters(json.loads(result.stdout).get('chapters', []))
+
+def plan_boundaries(signals: Dict, cues: List[Dict], min_length: float, target_length: float) -> List[float]:
+    """Chapter start times (excluding 0) chosen from the strongest candidate cuts"""
+    duration = signals['duration']
+    if duration < 2 * target_length:
+        return []
+
+    gaps = dialogue_gaps(cues, DIALOGUE_GAP_SECONDS)
+    gap_starts = [start for start, _ in gaps]
+
+    def pause_bonus(time: float) -> float:
+        index = bisect_right(gap_starts, time) - 1
+        if index >= 0 and time <= gaps[index][1]:
+            return 0.5 + min(gaps[index][1] - gaps[index][0], 30) / 60
+        # Without subtitles every cut counts as a pause
+        return 0.0 if cues else 0.25
+
+    candidates = [(score / 100 + pause_bonus(time), time) for time, score in signals['scenes']]
+    # The end of a fade to black is a natural section break
+    candidates += [(1.0 + pause_bonus(end), end) for _, end in signals['black']]
+    # Long pauses without a visible cut still separate sections of a lecture
+    candidates += [(min(end - start, 30) / 60, (start + end) / 2) for start, end in gaps if end - start >= 8]
+
+    max_boundaries = int(round(duration / target_length)) - 1
+    boundaries: List[float] = []
+    for _, time in sorted(candidates, reverse=True):
+        if len(boundaries) >= max_boundaries:
+            break
+        if time < min_length or duration - time < min_length:
+            continue
+        index = bisect_left(boundaries, time)
+        if index > 0 and time - boundaries[index - 1] < min_length:
+            continue
+        if index < len(boundaries) and boundaries[index] - time < min_length:
+            continue
+        insort(boundaries, time)
+    return boundaries
+
+def build_chapters(path: str, file_hash: str, subtitle: Optional[str], signals_dir: str,
+                   min_length: float, target_length: float) -> Dict:
+    """Chapters of one file; runs in an analysis worker process
+
+    Container chapters win. Automatic chapters carry the dialogue of each section in
+    `excerpts` so they can be titled on the event loop.
+    """
+    result = {'file_hash': file_hash, 'source': 'container', 'chapters': probe_container_chapters(path)}
+    if result['chapters']:
+        return result
+
+    signals = load_video_signals(path, file_hash, signals_dir)
+    cues = load_cues(subtitle) if subtitle else []
+    starts = [0.0] + plan_boundaries(signals, cues, min_length, target_length)
+    if len(starts) < 2:
+        return {'file_hash': file_hash, 'source': 'none', 'chapters': []}
+
+    ends = starts[1:] + [signals['duration']]
+    chapters, excerpts = [], []
+    for i, (start, end) in enumerate(zip(starts, ends)):
+        chapters.append({"id": i, "title": f"Chapter {i+1}", "start_time": round(start, 2), "end_time": round(end, 2)})
+        text = ' '.join(cue['text'] for cue in cues if start <= cue['start_time'] < end)
+        excerpts.append(text[:EXCERPT_CHARS])
+    return {'file_hash': file_hash, 'source': 'auto', 'chapters': chapters, 'excerpts': excerpts}
+
+class ChapterGenerator:
+    """Computes chapters in the background and persists them on library entries"""
+
+    def __init__(self, pool, get_entry: Callable[[str], Optional[Dict]], on_update: Optional[Callable[[], None]] = None,
+                 titler: Optional[Callable[[List[str]], Awaitable[List[Optional[str]]]]] = None,
+                 signals_dir: Optional[str] = None):
+        self.pool = pool
+        self.get_entry = get_entry
+        self.on_update = on_update
+        self.titler = titler
+        self.signals_dir = signals_dir or os.getenv('VIDEO_SIGNALS_DIR', './data/signals')
+        self.min_length = float(os.getenv('CHAPTER_MIN_SECONDS', '120'))
+        self.target_length = float(os.getenv('CHAPTER_TARGET_SECONDS', '600'))
+        self._titling = set()
+
+    @staticmethod
+    def is_current(media_entry: Dict) -> bool:
+        return (media_entry.get('chapters') or {}).get('file_hash') == media_entry.get('file_hash')
+
+    def enqueue(self, media_entry: Dict) -> bool:
+        path = media_entry['filepath']
+        if self.is_current(media_entry) or not os.path.exists(path):
+            return False
+        subtitle = next((sub for sub in media_entry.get('subtitles', []) if sub.lower().endswith(('.srt', '.vtt'))), None)
+        return self.pool.submit(
+            f"chapters:{media_entry['file_hash']}", 'chapters', build_chapters,
+            path, media_entry['file_hash'], subtitle, self.signals_dir, self.min_length, self.target_length,
+            on_done=lambda result, path=path: self._store(path, result)
+        )
+
+    def _store(self, path: str, result: Dict):
+        entry = self.get_entry(path)
+        if not entry or entry.get('file_hash') != result['file_hash']:
+            return
+        excerpts = result.pop('excerpts', None)
+        entry['chapters'] = result
+        if self.on_update:
+            self.on_update()
+
+        if self.titler and excerpts and any(excerpts):
+            task = asyncio.create_task(self._title(path, result, excerpts))
+            self._titling.add(task)
+            task.add_done_callback(self._titling.discard)
+
+    async def _title(self, path: str, result: Dict, excerpts: List[str]):
+        try:
+            titles = await self.titler(excerpts)
+        except Exception as e:
+            print(f"⚠️ Chapter titles failed for {path}: {e}")
+            return
+
+        entry = self.get_entry(path)
+        if not entry or entry.get('chapters') is not result:
+            return
+        for chapter, title in zip(result['chapters'], titles):
+            if title:
+                chapter['title'] = title
+        result['titled'] = True
+        if self.on_update:
+            self.on_update()
+
+    def on_media_added(self, media_entry: Dict):
+        self.enqueue(media_entry)
+
+    def enqueue_missing(self, library: Dict) -> int:
+        queued = 0
+        for category in ['movies', 'tv_shows', 'videos']:
+            for item in library.get(category, {}).values():
+                if item.get('file_hash'):
+                    queued += self.enqueue(item)
+        return queued
@@ -0,0 +1,233 @@
+"""
+Intro Detection - finds the opening sequence shared by the episodes of a season
+The first minutes of audio are reduced to binary spectral fingerprints (32 bits per
+32 ms frame); episodes are aligned with FFT cross-correlation and the longest run of
+matching frames becomes the intro. Fingerprints are cached by file_hash.
+"""
+
+import os
+import asyncio
+import subprocess
+from pathlib import Path
+from typing import Callable, Dict, List, Optional, Tuple
+
+import numpy as np
+
+SAMPLE_RATE = 8000
+FRAME_SIZE = 1024
+HOP_SIZE = 256
+FRAME_SECONDS = HOP_SIZE / SAMPLE_RATE
+BAND_EDGES_HZ = np.geomspace(300, 2000, 34)
+
+# Bit agreement of unrelated audio averages 0.5; the same audio at an arbitrary
+# sub-frame offset lands around 0.65-0.85, so smooth over 2 s and cut at 0.6
+MATCH_THRESHOLD = 0.6
+SMOOTHING_SECONDS = 2.0
+CANDIDATE_LAGS = 3
+
+def decode_audio(path: str, seconds: float) -> np.ndarray:
+    """First `seconds` of the first audio stream as mono float32 at SAMPLE_RATE"""
+    cmd = [
+        'ffmpeg', '-nostdin', '-v', 'error', '-t', str(seconds), '-i', path,
+        '-map', '0:a:0', '-ac', '1', '-ar', str(SAMPLE_RATE), '-f', 's16le', 'pipe:1'
+    ]
+    result = subprocess.run(cmd, capture_output=True)
+    if result.returncode != 0:
+        raise RuntimeError(f"ffmpeg failed: {result.stderr.decode(errors='ignore').strip()[:200]}")
+    return np.frombuffer(result.stdout, dtype=np.int16).astype(np.float32) / 32768
+
+def fingerprint(samples: np.ndarray) -> np.ndarray:
+    """Frames x 32 boolean matrix of band-energy differences over time and frequency"""
+    if len(samples) < FRAME_SIZE + 2 * HOP_SIZE:
+        return np.zeros((0, len(BAND_EDGES_HZ) - 2), dtype=bool)
+
+    frames = np.lib.stride_tricks.sliding_window_view(samples, FRAME_SIZE)[::HOP_SIZE]
+    spectrum = np.abs(np.fft.rfft(frames * np.hanning(FRAME_SIZE), axis=1)) ** 2
+
+    edges = np.round(BAND_EDGES_HZ * FRAME_SIZE / SAMPLE_RATE).astype(int)
+    energies = np.add.reduceat(spectrum, edges, axis=1)[:, :len(edges) - 1]
+
+    band_diff = energies[:, :-1] - energies[:, 1:]
+    return (band_diff[1:] - band_diff[:-1]) > 0
+
+def load_fingerprint(path: str, file_hash: str, cache_dir: str, seconds: float) -> np.ndarray:
+    cache_path = Path(cache_dir) / f"{file_hash}_{int(seconds)}.npy"
+    if cache_path.exists():
+        packed = np.load(cache_path)
+        return np.unpackbits(packed, axis=1).astype(bool)
+
+    prints = fingerprint(decode_audio(path, seconds))
+    cache_path.parent.mkdir(parents=True, exist_ok=True)
+    np.save(cache_path, np.packbits(prints, axis=1))
+    return prints
+
+def _longest_run(mask: np.ndarray) -> Tuple[int, int]:
+    """Start and end (exclusive) of the longest True run"""
+    padded = np.concatenate(([0], mask.astype(np.int8), [0]))
+    changes = np.flatnonzero(np.diff(padded))
+    if len(changes) == 0:
+        return 0, 0
+    starts, ends = changes[::2], changes[1::2]
+    best = np.argmax(ends - starts)
+    return int(starts[best]), int(ends[best])
+
+def match_segment(a: np.ndarray, b: np.ndarray) -> Optional[Dict]:
+    """Longest stretch of audio shared by two fingerprints, in seconds on each timeline"""
+    if len(a) == 0 or len(b) == 0:
+        return None
+
+    # Cross-correlate the ±1 bit columns in one batched FFT to rank alignments
+    signed_a = a.astype(np.float32) * 2 - 1
+    signed_b = b.astype(np.float32) * 2 - 1
+    size = 1 << int(np.ceil(np.log2(len(a) + len(b) - 1)))
+    correlation = np.fft.irfft(
+        np.fft.rfft(signed_a, size, axis=0) * np.conj(np.fft.rfft(signed_b, size, axis=0)), size, axis=0
+    ).sum(axis=1)
+    # correlation[k] pairs a[t + k] with b[t]; negative lags wrap to the end
+    lags = np.concatenate((np.arange(len(a)), np.arange(-(len(b) - 1), 0)))
+    scores = np.concatenate((correlation[:len(a)], correlation[size - (len(b) - 1):])) if len(b) > 1 else correlation[:len(a)]
+
+    smoothing = max(1, int(SMOOTHING_SECONDS / FRAME_SECONDS))
+    kernel = np.ones(smoothing) / smoothing
+    best = None
+    for index in np.argsort(scores)[::-1][:CANDIDATE_LAGS]:
+        lag = int(lags[index])
+        start_a, start_b = max(lag, 0), max(-lag, 0)
+        length = min(len(a) - start_a, len(b) - start_b)
+        if length <= smoothing:
+            continue
+
+        agreement = (a[start_a:start_a + length] == b[start_b:start_b + length]).mean(axis=1)
+        smoothed = np.convolve(agreement, kernel, mode='same')
+        run_start, run_end = _longest_run(smoothed >= MATCH_THRESHOLD)
+        if run_end - run_start <= 0:
+            continue
+        if best is None or run_end - run_start > best['frames']:
+            best = {
+                'frames': run_end - run_start,
+                'start_a': (start_a + run_start) * FRAME_SECONDS,
+                'end_a': (start_a + run_end) * FRAME_SECONDS,
+                'start_b': (start_b + run_start) * FRAME_SECONDS,
+                'end_b': (start_b + run_end) * FRAME_SECONDS,
+                'similarity': float(agreement[run_start:run_end].mean())
+            }
+    return best
+
+def unavailable_intro(file_hash: str) -> Dict:
+    """Final answer for an episode that cannot be compared (no audio, or alone in its season)"""
+    return {'start': None, 'end': None, 'confidence': 0.0, 'file_hash': file_hash, 'status': 'unavailable'}
+
+def analyze_season(episodes: List[Tuple[str, str]], cache_dir: str, seconds: float, min_intro: float,
+                   max_intro: float, compare_with: int = 3) -> Dict[str, Dict]:
+    """Intro span for each (path, file_hash) of one season
+
+    Runs in an analysis worker process. Each episode is matched against its nearest
+    neighbours in episode order; the median of the plausible matches is its intro.
+    """
+    prints = {}
+    results = {}
+    for path, file_hash in episodes:
+        try:
+            prints[path] = load_fingerprint(path, file_hash, cache_dir, seconds)
+        except Exception as e:
+            print(f"⚠️ Could not fingerprint {path}: {e}")
+            results[path] = unavailable_intro(file_hash)
+
+    paths = [path for path, _ in episodes if path in prints]
+    hashes = dict(episodes)
+    for i, path in enumerate(paths):
+        neighbours = sorted((j for j in range(len(paths)) if j != i), key=lambda j: abs(j - i))[:compare_with]
+        matches = []
+        for j in neighbours:
+            match = match_segment(prints[path], prints[paths[j]])
+            if match and min_intro <= match['end_a'] - match['start_a'] <= max_intro:
+                matches.append(match)
+
+        result = {'start': None, 'end': None, 'confidence': 0.0, 'file_hash': hashes[path]}
+        if matches:
+            similarity = float(np.mean([match['similarity'] for match in matches]))
+            result.update({
+                'start': round(float(np.median([match['start_a'] for match in matches])), 2),
+                'end': round(float(np.median([match['end_a'] for match in matches])), 2),
+                # Share of neighbours that agree, weighted by how cleanly the audio matched
+                'confidence': round(len(matches) / len(neighbours) * min(1.0, (similarity - 0.5) * 4), 3)
+            })
+        results[path] = result
+    return results
+
+class IntroDetector:
+    """Batches seasons into background jobs and stores intro markers on library entries"""
+
+    def __init__(self, pool, get_library: Callable[[], Dict], on_update: Optional[Callable[[], None]] = None,
+                 cache_dir: Optional[str] = None, seconds: Optional[float] = None, debounce: float = 30.0):
+        self.pool = pool
+        self.get_library = get_library
+        self.on_update = on_update
+        self.cache_dir = cache_dir or os.getenv('INTRO_FINGERPRINT_DIR', './data/fingerprints')
+        # Intros nearly always start within the first few minutes
+        self.seconds = seconds or float(os.getenv('INTRO_SEARCH_SECONDS', '360'))
+        self.min_intro = float(os.getenv('INTRO_MIN_SECONDS', '15'))
+        self.max_intro = float(os.getenv('INTRO_MAX_SECONDS', '150'))
+        self.debounce = debounce
+        self._dirty = set()
+        self._timer: Optional[asyncio.TimerHandle] = None
+
+    @staticmethod
+    def season_key(media_entry: Dict) -> Optional[Tuple[str, int]]:
+        info = media_entry.get('basic_info', {})
+        if media_entry.get('content_type') != 'tv_show' or 'show_name' not in info:
+            return None
+        return info['show_name'], info.get('season', 1)
+
+    def _season_episodes(self, key: Tuple[str, int]) -> List[Dict]:
+        episodes = [entry for entry in self.get_library().get('tv_shows', {}).values() if self.season_key(entry) == key]
+        return sorted(episodes, key=lambda entry: entry.get('basic_info', {}).get('episode', 0))
+
+    @staticmethod
+    def is_current(media_entry: Dict) -> bool:
+        intro = media_entry.get('markers', {}).get('intro')
+        return bool(intro) and intro.get('file_hash') == media_entry.get('file_hash')
+
+    def enqueue_season(self, key: Tuple[str, int]) -> bool:
+        episodes = [entry for entry in self._season_episodes(key) if os.path.exists(entry['filepath'])]
+        if all(self.is_current(entry) for entry in episodes):
+            return False
+        if len(episodes) < 2:
+            # Nothing to match against until another episode of the season arrives
+            self._store({entry['filepath']: unavailable_intro(entry['file_hash']) for entry in episodes})
+            return False
+        return self.pool.submit(
+            f"intro:{key[0]}:{key[1]}", 'intro', analyze_season,
+            [(entry['filepath'], entry['file_hash']) for entry in episodes],
+            self.cache_dir, self.seconds, self.min_intro, self.max_intro,
+            on_done=self._store
+        )
+
+    def _store(self, results: Dict[str, Dict]):
+        tv_shows = self.get_library().get('tv_shows', {})
+        for path, intro in results.items():
+            entry = tv_shows.get(path)
+            if entry and entry.get('file_hash') == intro['file_hash']:
+                entry.setdefault('markers', {})['intro'] = intro
+        if self.on_update:
+            self.on_update()
+
+    def _flush(self):
+        self._timer = None
+        dirty, self._dirty = self._dirty, set()
+        for key in dirty:
+            self.enqueue_season(key)
+
+    def on_media_added(self, media_entry: Dict):
+        """Scanner listener: re-analyse the season once new episodes stop arriving"""
+        key = self.season_key(media_entry)
+        if not key:
+            return
+        self._dirty.add(key)
+        if self._timer:
+            self._timer.cancel()
+        self._timer = asyncio.get_running_loop().call_later(self.debounce, self._flush)
+
+    def enqueue_missing(self, library: Dict) -> int:
+        keys = {self.season_key(entry) for entry in library.get('tv_shows', {}).values()}
+        return sum(self.enqueue_season(key) for key in keys if key)
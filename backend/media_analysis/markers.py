@@ -0,0 +1,195 @@
+"""
+Markers - end-credits and "previously on" recap detection
+Combines cheap signals: dialogue density from the subtitles, black frames and scene
+cuts from one ffmpeg pass (media_analysis.signals), and how consistent the credits
+length is across the episodes of a season.
+"""
+
+import os
+import re
+import asyncio
+import statistics
+from typing import Callable, Dict, List, Optional, Tuple
+
+from media_analysis.intro import IntroDetector
+from media_analysis.signals import dialogue_gaps, load_cues, load_video_signals
+
+RECAP_PHRASES = re.compile(r'\bpreviously\b|\blast time on\b|\bprécédemment\b|\banteriormente\b|\bbisher bei\b', re.I)
+RECAP_SEARCH_SECONDS = 120
+RECAP_MAX_SECONDS = 240
+
+CREDITS_MIN_SECONDS = 15
+CREDITS_MAX_SECONDS = 600
+# How far past the last line of dialogue a fade to black still counts as the credits cut
+CREDITS_BLACK_WINDOW = 90
+SEASON_TAIL_TOLERANCE = 15
+
+def _scene_rate(scenes: List[List[float]], start: float, end: float) -> float:
+    if end <= start:
+        return 0.0
+    return sum(1 for time, _ in scenes if start <= time < end) / (end - start)
+
+def detect_credits(signals: Dict, cues: List[Dict]) -> Optional[Dict]:
+    duration = signals['duration']
+    if not duration:
+        return None
+
+    black = signals['black']
+    if cues:
+        last_dialogue = cues[-1]['end_time']
+        if not CREDITS_MIN_SECONDS <= duration - last_dialogue <= CREDITS_MAX_SECONDS:
+            return None
+        fades = [end for start, end in black if last_dialogue - 2 <= start <= last_dialogue + CREDITS_BLACK_WINDOW]
+        if fades:
+            return {'start': round(fades[0], 2), 'end': round(duration, 2), 'confidence': 0.8}
+        return {'start': round(last_dialogue, 2), 'end': round(duration, 2), 'confidence': 0.5}
+
+    # No subtitles: the first fade to black in the last fifth that leaves a credits-sized tail
+    for start, end in black:
+        if end >= duration * 0.8 and CREDITS_MIN_SECONDS <= duration - end <= CREDITS_MAX_SECONDS:
+            return {'start': round(end, 2), 'end': round(duration, 2), 'confidence': 0.4}
+    return None
+
+def detect_recap(signals: Dict, cues: List[Dict]) -> Optional[Dict]:
+    opener = next((cue for cue in cues if cue['start_time'] <= RECAP_SEARCH_SECONDS
+                   and RECAP_PHRASES.search(cue['text'])), None)
+    if not opener:
+        return None
+
+    start = max(0.0, opener['start_time'] - 1)
+    limit = start + RECAP_MAX_SECONDS
+    blacks = [black_start for black_start, _ in signals['black'] if start + 10 <= black_start <= limit]
+    gaps = [gap_start for gap_start, _ in dialogue_gaps(cues, 4.0) if start + 10 <= gap_start <= limit]
+
+    if blacks:
+        end, confidence = blacks[0], 0.7
+    elif gaps:
+        end, confidence = gaps[0], 0.5
+    else:
+        return None
+
+    # Recaps are montages: noticeably more cuts per second than the episode overall
+    overall = _scene_rate(signals['scenes'], 0, signals['duration'])
+    if overall and _scene_rate(signals['scenes'], start, end) >= 1.5 * overall:
+        confidence += 0.1
+    return {'start': round(start, 2), 'end': round(end, 2), 'confidence': round(confidence, 2)}
+
+def analyze_markers(items: List[Dict], signals_dir: str) -> Dict[str, Dict]:
+    """Credits and recap markers for items of one season (or a single film)
+
+    Runs in an analysis worker process. `items` hold path, file_hash and an optional
+    subtitle path. Credits lengths agreeing with the season median gain confidence,
+    and episodes with no credits signal inherit the median when most of the season has one.
+    """
+    results = {}
+    durations = {}
+    for item in items:
+        try:
+            signals = load_video_signals(item['path'], item['file_hash'], signals_dir)
+        except Exception as e:
+            print(f"⚠️ Could not analyse {item['path']}: {e}")
+            continue
+        cues = load_cues(item['subtitle']) if item.get('subtitle') else []
+        durations[item['path']] = signals['duration']
+        results[item['path']] = {
+            'file_hash': item['file_hash'],
+            'credits': detect_credits(signals, cues),
+            'recap': detect_recap(signals, cues)
+        }
+
+    tails = [result['credits']['end'] - result['credits']['start'] for result in results.values() if result['credits']]
+    if len(tails) >= 3:
+        median_tail = statistics.median(tails)
+        for path, result in results.items():
+            credits = result['credits']
+            if credits and abs(credits['end'] - credits['start'] - median_tail) <= SEASON_TAIL_TOLERANCE:
+                credits['confidence'] = round(min(1.0, credits['confidence'] + 0.15), 2)
+            elif not credits and len(tails) >= len(results) / 2 and durations[path] > median_tail:
+                result['credits'] = {'start': round(durations[path] - median_tail, 2),
+                                     'end': round(durations[path], 2), 'confidence': 0.3}
+    return results
+
+class MarkerAnalyzer:
+    """Schedules credits/recap analysis per season (or per film) and stores markers on entries"""
+
+    def __init__(self, pool, get_library: Callable[[], Dict], get_entry: Callable[[str], Optional[Dict]],
+                 on_update: Optional[Callable[[], None]] = None, signals_dir: Optional[str] = None,
+                 debounce: float = 30.0):
+        self.pool = pool
+        self.get_library = get_library
+        self.get_entry = get_entry
+        self.on_update = on_update
+        self.signals_dir = signals_dir or os.getenv('VIDEO_SIGNALS_DIR', './data/signals')
+        self.debounce = debounce
+        self._dirty = set()
+        self._timer: Optional[asyncio.TimerHandle] = None
+
+    @staticmethod
+    def group_key(media_entry: Dict) -> Tuple:
+        return IntroDetector.season_key(media_entry) or ('file', media_entry['filepath'])
+
+    @staticmethod
+    def is_current(media_entry: Dict) -> bool:
+        markers = media_entry.get('markers', {})
+        return markers.get('analyzed_hash') == media_entry.get('file_hash')
+
+    def _group_entries(self, key: Tuple) -> List[Dict]:
+        if key[0] == 'file':
+            entry = self.get_entry(key[1])
+            return [entry] if entry else []
+        return [entry for entry in self.get_library().get('tv_shows', {}).values() if IntroDetector.season_key(entry) == key]
+
+    def enqueue_group(self, key: Tuple) -> bool:
+        entries = [entry for entry in self._group_entries(key) if os.path.exists(entry['filepath'])]
+        if not entries or all(self.is_current(entry) for entry in entries):
+            return False
+        items = [{
+            'path': entry['filepath'],
+            'file_hash': entry['file_hash'],
+            'subtitle': next((path for path in entry.get('subtitles', []) if path.lower().endswith(('.srt', '.vtt'))), None)
+        } for entry in entries]
+        return self.pool.submit(f"markers:{key}", 'markers', analyze_markers, items, self.signals_dir,
+                                on_done=self._store)
+
+    def _store(self, results: Dict[str, Dict]):
+        for path, result in results.items():
+            entry = self.get_entry(path)
+            if not entry or entry.get('file_hash') != result['file_hash']:
+                continue
+            markers = entry.setdefault('markers', {})
+            recap = result['recap']
+            intro = markers.get('intro') or {}
+            if recap and intro.get('start') and recap['start'] < intro['start'] <= recap['end'] + 60:
+                # The intro is the most reliable end of a recap
+                recap.update({'end': intro['start'], 'confidence': max(recap['confidence'], 0.9)})
+            for name in ('credits', 'recap'):
+                markers[name] = dict(result[name], file_hash=result['file_hash']) if result[name] else None
+            markers['analyzed_hash'] = result['file_hash']
+        self._link_next_episodes(results)
+        if self.on_update:
+            self.on_update()
+
+    def _link_next_episodes(self, results: Dict[str, Dict]):
+        """Record the following episode so "Next episode" needs no library scan"""
+        episodes = sorted((entry for entry in map(self.get_entry, results) if entry and IntroDetector.season_key(entry)),
+                          key=lambda entry: entry.get('basic_info', {}).get('episode', 0))
+        for current, following in zip(episodes, episodes[1:] + [None]):
+            current.setdefault('markers', {})['next_episode'] = following['filepath'] if following else None
+
+    def _flush(self):
+        self._timer = None
+        dirty, self._dirty = self._dirty, set()
+        for key in dirty:
+            self.enqueue_group(key)
+
+    def on_media_added(self, media_entry: Dict):
+        """Scanner listener: batch a season once new episodes stop arriving"""
+        self._dirty.add(self.group_key(media_entry))
+        if self._timer:
+            self._timer.cancel()
+        self._timer = asyncio.get_running_loop().call_later(self.debounce, self._flush)
+
+    def enqueue_missing(self, library: Dict) -> int:
+        keys = {self.group_key(entry) for category in ['movies', 'tv_shows', 'videos']
+                for entry in library.get(category, {}).values()}
+        return sum(self.enqueue_group(key) for key in keys)
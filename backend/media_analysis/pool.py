@@ -0,0 +1,111 @@
+"""
+Analysis Pool - bounded, low-priority process pool for background media jobs
+Jobs are deduplicated by key and dispatched from an asyncio queue; workers run at a
+raised nice level and the dispatcher holds back while viewers are streaming.
+"""
+
+import os
+import asyncio
+import traceback
+from concurrent.futures import ProcessPoolExecutor
+from typing import Any, Callable, Dict, Optional
+
+from monitoring import metrics
+
+def _lower_priority(niceness: int):
+    """Worker initializer; ffmpeg children inherit the nice level"""
+    try:
+        os.nice(niceness)
+    except (AttributeError, OSError):
+        # Not available on Windows
+        pass
+
+class AnalysisPool:
+    """Runs CPU-heavy analysis (ffmpeg, Pillow, NumPy) without competing with playback"""
+
+    def __init__(self, max_workers: Optional[int] = None, niceness: Optional[int] = None,
+                 max_active_streams: Optional[int] = None, stream_check_interval: float = 5.0):
+        self.max_workers = max_workers or int(os.getenv('ANALYSIS_WORKERS', '1'))
+        self.niceness = niceness if niceness is not None else int(os.getenv('ANALYSIS_NICENESS', '15'))
+        # Pause dispatching while at least this many streams are active (0 disables the check)
+        self.max_active_streams = max_active_streams if max_active_streams is not None else \
+            int(os.getenv('ANALYSIS_MAX_ACTIVE_STREAMS', '2'))
+        self.stream_check_interval = stream_check_interval
+
+        self.executor: Optional[ProcessPoolExecutor] = None
+        self.queue: asyncio.Queue = asyncio.Queue()
+        self.pending: Dict[str, str] = {}
+        self.running: Dict[str, str] = {}
+        self.completed = 0
+        self.failed = 0
+        self._dispatchers = []
+
+    async def start(self):
+        if self.executor:
+            return
+        self.executor = ProcessPoolExecutor(max_workers=self.max_workers, initializer=_lower_priority,
+                                            initargs=(self.niceness,))
+        self._dispatchers = [asyncio.create_task(self._dispatch()) for _ in range(self.max_workers)]
+
+    async def stop(self):
+        for dispatcher in self._dispatchers:
+            dispatcher.cancel()
+        self._dispatchers = []
+        if self.executor:
+            self.executor.shutdown(wait=False, cancel_futures=True)
+            self.executor = None
+
+    def submit(self, key: str, kind: str, func: Callable, *args,
+               on_done: Optional[Callable[[Any], None]] = None,
+               on_error: Optional[Callable[[Exception], None]] = None) -> bool:
+        """Queue func(*args) in a worker process; False if the key is already queued or running
+
+        `func` must be a picklable module-level function. `on_done` runs on the event
+        loop with the result, `on_error` with the exception if the job fails.
+        """
+        if key in self.pending or key in self.running:
+            return False
+        self.pending[key] = kind
+        self.queue.put_nowait((key, kind, func, args, on_done, on_error))
+        return True
+
+    async def _wait_for_idle_streams(self):
+        if not self.max_active_streams:
+            return
+        while metrics.active_streams.get() >= self.max_active_streams:
+            await asyncio.sleep(self.stream_check_interval)
+
+    async def _dispatch(self):
+        loop = asyncio.get_running_loop()
+        while True:
+            key, kind, func, args, on_done, on_error = await self.queue.get()
+            try:
+                await self._wait_for_idle_streams()
+                self.pending.pop(key, None)
+                self.running[key] = kind
+                result = await loop.run_in_executor(self.executor, func, *args)
+                self.completed += 1
+                if on_done:
+                    on_done(result)
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                self.failed += 1
+                print(f"❌ Background {kind} job failed for {key}: {e}")
+                traceback.print_exc()
+                if on_error:
+                    on_error(e)
+            finally:
+                self.pending.pop(key, None)
+                self.running.pop(key, None)
+                self.queue.task_done()
+
+    def get_stats(self) -> Dict:
+        return {
+            'workers': self.max_workers,
+            'queued': len(self.pending),
+            'running': dict(self.running),
+            'completed': self.completed,
+            'failed': self.failed,
+            'paused_for_streams': bool(self.max_active_streams) and metrics.active_streams.get() >= self.max_active_streams
+        }
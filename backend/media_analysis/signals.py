@@ -0,0 +1,79 @@
+"""
+Video Signals - black segments and scene changes from a single ffmpeg decode pass
+Results are cached as JSON by file_hash and shared by the marker and chapter analyzers.
+"""
+
+import re
+import json
+import subprocess
+from pathlib import Path
+from typing import Dict, List
+
+import pysrt
+import webvtt
+
+# Analysing a downscaled 4 fps stream is plenty for cuts and fades
+ANALYSIS_FPS = 4
+SCENE_THRESHOLD = 10.0
+
+BLACK_LINE = re.compile(r'black_start:\s*([\d.]+)\s+black_end:\s*([\d.]+)')
+SCENE_LINE = re.compile(r'lavfi\.scd\.score:\s*([\d.]+),\s*lavfi\.scd\.time:\s*([\d.]+)')
+DURATION_LINE = re.compile(r'Duration:\s*(\d+):(\d+):([\d.]+)')
+
+def extract_video_signals(path: str) -> Dict:
+    """Duration, black segments and scene-change scores of a video in one pass"""
+    cmd = [
+        'ffmpeg', '-nostdin', '-nostats', '-hide_banner', '-i', path,
+        '-map', '0:v:0', '-an', '-sn', '-threads', '1',
+        '-vf', f"fps={ANALYSIS_FPS},scale=160:-2,blackdetect=d=0.3:pix_th=0.10,scdet=threshold={SCENE_THRESHOLD}",
+        '-f', 'null', '-'
+    ]
+    result = subprocess.run(cmd, capture_output=True, text=True, errors='ignore')
+    if result.returncode != 0:
+        raise RuntimeError(f"ffmpeg failed: {result.stderr.strip()[-200:]}")
+
+    duration_match = DURATION_LINE.search(result.stderr)
+    duration = 0.0
+    if duration_match:
+        hours, minutes, seconds = duration_match.groups()
+        duration = int(hours) * 3600 + int(minutes) * 60 + float(seconds)
+
+    return {
+        'duration': duration,
+        'black': [[float(start), float(end)] for start, end in BLACK_LINE.findall(result.stderr)],
+        'scenes': [[float(time), float(score)] for score, time in SCENE_LINE.findall(result.stderr)]
+    }
+
+def load_video_signals(path: str, file_hash: str, cache_dir: str) -> Dict:
+    cache_path = Path(cache_dir) / f"{file_hash}.json"
+    if cache_path.exists():
+        with open(cache_path, 'r') as f:
+            return json.load(f)
+
+    signals = extract_video_signals(path)
+    cache_path.parent.mkdir(parents=True, exist_ok=True)
+    with open(cache_path, 'w') as f:
+        json.dump(signals, f)
+    return signals
+
+def load_cues(subtitle_path: str) -> List[Dict]:
+    """Cue times and text, parsed like SubtitleProcessor without loading the LLM client"""
+    suffix = Path(subtitle_path).suffix.lower()
+    cues = []
+    if suffix == '.srt':
+        for sub in pysrt.open(subtitle_path):
+            cues.append({'start_time': sub.start.ordinal / 1000, 'end_time': sub.end.ordinal / 1000,
+                         'text': sub.text.replace('\n', ' ').strip()})
+    elif suffix == '.vtt':
+        for caption in webvtt.read(subtitle_path):
+            cues.append({'start_time': caption.start_in_seconds, 'end_time': caption.end_in_seconds,
+                         'text': caption.text.replace('\n', ' ').strip()})
+    return cues
+
+def dialogue_gaps(cues: List[Dict], min_gap: float) -> List[List[float]]:
+    """[start, end] of silences between cues lasting at least min_gap seconds"""
+    gaps = []
+    for previous, current in zip(cues, cues[1:]):
+        if current['start_time'] - previous['end_time'] >= min_gap:
+            gaps.append([previous['end_time'], current['start_time']])
+    return gaps
@@ -0,0 +1,204 @@
+"""
+Subtitle Sync - aligns sidecar subtitles to the speech in the audio track
+A speech-band energy envelope of the whole film is cross-correlated (FFT) with the
+cue-on/cue-off signal of the subtitles: once globally for the offset, then per window
+to measure drift. The correction is stored as serve-time timing for the file.
+"""
+
+import os
+import subprocess
+from typing import Callable, Dict, List, Optional, Tuple
+
+import numpy as np
+
+from media_analysis.signals import load_cues
+from subtitle_engine.timing import normalise_timing
+
+SAMPLE_RATE = 4000
+ENVELOPE_RATE = 100
+HOP = SAMPLE_RATE // ENVELOPE_RATE
+
+# Subtitles timed for another release are often off by a framerate conversion
+FRAMERATE_RATIOS = [1.0, 23.976 / 25, 25 / 23.976, 24 / 25, 25 / 24, 23.976 / 24, 24 / 23.976]
+DRIFT_WINDOWS = 8
+LOCAL_RADIUS_SECONDS = 4.0
+# Peak height over the spread of the correlation; below this the match is noise
+MIN_PROMINENCE = 6.0
+MIN_CORRECTION_SECONDS = 0.1
+# Window offsets that do not fit a straight line this well become drift anchors
+MAX_LINEAR_RESIDUAL = 0.5
+
+def decode_speech_band(path: str) -> np.ndarray:
+    """Whole first audio track as mono float32, band-limited to speech frequencies"""
+    cmd = [
+        'ffmpeg', '-nostdin', '-v', 'error', '-i', path, '-map', '0:a:0', '-vn', '-sn', '-dn',
+        '-ac', '1', '-ar', str(SAMPLE_RATE), '-af', 'highpass=f=300,lowpass=f=1800', '-f', 's16le', 'pipe:1'
+    ]
+    result = subprocess.run(cmd, capture_output=True)
+    if result.returncode != 0:
+        raise RuntimeError(f"ffmpeg failed: {result.stderr.decode(errors='ignore').strip()[:200]}")
+    return np.frombuffer(result.stdout, dtype=np.int16).astype(np.float32) / 32768
+
+def speech_envelope(samples: np.ndarray) -> np.ndarray:
+    """Voice activity in [0, 1] at ENVELOPE_RATE from log frame energy between noise floor and peaks"""
+    frames = len(samples) // HOP
+    if not frames:
+        return np.zeros(0, dtype=np.float32)
+    energy = np.square(samples[:frames * HOP].reshape(frames, HOP)).mean(axis=1)
+    level = np.log10(energy + 1e-10)
+    floor, peak = np.percentile(level, [20, 95])
+    activity = np.clip((level - floor) / max(peak - floor, 1e-6), 0, 1)
+    kernel = np.ones(ENVELOPE_RATE // 5) / (ENVELOPE_RATE // 5)
+    return np.convolve(activity, kernel, mode='same').astype(np.float32)
+
+def cue_signal(cues: List[Dict], length: int) -> np.ndarray:
+    """1 while a cue is on screen, sampled at ENVELOPE_RATE"""
+    edges = np.zeros(length + 1, dtype=np.int32)
+    starts = np.clip((np.array([cue['start_time'] for cue in cues]) * ENVELOPE_RATE).astype(int), 0, length)
+    ends = np.clip((np.array([cue['end_time'] for cue in cues]) * ENVELOPE_RATE).astype(int), 0, length)
+    np.add.at(edges, starts, 1)
+    np.add.at(edges, ends, -1)
+    return (np.cumsum(edges[:length]) > 0).astype(np.float32)
+
+def _standardise(signal: np.ndarray) -> np.ndarray:
+    std = signal.std()
+    return (signal - signal.mean()) / std if std else np.zeros_like(signal)
+
+def _correlate(a: np.ndarray, b: np.ndarray) -> np.ndarray:
+    """c[k] = sum a[t + k] * b[t] for k >= 0; negative lags wrap to the end"""
+    size = 1 << int(np.ceil(np.log2(len(a) + len(b) - 1)))
+    return np.fft.irfft(np.fft.rfft(a, size) * np.conj(np.fft.rfft(b, size)), size)
+
+def _prominence(values: np.ndarray, best: int) -> float:
+    spread = values.std()
+    return float((values[best] - np.median(values)) / spread) if spread else 0.0
+
+def global_offset(envelope: np.ndarray, cues: np.ndarray, max_lag: int) -> Tuple[int, float]:
+    """Frames to delay the cues by, and how clearly the correlation peaks there"""
+    correlation = _correlate(_standardise(envelope), _standardise(cues))
+    values = np.concatenate((correlation[len(correlation) - max_lag:], correlation[:max_lag + 1]))
+    best = int(np.argmax(values))
+    return best - max_lag, _prominence(values, best)
+
+def local_offset(envelope: np.ndarray, cues: np.ndarray, start: int, end: int, center: int,
+                 radius: int) -> Optional[Tuple[int, float]]:
+    """Offset of the cue window [start, end) searched within center ± radius"""
+    segment = cues[start:end]
+    low, high = max(start + center - radius, 0), min(end + center + radius, len(envelope))
+    region = envelope[low:high]
+    if len(region) <= len(segment) or not segment.any() or segment.all():
+        return None
+    correlation = _correlate(_standardise(region), _standardise(segment))[:len(region) - len(segment) + 1]
+    best = int(np.argmax(correlation))
+    return low + best - start, _prominence(correlation, best)
+
+def analyze_sync(video_path: str, subtitle_path: str, max_offset: float) -> Dict:
+    """Offset and drift of a subtitle file against the film's speech; runs in an analysis worker process"""
+    cues = load_cues(subtitle_path)
+    if len(cues) < 20:
+        return {'status': 'unreliable', 'reason': 'too few cues'}
+
+    envelope = speech_envelope(decode_speech_band(video_path))
+    max_lag = int(max_offset * ENVELOPE_RATE)
+    best = None
+    for ratio in FRAMERATE_RATIOS:
+        scaled = [{'start_time': cue['start_time'] * ratio, 'end_time': cue['end_time'] * ratio} for cue in cues]
+        cues_on = cue_signal(scaled, len(envelope))
+        lag, prominence = global_offset(envelope, cues_on, max_lag)
+        if best is None or prominence > best[2]:
+            best = (ratio, lag, prominence, cues_on, scaled)
+    ratio, lag, prominence, cues_on, scaled = best
+    if prominence < MIN_PROMINENCE:
+        return {'status': 'unreliable', 'reason': 'no clear alignment', 'prominence': round(prominence, 2)}
+
+    # Per-window offsets across the dialogue span reveal remaining drift or cut scenes
+    first, last = int(scaled[0]['start_time'] * ENVELOPE_RATE), int(scaled[-1]['end_time'] * ENVELOPE_RATE)
+    bounds = np.linspace(first, min(last, len(envelope)), DRIFT_WINDOWS + 1).astype(int)
+    radius = int(LOCAL_RADIUS_SECONDS * ENVELOPE_RATE)
+    points = []
+    for start, end in zip(bounds[:-1], bounds[1:]):
+        local = local_offset(envelope, cues_on, start, end, lag, radius)
+        if local and local[1] >= MIN_PROMINENCE / 2:
+            points.append(((start + end) / 2 / ENVELOPE_RATE, local[0] / ENVELOPE_RATE))
+
+    # Window times are on the rescaled timeline: t' = t * ratio + offset(t * ratio)
+    offset, stretch, anchors = lag / ENVELOPE_RATE, ratio, []
+    if len(points) >= 3:
+        times, offsets = np.array(points).T
+        slope, intercept = np.polyfit(times, offsets, 1)
+        residual = float(np.abs(offsets - (slope * times + intercept)).max())
+        if residual <= MAX_LINEAR_RESIDUAL:
+            offset, stretch = float(intercept), float(ratio * (1 + slope))
+        else:
+            offset, anchors = 0.0, [[round(float(t) / ratio, 2), round(float(o), 3)] for t, o in points]
+
+    span = cues[-1]['end_time']
+    largest = max([abs(offset), abs(offset + (stretch - 1) * span)] + [abs(o) for _, o in anchors])
+    return {
+        'status': 'synced' if largest >= MIN_CORRECTION_SECONDS else 'in_sync',
+        'offset': round(offset, 3),
+        'stretch': round(stretch, 6),
+        'anchors': anchors,
+        'windows': len(points),
+        'prominence': round(prominence, 2)
+    }
+
+class SubtitleSync:
+    """Background batch that aligns each sidecar subtitle once and stores the correction"""
+
+    def __init__(self, pool, get_entry: Callable[[str], Optional[Dict]], timing_store,
+                 on_update: Optional[Callable[[], None]] = None, max_offset: Optional[float] = None):
+        self.pool = pool
+        self.get_entry = get_entry
+        self.timing_store = timing_store
+        self.on_update = on_update
+        self.max_offset = max_offset or float(os.getenv('SUBSYNC_MAX_OFFSET_SECONDS', '60'))
+
+    @staticmethod
+    def signature(subtitle_path: str, media_entry: Dict) -> str:
+        stat = os.stat(subtitle_path)
+        return f"{media_entry.get('file_hash')}:{stat.st_size}:{stat.st_mtime}"
+
+    def enqueue(self, media_entry: Dict) -> int:
+        item = media_entry['filepath']
+        if not os.path.exists(item):
+            return 0
+        queued = 0
+        for subtitle in dict.fromkeys(media_entry.get('subtitles', [])):
+            if not subtitle.lower().endswith(('.srt', '.vtt')) or not os.path.exists(subtitle):
+                continue
+            signature = self.signature(subtitle, media_entry)
+            if media_entry.get('subtitle_sync', {}).get(subtitle, {}).get('signature') == signature:
+                continue
+            queued += self.pool.submit(
+                f"subsync:{subtitle}", 'subsync', analyze_sync, item, subtitle, self.max_offset,
+                on_done=lambda result, item=item, subtitle=subtitle, signature=signature:
+                    self._store(item, subtitle, signature, result)
+            )
+        return queued
+
+    def _store(self, item: str, subtitle: str, signature: str, result: Dict):
+        entry = self.get_entry(item)
+        if not entry or not os.path.exists(subtitle) or self.signature(subtitle, entry) != signature:
+            return
+        entry.setdefault('subtitle_sync', {})[subtitle] = dict(result, signature=signature)
+
+        # Manual adjustments always win over automatic ones
+        current = self.timing_store.get(subtitle)
+        if not current or current.get('source') == 'auto':
+            if result['status'] == 'synced':
+                self.timing_store.set(subtitle, normalise_timing(result['offset'], result['stretch'],
+                                                                 result['anchors'], source='auto'))
+                print(f"🎯 Synced {os.path.basename(subtitle)}: offset {result['offset']:+.2f}s, "
+                      f"stretch {result['stretch']:.5f}")
+            elif result['status'] == 'in_sync' and current:
+                self.timing_store.set(subtitle, None)
+        if self.on_update:
+            self.on_update()
+
+    def on_media_added(self, media_entry: Dict):
+        self.enqueue(media_entry)
+
+    def enqueue_missing(self, library: Dict) -> int:
+        return sum(self.enqueue(entry) for category in ['movies', 'tv_shows', 'videos']
+                   for entry in library.get(category, {}).values())
@@ -0,0 +1,160 @@
+"""
+Trickplay - seek-preview sprite sheets and a WebVTT thumbnails track
+Frames are extracted in one ffmpeg pass, tiled with Pillow and cached by file_hash,
+so a file is only processed again when it changes.
+"""
+
+import os
+import json
+import shutil
+import tempfile
+import subprocess
+from pathlib import Path
+from typing import Dict, Optional
+
+from PIL import Image
+
+MANIFEST_NAME = 'manifest.json'
+VTT_NAME = 'thumbnails.vtt'
+
+def _vtt_time(seconds: float) -> str:
+    ms = int(round(seconds * 1000))
+    return f"{ms // 3600000:02d}:{ms // 60000 % 60:02d}:{ms // 1000 % 60:02d}.{ms % 1000:03d}"
+
+def build_trickplay(video_path: str, output_dir: str, interval: float, width: int, columns: int,
+                    rows: int, image_format: str = 'jpg', quality: int = 70) -> Dict:
+    """Extract one frame per `interval` seconds and tile them into sprite sheets
+
+    Runs in an analysis worker process. Writes sprite_N.<format>, thumbnails.vtt and,
+    last, manifest.json into output_dir.
+    """
+    output = Path(output_dir)
+    output.mkdir(parents=True, exist_ok=True)
+
+    with tempfile.TemporaryDirectory(dir=str(output.parent)) as frames_dir:
+        # Decoding only keyframes is far cheaper and precise enough for previews
+        cmd = [
+            'ffmpeg', '-nostdin', '-v', 'error', '-skip_frame', 'nokey', '-i', video_path,
+            '-map', '0:v:0', '-an', '-sn', '-threads', '1',
+            '-vf', f"fps=1/{interval},scale={width}:-2",
+            '-vsync', 'vfr', '-q:v', '5',
+            os.path.join(frames_dir, 'frame_%06d.jpg')
+        ]
+        result = subprocess.run(cmd, capture_output=True, text=True)
+        if result.returncode != 0:
+            raise RuntimeError(f"ffmpeg failed: {result.stderr.strip()[:200]}")
+
+        frames = sorted(Path(frames_dir).glob('frame_*.jpg'))
+        if not frames:
+            raise RuntimeError("No frames extracted")
+
+        with Image.open(frames[0]) as first:
+            tile_width, tile_height = first.size
+
+        per_sheet = columns * rows
+        cues = []
+        sheets = 0
+        for sheet_start in range(0, len(frames), per_sheet):
+            batch = frames[sheet_start:sheet_start + per_sheet]
+            sheet_rows = (len(batch) + columns - 1) // columns
+            sheet = Image.new('RGB', (tile_width * min(columns, len(batch)), tile_height * sheet_rows))
+            sheet_name = f"sprite_{sheets}.{image_format}"
+
+            for i, frame_path in enumerate(batch):
+                x, y = (i % columns) * tile_width, (i // columns) * tile_height
+                with Image.open(frame_path) as frame:
+                    if frame.size != (tile_width, tile_height):
+                        frame = frame.resize((tile_width, tile_height))
+                    sheet.paste(frame, (x, y))
+                start = (sheet_start + i) * interval
+                cues.append(f"{_vtt_time(start)} --> {_vtt_time(start + interval)}\n"
+                            f"{sheet_name}#xywh={x},{y},{tile_width},{tile_height}")
+
+            save_format = 'WEBP' if image_format == 'webp' else 'JPEG'
+            sheet.save(output / sheet_name, save_format, quality=quality)
+            sheets += 1
+
+    with open(output / VTT_NAME, 'w', encoding='utf-8') as f:
+        f.write('WEBVTT\n\n' + '\n\n'.join(cues) + '\n')
+
+    manifest = {
+        'video_path': video_path,
+        'interval': interval,
+        'thumbnails': len(frames),
+        'sprites': sheets,
+        'tile_width': tile_width,
+        'tile_height': tile_height,
+        'columns': columns,
+        'rows': rows,
+        'format': image_format
+    }
+    with open(output / MANIFEST_NAME, 'w') as f:
+        json.dump(manifest, f)
+    return manifest
+
+class TrickplayGenerator:
+    """Queues sprite generation for new library items and serves the results"""
+
+    def __init__(self, pool, output_dir: Optional[str] = None, interval: Optional[float] = None,
+                 width: Optional[int] = None, columns: int = 10, rows: int = 10,
+                 image_format: Optional[str] = None):
+        self.pool = pool
+        self.output_dir = Path(output_dir or os.getenv('TRICKPLAY_DIR', './data/trickplay'))
+        self.interval = interval or float(os.getenv('TRICKPLAY_INTERVAL', '10'))
+        self.width = width or int(os.getenv('TRICKPLAY_WIDTH', '320'))
+        self.columns = columns
+        self.rows = rows
+        self.image_format = (image_format or os.getenv('TRICKPLAY_FORMAT', 'jpg')).lower()
+        self.output_dir.mkdir(parents=True, exist_ok=True)
+
+    def output_dir_for(self, file_hash: str) -> Path:
+        return self.output_dir / file_hash
+
+    def get_manifest(self, file_hash: str) -> Optional[Dict]:
+        manifest_path = self.output_dir_for(file_hash) / MANIFEST_NAME
+        if not manifest_path.exists():
+            return None
+        with open(manifest_path, 'r') as f:
+            return json.load(f)
+
+    def enqueue(self, filepath: str, file_hash: str) -> bool:
+        if (self.output_dir_for(file_hash) / MANIFEST_NAME).exists():
+            return False
+        return self.pool.submit(
+            f"trickplay:{file_hash}", 'trickplay', build_trickplay,
+            filepath, str(self.output_dir_for(file_hash)), self.interval, self.width,
+            self.columns, self.rows, self.image_format,
+            on_done=lambda manifest: self.remove_stale(manifest['video_path'], file_hash)
+        )
+
+    def remove_stale(self, filepath: str, file_hash: str) -> int:
+        """Delete sprites of earlier versions of a file once its current sprites are written"""
+        removed = 0
+        for manifest_path in self.output_dir.glob(f"*/{MANIFEST_NAME}"):
+            if manifest_path.parent.name == file_hash:
+                continue
+            try:
+                with open(manifest_path, 'r') as f:
+                    stale = json.load(f).get('video_path') == filepath
+            except (OSError, ValueError):
+                continue
+            if stale:
+                shutil.rmtree(manifest_path.parent, ignore_errors=True)
+                removed += 1
+        return removed
+
+    def on_media_added(self, media_entry: Dict):
+        """Scanner listener for new or changed files"""
+        self.enqueue(media_entry['filepath'], media_entry['file_hash'])
+
+    def on_media_removed(self, media_entry: Dict):
+        shutil.rmtree(self.output_dir_for(media_entry['file_hash']), ignore_errors=True)
+
+    def enqueue_missing(self, library: Dict) -> int:
+        """Queue every library item without sprites, e.g. after startup"""
+        queued = 0
+        for category in ['movies', 'tv_shows', 'videos']:
+            for filepath, item in library.get(category, {}).items():
+                if item.get('file_hash') and os.path.exists(filepath):
+                    queued += self.enqueue(filepath, item['file_hash'])
+        return queued
@@ -1,13 +1,16 @@
 import os
 import json
 import asyncio
+import time
 import hashlib
 from pathlib import Path
-from typing import Dict, List, Optional
+from typing import Callable, Dict, List, Optional
 from watchdog.observers import Observer
 from watchdog.events import FileSystemEventHandler
 import tmdbsimple as tmdb
 from dotenv import load_dotenv
+from monitoring import metrics
+from subtitle_engine.stats import STATS_VERSION, order_subtitles, signature as subtitle_signature, subtitle_stats
 
 load_dotenv()
 tmdb.API_KEY = os.getenv('TMDB_API_KEY')
@@ -29,9 +32,39 @@ class MediaScanner:
     def __init__(self, watched_directories: List[str]):
         self.watched_dirs = [d.strip() for d in watched_directories if d.strip()]
         self.observer = Observer()
-        self.library_file = "data/media_library.json"
+        self.library_file = os.getenv('MEDIA_LIBRARY_FILE', "data/media_library.json")
         self.library_data = self.load_library()
+        # Scan-time subtitle stats by subtitle path, so info requests never touch disk
+        self.subtitle_index: Dict[str, Dict] = {
+            path: stats for category in ['movies', 'tv_shows', 'videos']
+            for entry in self.library_data.get(category, {}).values()
+            for path, stats in entry.get('subtitle_stats', {}).items()
+        }
+        self.added_listeners: List[Callable[[Dict], None]] = []
+        self.removed_listeners: List[Callable[[Dict], None]] = []
+        self.subtitles_changed_listeners: List[Callable[[Dict], None]] = []
+        
+    def add_listener(self, on_added: Optional[Callable[[Dict], None]] = None,
+                     on_removed: Optional[Callable[[Dict], None]] = None,
+                     on_subtitles_changed: Optional[Callable[[Dict], None]] = None):
+        """Register callbacks for new/changed and removed library entries (called on the event loop)
         
+        `on_subtitles_changed` fires for an unchanged media file whose subtitle files were edited.
+        """
+        if on_added:
+            self.added_listeners.append(on_added)
+        if on_removed:
+            self.removed_listeners.append(on_removed)
+        if on_subtitles_changed:
+            self.subtitles_changed_listeners.append(on_subtitles_changed)
+    
+    def _notify(self, listeners: List[Callable[[Dict], None]], media_entry: Dict):
+        for listener in listeners:
+            try:
+                listener(media_entry)
+            except Exception as e:
+                print(f"❌ Library listener failed for {media_entry.get('filepath')}: {e}")
+    
     def load_library(self) -> Dict:
         """Load existing library data"""
         try:
@@ -173,7 +206,28 @@ class MediaScanner:
             if subtitle_file.suffix.lower() in subtitle_extensions:
                 subtitles.append(str(subtitle_file))
         
-        return subtitles
+        # Preferred languages first by file name tag (Movie.en.srt); the scan refines this by content
+        return order_subtitles(subtitles)
+    
+    def collect_subtitle_stats(self, subtitles: List[str], previous: Optional[Dict] = None) -> Dict[str, Dict]:
+        """Stats for each subtitle file, recomputed only for files whose mtime or size changed"""
+        previous = previous or {}
+        collected = {}
+        for path in dict.fromkeys(subtitles):
+            try:
+                known = previous.get(path)
+                current = known and known.get('version') == STATS_VERSION and \
+                    known.get('signature') == subtitle_signature(path)
+                collected[path] = known if current else subtitle_stats(path)
+            except OSError as e:
+                print(f"⚠️ Could not read subtitle {path}: {e}")
+                continue
+            self.subtitle_index[path] = collected[path]
+        return collected
+    
+    def get_subtitle_stats(self, subtitle_path: str) -> Optional[Dict]:
+        """Scan-time stats of a subtitle file, or None if it is not in the library"""
+        return self.subtitle_index.get(subtitle_path)
     
     async def process_new_file(self, filepath: str):
         """Process a newly discovered media file"""
@@ -184,13 +238,22 @@ class MediaScanner:
             file_hash = self.get_file_hash(filepath)
             content_type, basic_info = self.detect_content_type(filepath)
             
-            # Skip if already processed and unchanged
-            if filepath in self.library_data.get(f"{content_type}s", {}) and \
-               self.library_data[f"{content_type}s"][filepath].get('file_hash') == file_hash:
+            # Skip if already processed and unchanged, apart from refreshing edited subtitles
+            existing = self.library_data.get(f"{content_type}s", {}).get(filepath)
+            if existing and existing.get('file_hash') == file_hash:
+                before = {path: stats.get('signature') for path, stats in existing.get('subtitle_stats', {}).items()}
+                existing['subtitle_stats'] = self.collect_subtitle_stats(existing.get('subtitles', []),
+                                                                         existing.get('subtitle_stats'))
+                existing['subtitles'] = order_subtitles(existing.get('subtitles', []), existing['subtitle_stats'])
+                if before != {path: stats.get('signature') for path, stats in existing['subtitle_stats'].items()}:
+                    self.save_library()
+                    self._notify(self.subtitles_changed_listeners, existing)
                 return
             
             # Find subtitles
             subtitles = self.find_subtitles(filepath)
+            stats_by_path = self.collect_subtitle_stats(subtitles, existing.get('subtitle_stats') if existing else None)
+            subtitles = order_subtitles(subtitles, stats_by_path)
             
             # Fetch metadata
             search_title = basic_info.get('show_name', basic_info.get('title', ''))
@@ -202,6 +265,7 @@ class MediaScanner:
                 'file_hash': file_hash,
                 'content_type': content_type,
                 'subtitles': subtitles,
+                'subtitle_stats': stats_by_path,
                 'metadata': metadata,
                 'basic_info': basic_info,
                 'added_date': asyncio.get_event_loop().time(),
@@ -216,6 +280,7 @@ class MediaScanner:
             
             self.library_data[category][filepath] = media_entry
             self.save_library()
+            self._notify(self.added_listeners, media_entry)
             
             print(f"✅ Added {content_type}: {search_title}")
             
@@ -226,8 +291,11 @@ class MediaScanner:
         """Remove deleted file from library"""
         for category in ['movies', 'tv_shows', 'videos']:
             if filepath in self.library_data[category]:
-                del self.library_data[category][filepath]
+                media_entry = self.library_data[category].pop(filepath)
+                for subtitle in media_entry.get('subtitle_stats', {}):
+                    self.subtitle_index.pop(subtitle, None)
                 self.save_library()
+                self._notify(self.removed_listeners, media_entry)
                 print(f"🗑️ Removed from library: {filepath}")
                 break
     
@@ -236,6 +304,8 @@ class MediaScanner:
         print("🔍 Starting initial media library scan...")
         
         video_extensions = {'.mp4', '.mkv', '.avi', '.mov', '.m4v', '.wmv', '.flv', '.webm'}
+        scan_started = time.perf_counter()
+        files_scanned = 0
         
         for watch_dir in self.watched_dirs:
             if not os.path.exists(watch_dir):
@@ -249,10 +319,16 @@ class MediaScanner:
                     if Path(file).suffix.lower() in video_extensions:
                         filepath = os.path.join(root, file)
                         await self.process_new_file(filepath)
+                        files_scanned += 1
         
         self.library_data['last_scan'] = asyncio.get_event_loop().time()
         self.save_library()
-        print("✅ Initial scan completed!")
+        
+        scan_seconds = time.perf_counter() - scan_started
+        metrics.scan_duration.observe(scan_seconds)
+        metrics.scan_files.inc(files_scanned)
+        metrics.scan_files_per_second.set(files_scanned / scan_seconds if scan_seconds else 0)
+        print(f"✅ Initial scan completed! ({files_scanned} files in {scan_seconds:.1f}s)")
     
     async def start_monitoring(self):
         """Start monitoring watched directories"""
@@ -280,6 +356,14 @@ class MediaScanner:
         """Get current library data"""
         return self.library_data
     
+    def get_entry(self, filepath: str) -> Optional[Dict]:
+        """Library entry of a media file in any category"""
+        for category in ['movies', 'tv_shows', 'videos']:
+            entry = self.library_data.get(category, {}).get(filepath)
+            if entry:
+                return entry
+        return None
+    
     def search_library(self, query: str) -> List[Dict]:
         """Search library for matching content"""
         results = []
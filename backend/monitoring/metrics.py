@@ -0,0 +1,188 @@
+"""
+Metrics - dependency-free counters, gauges and histograms in Prometheus text format
+Every update is a dict lookup and an add under a lock, cheap enough to leave on in production.
+"""
+
+import asyncio
+import threading
+from bisect import bisect_left
+from typing import Dict, List, Optional, Tuple
+
+# Latency buckets in seconds, from fast API calls to slow LLM generations
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+
+def _label_key(labels: Dict[str, str]) -> Tuple:
+    return tuple(sorted((name, str(value)) for name, value in labels.items()))
+
+def _format_labels(key: Tuple, extra: Optional[Tuple] = None) -> str:
+    pairs = list(key) + list(extra or ())
+    if not pairs:
+        return ''
+    escaped = []
+    for name, value in pairs:
+        value = str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+        escaped.append(f'{name}="{value}"')
+    return '{' + ','.join(escaped) + '}'
+
+class _Metric:
+    kind = ''
+
+    def __init__(self, name: str, description: str):
+        self.name = name
+        self.description = description
+        self._lock = threading.Lock()
+
+    def _header(self) -> List[str]:
+        return [f"# HELP {self.name} {self.description}", f"# TYPE {self.name} {self.kind}"]
+
+class Counter(_Metric):
+    """Monotonically increasing value per label set"""
+    kind = 'counter'
+
+    def __init__(self, name: str, description: str):
+        super().__init__(name, description)
+        self._values: Dict[Tuple, float] = {}
+
+    def inc(self, amount: float = 1, **labels):
+        key = _label_key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def get(self, **labels) -> float:
+        return self._values.get(_label_key(labels), 0)
+
+    def render(self) -> List[str]:
+        with self._lock:
+            values = list(self._values.items())
+        return self._header() + [f"{self.name}{_format_labels(key)} {value}" for key, value in values]
+
+class Gauge(Counter):
+    """Value that can go up and down per label set"""
+    kind = 'gauge'
+
+    def set(self, value: float, **labels):
+        key = _label_key(labels)
+        with self._lock:
+            self._values[key] = value
+
+    def dec(self, amount: float = 1, **labels):
+        self.inc(-amount, **labels)
+
+class Histogram(_Metric):
+    """Bucketed distribution of observations per label set"""
+    kind = 'histogram'
+
+    def __init__(self, name: str, description: str, buckets: Tuple[float, ...] = DEFAULT_BUCKETS):
+        super().__init__(name, description)
+        self.buckets = tuple(sorted(buckets))
+        self._series: Dict[Tuple, List] = {}
+
+    def observe(self, value: float, **labels):
+        key = _label_key(labels)
+        index = bisect_left(self.buckets, value)
+        with self._lock:
+            series = self._series.get(key)
+            if series is None:
+                # Per-bucket counts (plus +Inf), sum, count
+                series = self._series[key] = [[0] * (len(self.buckets) + 1), 0.0, 0]
+            series[0][index] += 1
+            series[1] += value
+            series[2] += 1
+
+    def render(self) -> List[str]:
+        with self._lock:
+            series_items = [(key, (list(series[0]), series[1], series[2])) for key, series in self._series.items()]
+        lines = self._header()
+        for key, (counts, total, count) in series_items:
+            cumulative = 0
+            for bound, bucket_count in zip(list(self.buckets) + ['+Inf'], counts):
+                cumulative += bucket_count
+                lines.append(f"{self.name}_bucket{_format_labels(key, (('le', bound),))} {cumulative}")
+            lines.append(f"{self.name}_sum{_format_labels(key)} {total}")
+            lines.append(f"{self.name}_count{_format_labels(key)} {count}")
+        return lines
+
+class MetricsRegistry:
+    """Holds every metric and renders the exposition text"""
+
+    def __init__(self):
+        self._metrics: Dict[str, _Metric] = {}
+
+    def _register(self, metric: _Metric) -> _Metric:
+        return self._metrics.setdefault(metric.name, metric)
+
+    def counter(self, name: str, description: str) -> Counter:
+        return self._register(Counter(name, description))
+
+    def gauge(self, name: str, description: str) -> Gauge:
+        return self._register(Gauge(name, description))
+
+    def histogram(self, name: str, description: str, buckets: Tuple[float, ...] = DEFAULT_BUCKETS) -> Histogram:
+        return self._register(Histogram(name, description, buckets))
+
+    def render(self) -> str:
+        lines = []
+        for metric in self._metrics.values():
+            lines.extend(metric.render())
+        return '\n'.join(lines) + '\n'
+
+registry = MetricsRegistry()
+
+# HTTP
+http_request_duration = registry.histogram('http_request_duration_seconds', 'HTTP request latency by route')
+http_requests = registry.counter('http_requests_total', 'HTTP requests by route and status')
+
+# Media streaming
+stream_bytes = registry.counter('media_stream_bytes_total', 'Bytes sent by media streaming endpoints')
+active_streams = registry.gauge('media_active_streams', 'Media streams currently being sent')
+remux_processes = registry.gauge('media_remux_processes', 'ffmpeg remux processes currently running')
+remux_cache_requests = registry.counter('media_remux_cache_requests_total', 'Remux segment cache lookups by result')
+
+# Library scanning
+scan_duration = registry.histogram('library_scan_duration_seconds', 'Duration of full library scans',
+                                   buckets=(1, 5, 15, 30, 60, 120, 300, 600, 1800, 3600))
+scan_files = registry.counter('library_scan_files_total', 'Media files visited by library scans')
+scan_files_per_second = registry.gauge('library_scan_files_per_second', 'Files per second of the last library scan')
+
+# Caption transformation
+caption_cache_requests = registry.counter('caption_cache_requests_total', 'Caption transform cache lookups by result')
+ollama_queue_depth = registry.gauge('ollama_queue_depth', 'Cues waiting for or being processed by Ollama')
+ollama_requests = registry.counter('ollama_requests_total', 'Ollama generate calls by model and outcome')
+ollama_request_duration = registry.histogram('ollama_request_duration_seconds', 'Ollama generate call latency by model')
+
+# Event loop
+event_loop_lag = registry.histogram('event_loop_lag_seconds', 'Delay of event loop wake-ups beyond their schedule',
+                                    buckets=(0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 5.0))
+event_loop_lag_max = registry.gauge('event_loop_lag_max_seconds', 'Worst event loop lag in the last sampling window')
+
+def cache_hit_ratio() -> Optional[float]:
+    """Caption cache hit ratio since startup"""
+    hits = caption_cache_requests.get(result='hit')
+    total = hits + caption_cache_requests.get(result='miss')
+    return hits / total if total else None
+
+async def monitor_event_loop_lag(interval: float = 0.5, window: int = 20):
+    """Sample how late the loop wakes a sleeping task; run as a background task"""
+    loop = asyncio.get_running_loop()
+    worst = 0.0
+    samples = 0
+    while True:
+        scheduled = loop.time() + interval
+        await asyncio.sleep(interval)
+        lag = max(0.0, loop.time() - scheduled)
+        event_loop_lag.observe(lag)
+        worst = max(worst, lag)
+        samples += 1
+        if samples >= window:
+            event_loop_lag_max.set(worst)
+            worst, samples = 0.0, 0
+
+def render_metrics() -> str:
+    """Exposition text for the /metrics endpoint"""
+    ratio = cache_hit_ratio()
+    text = registry.render()
+    if ratio is not None:
+        text += ("# HELP caption_cache_hit_ratio Caption transform cache hit ratio since startup\n"
+                 "# TYPE caption_cache_hit_ratio gauge\n"
+                 f"caption_cache_hit_ratio {ratio}\n")
+    return text
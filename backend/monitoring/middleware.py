@@ -0,0 +1,34 @@
+"""
+Metrics middleware - plain ASGI so streamed media bodies pass through untouched
+"""
+
+import time
+from monitoring import metrics
+
+class MetricsMiddleware:
+    """Records latency to response start, status and static media bytes per route template"""
+
+    def __init__(self, app, static_prefix: str = "/media"):
+        self.app = app
+        self.static_prefix = static_prefix
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        started = time.perf_counter()
+        is_static = scope["path"].startswith(self.static_prefix + "/")
+
+        async def send_wrapper(message):
+            if message["type"] == "http.response.start":
+                route = scope.get("route")
+                route_path = self.static_prefix if is_static else getattr(route, "path", None) or "unmatched"
+                metrics.http_request_duration.observe(time.perf_counter() - started,
+                                                      route=route_path, method=scope["method"])
+                metrics.http_requests.inc(route=route_path, method=scope["method"], status=message["status"])
+            elif message["type"] == "http.response.body" and is_static:
+                metrics.stream_bytes.inc(len(message.get("body", b"")), route=self.static_prefix)
+            await send(message)
+
+        await self.app(scope, receive, send_wrapper)
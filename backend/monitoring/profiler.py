@@ -0,0 +1,86 @@
+"""
+Sampling Profiler - captures stacks of the live server for flamegraphs
+Output is the folded-stack format ("frame;frame;frame count") understood by
+flamegraph.pl, speedscope and inferno.
+"""
+
+import os
+import sys
+import time
+import threading
+from collections import Counter
+from typing import Dict, Optional
+
+# Leaf frames that mean a thread is parked rather than running Python or C code
+IDLE_FRAMES = {
+    ('selectors.py', 'select'),
+    ('threading.py', 'wait'),
+    ('threading.py', '_wait_for_tstate_lock'),
+    ('queue.py', 'get'),
+    ('socket.py', 'accept'),
+    ('ssl.py', 'read'),
+    ('thread.py', '_worker'),
+    ('subprocess.py', '_communicate'),
+    ('subprocess.py', '_wait'),
+}
+
+class SamplingProfiler:
+    """Periodically snapshots every thread's stack from a background thread"""
+
+    def __init__(self, interval: float = 0.005):
+        self.interval = interval
+        self._lock = threading.Lock()
+
+    def _frame_label(self, frame) -> str:
+        code = frame.f_code
+        return f"{code.co_name} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})"
+
+    def _is_idle(self, frame) -> bool:
+        code = frame.f_code
+        return (os.path.basename(code.co_filename), code.co_name) in IDLE_FRAMES
+
+    def profile(self, seconds: float, mode: str = 'wall', thread_id: Optional[int] = None) -> Dict:
+        """Sample for `seconds` and return folded stacks
+
+        `wall` counts every sample; `cpu` drops samples whose leaf frame is a known idle wait,
+        approximating on-CPU time without OS support. `thread_id` limits sampling to one thread.
+        """
+        if mode not in ('wall', 'cpu'):
+            raise ValueError(f"Unsupported profile mode: {mode}")
+
+        # One profile at a time; overlapping samplers would skew each other
+        if not self._lock.acquire(blocking=False):
+            raise RuntimeError("A profile is already running")
+
+        try:
+            own_thread = threading.get_ident()
+            thread_names = {thread.ident: thread.name for thread in threading.enumerate()}
+            stacks = Counter()
+            samples = 0
+            deadline = time.monotonic() + seconds
+
+            while time.monotonic() < deadline:
+                for ident, frame in sys._current_frames().items():
+                    if ident == own_thread or (thread_id is not None and ident != thread_id):
+                        continue
+                    if mode == 'cpu' and self._is_idle(frame):
+                        continue
+
+                    labels = []
+                    while frame is not None:
+                        labels.append(self._frame_label(frame))
+                        frame = frame.f_back
+                    labels.append(thread_names.get(ident, f"thread-{ident}"))
+                    stacks[';'.join(reversed(labels))] += 1
+                samples += 1
+                time.sleep(self.interval)
+
+            return {
+                'mode': mode,
+                'seconds': seconds,
+                'samples': samples,
+                'interval': self.interval,
+                'folded': '\n'.join(f"{stack} {count}" for stack, count in stacks.most_common())
+            }
+        finally:
+            self._lock.release()
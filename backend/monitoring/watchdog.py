@@ -0,0 +1,77 @@
+"""
+Loop Watchdog - records where the event loop was stuck whenever it stops responding
+A heartbeat callback runs on the loop; a separate thread notices when the heartbeat
+goes stale and snapshots the loop thread's stack while the blocking call is still running.
+"""
+
+import sys
+import time
+import threading
+import traceback
+from collections import deque
+from typing import Dict, List, Optional
+
+class LoopWatchdog:
+    """Debug-mode detector for blocking calls inside async handlers"""
+
+    def __init__(self, threshold: float = 0.1, max_events: int = 100):
+        self.threshold = threshold
+        self.interval = max(threshold / 4, 0.005)
+        self.events = deque(maxlen=max_events)
+        self.loop = None
+        self.loop_thread_id = None
+        self._last_beat = time.monotonic()
+        self._current_event: Optional[Dict] = None
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self._heartbeat = None
+
+    def start(self, loop):
+        """Start watching `loop`; must be called from the loop's own thread"""
+        self.loop = loop
+        self.loop_thread_id = threading.get_ident()
+        self._last_beat = time.monotonic()
+        self._heartbeat = loop.call_soon(self._beat)
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._watch, name="loop-watchdog", daemon=True)
+        self._thread.start()
+        print(f"🐕 Event loop watchdog active (threshold {self.threshold * 1000:.0f}ms)")
+
+    def stop(self):
+        self._stop.set()
+        if self._heartbeat:
+            self._heartbeat.cancel()
+        if self._thread:
+            self._thread.join(timeout=1)
+
+    def _beat(self):
+        self._last_beat = time.monotonic()
+        self._heartbeat = self.loop.call_later(self.interval, self._beat)
+
+    def _watch(self):
+        while not self._stop.wait(self.interval):
+            stalled_for = time.monotonic() - self._last_beat
+
+            if stalled_for > self.threshold and self._current_event is None:
+                frame = sys._current_frames().get(self.loop_thread_id)
+                self._current_event = {
+                    'detected_at': time.time(),
+                    'blocked_seconds': round(stalled_for, 3),
+                    'stack': traceback.format_stack(frame) if frame else []
+                }
+                self.events.append(self._current_event)
+            elif self._current_event is not None:
+                if stalled_for > self.threshold:
+                    self._current_event['blocked_seconds'] = round(stalled_for, 3)
+                else:
+                    # Loop is responsive again; log where the stall happened
+                    location = self._current_event['stack'][-1].strip().splitlines()[0] if self._current_event['stack'] else 'unknown'
+                    print(f"🐢 Event loop blocked for {self._current_event['blocked_seconds'] * 1000:.0f}ms at {location}")
+                    self._current_event = None
+
+    def get_events(self) -> List[Dict]:
+        """Recorded stalls, most recent last"""
+        return list(self.events)
+
+    def clear(self):
+        self.events.clear()
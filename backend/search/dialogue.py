@@ -0,0 +1,227 @@
+"""
+Dialogue Index - library-wide full-text search over subtitle cues
+Cues live in SQLite with an FTS5 index (bm25 ranking, snippets, prefix indexes).
+Subtitles are re-indexed only when their size or mtime changes.
+"""
+
+import os
+import re
+import sqlite3
+import asyncio
+import threading
+from pathlib import Path
+from urllib.parse import quote
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List, Optional
+
+from media_analysis.signals import load_cues
+from streaming.remux import REMUX_EXTENSIONS
+
+INDEXED_EXTENSIONS = ('.srt', '.vtt')
+QUERY_TOKEN = re.compile(r'"([^"]*)"|(\S+)')
+WORD = re.compile(r'\w+')
+# Start playback a moment before the line so the scene has context
+LEAD_IN_SECONDS = 2.0
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS subtitles (
+    id INTEGER PRIMARY KEY,
+    item TEXT NOT NULL,
+    path TEXT NOT NULL,
+    title TEXT,
+    size INTEGER,
+    mtime REAL,
+    UNIQUE (item, path)
+);
+CREATE TABLE IF NOT EXISTS cue_rows (
+    id INTEGER PRIMARY KEY,
+    subtitle_id INTEGER NOT NULL,
+    cue_index INTEGER NOT NULL,
+    start_time REAL NOT NULL,
+    end_time REAL NOT NULL,
+    text TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS cue_rows_subtitle ON cue_rows (subtitle_id);
+CREATE VIRTUAL TABLE IF NOT EXISTS cues_fts USING fts5(
+    text, content='cue_rows', content_rowid='id',
+    tokenize='unicode61 remove_diacritics 2', prefix='2 3'
+);
+"""
+
+def build_match_query(query: str) -> Optional[str]:
+    """Translate user input into a safe FTS5 expression
+
+    "quoted words" are phrases, a trailing * makes a prefix query and everything
+    else is ANDed. FTS5 operators typed by the user are treated as plain words.
+    """
+    terms = []
+    for phrase, word in QUERY_TOKEN.findall(query):
+        words = WORD.findall(phrase or word)
+        if not words:
+            continue
+        term = '"' + ' '.join(words) + '"'
+        if word.endswith('*'):
+            term += '*'
+        terms.append(term)
+    return ' '.join(terms) or None
+
+def display_title(media_entry: Dict) -> str:
+    info = media_entry.get('basic_info', {})
+    if media_entry.get('content_type') == 'tv_show' and 'show_name' in info:
+        return f"{info['show_name']} S{info.get('season', 1):02d}E{info.get('episode', 1):02d}"
+    return info.get('title') or Path(media_entry['filepath']).stem
+
+def stream_link(item: str, seconds: float) -> str:
+    """Player URL that starts at `seconds`"""
+    start = round(max(0.0, seconds - LEAD_IN_SECONDS), 2)
+    url = f"/api/player/stream/{quote(item, safe='')}"
+    # Remuxed streams seek server-side; direct files use a media fragment
+    if Path(item).suffix.lower() in REMUX_EXTENSIONS:
+        return f"{url}?start={start}"
+    return f"{url}#t={start}"
+
+class DialogueIndex:
+    """FTS5 index of every cue of every text subtitle in the library"""
+
+    def __init__(self, db_path: Optional[str] = None):
+        self.db_path = Path(db_path or os.getenv('DIALOGUE_INDEX_PATH', './data/dialogue_index.db'))
+        self.db_path.parent.mkdir(parents=True, exist_ok=True)
+        self.connection = sqlite3.connect(str(self.db_path), check_same_thread=False)
+        self.connection.execute('PRAGMA journal_mode=WAL')
+        self.connection.execute('PRAGMA synchronous=NORMAL')
+        self.connection.executescript(SCHEMA)
+        self.lock = threading.Lock()
+        # WAL lets searches read from their own connection while a file is being indexed
+        self.reader = sqlite3.connect(str(self.db_path), check_same_thread=False)
+        self.reader_lock = threading.Lock()
+        # Indexing is serialised on one thread; searches run on the default executor
+        self.writer = ThreadPoolExecutor(max_workers=1, thread_name_prefix='dialogue-index')
+
+    def _delete_subtitle(self, subtitle_id: int):
+        self.connection.execute(
+            "INSERT INTO cues_fts (cues_fts, rowid, text) "
+            "SELECT 'delete', id, text FROM cue_rows WHERE subtitle_id = ?", (subtitle_id,)
+        )
+        self.connection.execute("DELETE FROM cue_rows WHERE subtitle_id = ?", (subtitle_id,))
+        self.connection.execute("DELETE FROM subtitles WHERE id = ?", (subtitle_id,))
+
+    def _index_subtitle(self, item: str, path: str, title: str, stat: os.stat_result):
+        try:
+            cues = load_cues(path)
+        except Exception as e:
+            print(f"⚠️ Could not index subtitles {path}: {e}")
+            cues = []
+        subtitle_id = self.connection.execute(
+            "INSERT INTO subtitles (item, path, title, size, mtime) VALUES (?, ?, ?, ?, ?)",
+            (item, path, title, stat.st_size, stat.st_mtime)
+        ).lastrowid
+        self.connection.executemany(
+            "INSERT INTO cue_rows (subtitle_id, cue_index, start_time, end_time, text) VALUES (?, ?, ?, ?, ?)",
+            [(subtitle_id, i, cue['start_time'], cue['end_time'], cue['text']) for i, cue in enumerate(cues) if cue['text']]
+        )
+        self.connection.execute(
+            "INSERT INTO cues_fts (rowid, text) SELECT id, text FROM cue_rows WHERE subtitle_id = ?", (subtitle_id,)
+        )
+
+    def index_item(self, media_entry: Dict) -> int:
+        """Bring one library item up to date; returns the number of subtitles (re)indexed"""
+        item = media_entry['filepath']
+        wanted = {}
+        for path in media_entry.get('subtitles', []):
+            if path.lower().endswith(INDEXED_EXTENSIONS) and os.path.exists(path):
+                wanted[path] = os.stat(path)
+
+        with self.lock, self.connection:
+            indexed = {path: (subtitle_id, size, mtime) for subtitle_id, path, size, mtime in self.connection.execute(
+                "SELECT id, path, size, mtime FROM subtitles WHERE item = ?", (item,))}
+            changed = 0
+            for path, (subtitle_id, size, mtime) in indexed.items():
+                stat = wanted.get(path)
+                if not stat or (stat.st_size, stat.st_mtime) != (size, mtime):
+                    self._delete_subtitle(subtitle_id)
+                else:
+                    wanted.pop(path)
+            for path, stat in wanted.items():
+                self._index_subtitle(item, path, display_title(media_entry), stat)
+                changed += 1
+        return changed
+
+    def remove_item(self, item: str):
+        with self.lock, self.connection:
+            for (subtitle_id,) in self.connection.execute("SELECT id FROM subtitles WHERE item = ?", (item,)).fetchall():
+                self._delete_subtitle(subtitle_id)
+
+    def sync(self, entries: List[Dict]) -> int:
+        """Index new or changed subtitles of all library entries and drop vanished items"""
+        items = {entry['filepath']: entry for entry in entries}
+        with self.lock:
+            known = {item for (item,) in self.connection.execute("SELECT DISTINCT item FROM subtitles")}
+        for item in known - items.keys():
+            self.remove_item(item)
+        changed = sum(self.index_item(entry) for entry in items.values())
+        if changed:
+            print(f"🔎 Dialogue index updated for {changed} subtitle files")
+        return changed
+
+    def search(self, query: str, limit: int = 20, offset: int = 0, item: Optional[str] = None) -> List[Dict]:
+        match = build_match_query(query)
+        if not match:
+            return []
+
+        sql = ("SELECT s.item, s.title, s.path, r.cue_index, r.start_time, r.end_time, "
+               "snippet(cues_fts, 0, '<mark>', '</mark>', '…', 16), bm25(cues_fts) "
+               "FROM cues_fts JOIN cue_rows r ON r.id = cues_fts.rowid JOIN subtitles s ON s.id = r.subtitle_id "
+               "WHERE cues_fts MATCH ?")
+        params: list = [match]
+        if item:
+            sql += " AND s.item = ?"
+            params.append(item)
+        sql += " ORDER BY rank LIMIT ? OFFSET ?"
+        params += [limit, offset]
+
+        with self.reader_lock:
+            rows = self.reader.execute(sql, params).fetchall()
+        return [{
+            'item': item_path,
+            'title': title,
+            'subtitle': subtitle_path,
+            'cue_index': cue_index,
+            'start_time': start_time,
+            'end_time': end_time,
+            'snippet': snippet,
+            'score': round(-rank, 3),
+            'url': stream_link(item_path, start_time)
+        } for item_path, title, subtitle_path, cue_index, start_time, end_time, snippet, rank in rows]
+
+    def get_stats(self) -> Dict:
+        with self.reader_lock:
+            items, subtitles = self.reader.execute("SELECT COUNT(DISTINCT item), COUNT(*) FROM subtitles").fetchone()
+            cues = self.reader.execute("SELECT COUNT(*) FROM cue_rows").fetchone()[0]
+        return {'items': items, 'subtitles': subtitles, 'cues': cues, 'path': str(self.db_path)}
+
+    def _run(self, func, *args) -> asyncio.Future:
+        future = asyncio.get_running_loop().run_in_executor(self.writer, func, *args)
+        # Listener calls drop the future, so failures would otherwise vanish
+        future.add_done_callback(lambda done, name=func.__name__: self._report_failure(name, done))
+        return future
+
+    def _report_failure(self, name: str, future: asyncio.Future):
+        if not future.cancelled() and future.exception():
+            print(f"❌ Dialogue index {name} failed: {future.exception()}")
+
+    def on_media_added(self, media_entry: Dict):
+        """Scanner listener; indexing happens off the event loop"""
+        self._run(self.index_item, media_entry)
+
+    def on_media_removed(self, media_entry: Dict):
+        self._run(self.remove_item, media_entry['filepath'])
+
+    def sync_in_background(self, library: Dict) -> asyncio.Future:
+        # Snapshot on the event loop; the scanner keeps mutating the library dicts
+        entries = [entry for category in ['movies', 'tv_shows', 'videos'] for entry in library.get(category, {}).values()]
+        return self._run(self.sync, entries)
+
+    def close(self):
+        self.writer.shutdown(wait=True)
+        self.connection.close()
+        self.reader.close()
@@ -0,0 +1,371 @@
+"""
+Semantic Index - scene search by meaning over embedded subtitle windows
+Windows of consecutive cues are embedded through Ollama and kept as normalised
+float16 vectors in a memory-mapped matrix, one shard per library root. A query is
+one embedding call plus a chunked matrix-vector product and a top-k partition.
+"""
+
+import os
+import json
+import shutil
+import asyncio
+import hashlib
+import threading
+from pathlib import Path
+from collections import OrderedDict
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+import ollama
+
+from media_analysis.signals import load_cues
+from search.dialogue import INDEXED_EXTENSIONS, display_title, stream_link
+
+ROW_DTYPE = np.dtype([('item', np.int32), ('start', np.float32), ('end', np.float32)])
+SEARCH_CHUNK_ROWS = 32768
+WINDOW_TEXT_CHARS = 500
+SNIPPET_CHARS = 200
+
+def build_windows(cues: List[Dict], window_seconds: float, stride_seconds: float) -> List[Dict]:
+    """Overlapping windows of dialogue, so a scene is found even when it spans cues"""
+    windows = []
+    next_start = 0.0
+    for i, cue in enumerate(cues):
+        if cue['start_time'] < next_start:
+            continue
+        limit = cue['start_time'] + window_seconds
+        members = [c for c in cues[i:i + 200] if c['start_time'] < limit]
+        text = ' '.join(c['text'] for c in members if c['text'])
+        if text:
+            windows.append({'start': cue['start_time'], 'end': max(c['end_time'] for c in members),
+                            'text': text[:WINDOW_TEXT_CHARS]})
+        next_start = cue['start_time'] + stride_seconds
+    return windows
+
+def normalise(vectors: np.ndarray) -> np.ndarray:
+    norms = np.linalg.norm(vectors, axis=-1, keepdims=True)
+    return vectors / np.maximum(norms, 1e-12)
+
+class VectorShard:
+    """Float16 vectors of one library root in a growable memory-mapped file
+
+    Removed items are tombstoned and the shard is compacted once most rows are dead.
+    NumPy has no fast float16 kernels, so chunks are widened to float32 for the
+    product and kept resident up to `resident_bytes`.
+    """
+
+    def __init__(self, directory: Path, model: str, resident_bytes: int = 0):
+        self.directory = directory
+        self.model = model
+        self.resident_bytes = resident_bytes
+        self.meta_path = directory / 'meta.json'
+        self.vectors_path = directory / 'vectors.f16'
+        self.rows_path = directory / 'rows.npy'
+        self.texts_path = directory / 'texts.jsonl'
+        self.lock = threading.Lock()
+
+        self.dim: Optional[int] = None
+        self.count = 0
+        self.capacity = 0
+        self.items: List[Optional[str]] = []
+        self.signatures: Dict[str, str] = {}
+        self.rows = np.zeros(0, ROW_DTYPE)
+        self.texts: List[str] = []
+        self.vectors: Optional[np.memmap] = None
+        self._alive: Optional[np.ndarray] = None
+        self._chunks: Dict[int, np.ndarray] = {}
+        self._load()
+
+    def _load(self):
+        if not self.meta_path.exists():
+            return
+        with open(self.meta_path, 'r') as f:
+            meta = json.load(f)
+        if meta.get('model') != self.model:
+            # Vectors of different models are not comparable
+            print(f"🔄 Embedding model changed, rebuilding {self.directory}")
+            shutil.rmtree(self.directory, ignore_errors=True)
+            return
+
+        self.dim, self.count, self.capacity = meta['dim'], meta['count'], meta['capacity']
+        self.items, self.signatures = meta['items'], meta['signatures']
+        self.rows = np.load(self.rows_path)[:self.count]
+        with open(self.texts_path, 'r', encoding='utf-8') as f:
+            self.texts = [json.loads(line) for _, line in zip(range(self.count), f)]
+        self.vectors = np.memmap(self.vectors_path, dtype=np.float16, mode='r+', shape=(self.capacity, self.dim))
+
+    def _save(self):
+        self.directory.mkdir(parents=True, exist_ok=True)
+        np.save(self.rows_path, self.rows)
+        meta = {'model': self.model, 'dim': self.dim, 'count': self.count, 'capacity': self.capacity,
+                'items': self.items, 'signatures': self.signatures}
+        temp_path = self.meta_path.with_suffix('.tmp')
+        with open(temp_path, 'w') as f:
+            json.dump(meta, f)
+        temp_path.replace(self.meta_path)
+
+    def _ensure_capacity(self, needed: int, dim: int):
+        if self.vectors is None:
+            self.directory.mkdir(parents=True, exist_ok=True)
+            self.dim, self.capacity = dim, max(1024, needed)
+            self.vectors = np.memmap(self.vectors_path, dtype=np.float16, mode='w+', shape=(self.capacity, dim))
+            return
+        if needed <= self.capacity:
+            return
+        self.vectors.flush()
+        self.vectors = None
+        self.capacity = max(needed, self.capacity * 2)
+        with open(self.vectors_path, 'r+b') as f:
+            f.truncate(self.capacity * self.dim * 2)
+        self.vectors = np.memmap(self.vectors_path, dtype=np.float16, mode='r+', shape=(self.capacity, self.dim))
+
+    def alive(self) -> np.ndarray:
+        if self._alive is None:
+            live_items = np.array([item is not None for item in self.items] or [False])
+            self._alive = live_items[self.rows['item']] if self.count else np.zeros(0, bool)
+        return self._alive
+
+    def add(self, item: str, signature: str, windows: List[Dict], vectors: np.ndarray):
+        with self.lock:
+            self._remove(item)
+            if len(windows):
+                self._ensure_capacity(self.count + len(windows), vectors.shape[1])
+                self.vectors[self.count:self.count + len(windows)] = vectors.astype(np.float16)
+                self.vectors.flush()
+
+                rows = np.zeros(len(windows), ROW_DTYPE)
+                rows['item'] = len(self.items)
+                rows['start'] = [window['start'] for window in windows]
+                rows['end'] = [window['end'] for window in windows]
+                self.rows = np.concatenate((self.rows, rows))
+                texts = [window['text'][:SNIPPET_CHARS] for window in windows]
+                with open(self.texts_path, 'a', encoding='utf-8') as f:
+                    f.writelines(json.dumps(text) + '\n' for text in texts)
+                self.texts.extend(texts)
+                self.count += len(windows)
+            # Items without dialogue are recorded too, so they are not retried on every start
+            self.items.append(item)
+            self.signatures[item] = signature
+            self._alive = None
+            self._save()
+
+    def _remove(self, item: str) -> bool:
+        if item not in self.signatures:
+            return False
+        self.items = [None if path == item else path for path in self.items]
+        del self.signatures[item]
+        self._alive = None
+        if self.count > 1024 and self.alive().sum() < self.count / 2:
+            self._compact()
+        return True
+
+    def remove(self, item: str):
+        with self.lock:
+            if self._remove(item):
+                self._save()
+
+    def _compact(self):
+        keep = np.flatnonzero(self.alive())
+        vectors = np.array(self.vectors[keep])
+        live_items = sorted({int(index) for index in self.rows['item'][keep]})
+        remap = {old: new for new, old in enumerate(live_items)}
+
+        self.rows = self.rows[keep]
+        self.rows['item'] = [remap[int(index)] for index in self.rows['item']]
+        self.items = [self.items[old] for old in live_items]
+        self.texts = [self.texts[i] for i in keep]
+        self.count = len(keep)
+
+        self.vectors = None
+        self.capacity = max(1024, self.count * 2)
+        self.vectors = np.memmap(self.vectors_path, dtype=np.float16, mode='w+', shape=(self.capacity, self.dim))
+        self.vectors[:self.count] = vectors
+        self.vectors.flush()
+        with open(self.texts_path, 'w', encoding='utf-8') as f:
+            f.writelines(json.dumps(text) + '\n' for text in self.texts)
+        self._alive = None
+        self._chunks = {}
+
+    def search(self, query: np.ndarray, k: int) -> List[Tuple[float, str, float, float, str]]:
+        with self.lock:
+            if not self.count or query.shape[0] != self.dim:
+                return []
+            scores = np.empty(self.count, dtype=np.float32)
+            for n, start in enumerate(range(0, self.count, SEARCH_CHUNK_ROWS)):
+                end = min(start + SEARCH_CHUNK_ROWS, self.count)
+                chunk = self._chunks.get(n)
+                # Rows are only appended between compactions, so a chunk is stale iff it grew
+                if chunk is None or len(chunk) != end - start:
+                    chunk = self.vectors[start:end].astype(np.float32)
+                    if end * self.dim * 4 <= self.resident_bytes:
+                        self._chunks[n] = chunk
+                scores[start:end] = chunk @ query
+            scores[~self.alive()] = -np.inf
+
+            k = min(k, self.count)
+            top = np.argpartition(-scores, k - 1)[:k]
+            top = top[np.argsort(-scores[top])]
+            return [(float(scores[i]), self.items[self.rows['item'][i]], float(self.rows['start'][i]),
+                     float(self.rows['end'][i]), self.texts[i]) for i in top if np.isfinite(scores[i])]
+
+    def get_stats(self) -> Dict:
+        return {'items': len(self.signatures), 'windows': int(self.alive().sum()), 'rows': self.count,
+                'dim': self.dim, 'bytes': self.capacity * (self.dim or 0) * 2,
+                'resident_bytes': sum(chunk.nbytes for chunk in self._chunks.values())}
+
+class SemanticIndex:
+    """Embeds subtitle windows of library items in the background and answers meaning queries"""
+
+    def __init__(self, roots: List[str], index_dir: Optional[str] = None, model: Optional[str] = None,
+                 window_seconds: float = 30.0, stride_seconds: float = 15.0, batch_size: int = 32):
+        self.client = ollama.AsyncClient(host=os.getenv('OLLAMA_HOST', 'http://localhost:11434'))
+        self.model = model or os.getenv('OLLAMA_EMBED_MODEL', 'nomic-embed-text')
+        self.index_dir = Path(index_dir or os.getenv('SEMANTIC_INDEX_DIR', './data/semantic'))
+        self.roots = sorted((str(Path(root).resolve()) for root in roots if root.strip()), key=len, reverse=True)
+        self.window_seconds = window_seconds
+        self.stride_seconds = stride_seconds
+        self.batch_size = batch_size
+        # float32 working set kept in RAM per shard; the float16 file stays the source of truth
+        self.resident_bytes = int(float(os.getenv('SEMANTIC_RESIDENT_MB', '1024')) * 1024 * 1024)
+        self.shards: Dict[str, VectorShard] = {}
+        self.queue: asyncio.Queue = asyncio.Queue()
+        self._worker: Optional[asyncio.Task] = None
+        self._query_cache: "OrderedDict[str, np.ndarray]" = OrderedDict()
+
+    def root_for(self, item: str) -> str:
+        resolved = str(Path(item).resolve())
+        for root in self.roots:
+            if resolved.startswith(root.rstrip(os.sep) + os.sep):
+                return root
+        return 'other'
+
+    def shard_key(self, root: str) -> Optional[str]:
+        """Shard key for a root as given by a client, or None if it is not a watched root"""
+        if root == 'other':
+            return root
+        resolved = str(Path(root).resolve())
+        return resolved if resolved in self.roots else None
+
+    def shard(self, root: str) -> VectorShard:
+        if root not in self.shards:
+            directory = self.index_dir / hashlib.md5(root.encode()).hexdigest()[:12]
+            self.shards[root] = VectorShard(directory, self.model, self.resident_bytes)
+        return self.shards[root]
+
+    @staticmethod
+    def subtitle_for(media_entry: Dict) -> Optional[str]:
+        return next((path for path in media_entry.get('subtitles', [])
+                     if path.lower().endswith(INDEXED_EXTENSIONS) and os.path.exists(path)), None)
+
+    @staticmethod
+    def signature(subtitle: str) -> str:
+        stat = os.stat(subtitle)
+        return f"{subtitle}:{stat.st_size}:{stat.st_mtime}"
+
+    async def start(self):
+        if not self._worker:
+            self._worker = asyncio.create_task(self._run())
+
+    async def stop(self):
+        if self._worker:
+            self._worker.cancel()
+            self._worker = None
+
+    def on_media_added(self, media_entry: Dict):
+        """Scanner listener; embedding runs on the index's worker task"""
+        self.queue.put_nowait(media_entry)
+
+    def on_media_removed(self, media_entry: Dict):
+        shard = self.shard(self.root_for(media_entry['filepath']))
+        asyncio.get_running_loop().run_in_executor(None, shard.remove, media_entry['filepath'])
+
+    def sync(self, library: Dict) -> int:
+        """Queue items whose subtitles are new or changed and drop vanished ones"""
+        items = {entry['filepath']: entry for category in ['movies', 'tv_shows', 'videos']
+                 for entry in library.get(category, {}).values()}
+        for item in items:
+            self.shard(self.root_for(item))
+
+        queued = 0
+        for shard in self.shards.values():
+            for item in [item for item in shard.signatures if item not in items]:
+                shard.remove(item)
+        for item, entry in items.items():
+            subtitle = self.subtitle_for(entry)
+            if subtitle and self.shard(self.root_for(item)).signatures.get(item) != self.signature(subtitle):
+                self.queue.put_nowait(entry)
+                queued += 1
+        return queued
+
+    async def _run(self):
+        while True:
+            media_entry = await self.queue.get()
+            try:
+                await self._index(media_entry)
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                print(f"⚠️ Semantic indexing failed for {media_entry.get('filepath')}: {e}")
+            finally:
+                self.queue.task_done()
+
+    async def _embed(self, texts: List[str]) -> np.ndarray:
+        vectors = []
+        for start in range(0, len(texts), self.batch_size):
+            response = await self.client.embed(model=self.model, input=texts[start:start + self.batch_size])
+            vectors.extend(response['embeddings'])
+        return normalise(np.asarray(vectors, dtype=np.float32))
+
+    async def _index(self, media_entry: Dict):
+        item = media_entry['filepath']
+        subtitle = self.subtitle_for(media_entry)
+        shard = self.shard(self.root_for(item))
+        if not subtitle:
+            await asyncio.to_thread(shard.remove, item)
+            return
+        signature = self.signature(subtitle)
+        if shard.signatures.get(item) == signature:
+            return
+
+        cues = await asyncio.to_thread(load_cues, subtitle)
+        windows = build_windows(cues, self.window_seconds, self.stride_seconds)
+        vectors = await self._embed([window['text'] for window in windows]) if windows else np.zeros((0, 0), np.float32)
+        await asyncio.to_thread(shard.add, item, signature, windows, vectors)
+        print(f"🧭 Embedded {len(windows)} dialogue windows for {display_title(media_entry)}")
+
+    async def _embed_query(self, query: str) -> np.ndarray:
+        if query in self._query_cache:
+            self._query_cache.move_to_end(query)
+            return self._query_cache[query]
+        vector = (await self._embed([query]))[0]
+        self._query_cache[query] = vector
+        if len(self._query_cache) > 256:
+            self._query_cache.popitem(last=False)
+        return vector
+
+    def _search(self, query: np.ndarray, k: int, root: Optional[str]) -> List[Dict]:
+        if root is None:
+            shards = list(self.shards.values())
+        else:
+            shards = [self.shards[root]] if root in self.shards else []
+        hits = [hit for shard in shards for hit in shard.search(query, k)]
+        hits.sort(key=lambda hit: hit[0], reverse=True)
+        return [{
+            'item': item,
+            'start_time': round(start, 2),
+            'end_time': round(end, 2),
+            'text': text,
+            'score': round(score, 4),
+            'url': stream_link(item, start)
+        } for score, item, start, end, text in hits[:k]]
+
+    async def search(self, query: str, k: int = 20, root: Optional[str] = None) -> List[Dict]:
+        vector = await self._embed_query(query)
+        return await asyncio.to_thread(self._search, vector, k, root)
+
+    def get_stats(self) -> Dict:
+        return {
+            'model': self.model,
+            'queued': self.queue.qsize(),
+            'shards': {root: shard.get_stats() for root, shard in self.shards.items()}
+        }
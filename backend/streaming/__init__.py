@@ -0,0 +1 @@
+# Streaming package
@@ -0,0 +1,238 @@
+"""
+HLS Packager - VOD playlists cut at keyframes with lazily remuxed MPEG-TS segments
+Keyframe positions are probed once per file and persisted, so building a playlist is
+free after the first request and every seek is a single cacheable segment fetch.
+"""
+
+import os
+import json
+import math
+import asyncio
+import hashlib
+from pathlib import Path
+from typing import Dict, List, Optional
+
+from streaming.probe import media_probe
+from streaming.remux import RemuxBusyError, RemuxUnsupportedError
+from streaming.segment_cache import SegmentCache
+
+# Codecs MPEG-TS can carry for HLS players
+TS_VIDEO_CODECS = {'h264', 'hevc', 'mpeg2video'}
+TS_AUDIO_CODECS = {'aac', 'mp3', 'ac3', 'eac3'}
+
+class MediaDurationUnknownError(Exception):
+    """ffprobe reported no duration, so no segment plan can be built"""
+
+class HLSPackager:
+    """Builds VOD playlists from keyframes and produces segments on demand with prefetch"""
+
+    def __init__(self, cache_dir: Optional[str] = None, segment_duration: Optional[float] = None,
+                 max_processes: Optional[int] = None, cache_max_bytes: Optional[int] = None,
+                 prefetch: Optional[int] = None, queue_timeout: Optional[float] = None):
+        cache_dir = Path(cache_dir or os.getenv('HLS_CACHE_DIR', './data/hls'))
+        if cache_max_bytes is None:
+            cache_max_bytes = int(float(os.getenv('HLS_CACHE_MAX_GB', '20')) * 1e9)
+
+        self.segment_duration = segment_duration or float(os.getenv('HLS_SEGMENT_SECONDS', '6'))
+        self.max_processes = max_processes or int(os.getenv('HLS_MAX_PROCESSES', '2'))
+        self.prefetch = prefetch if prefetch is not None else int(os.getenv('HLS_PREFETCH_SEGMENTS', '3'))
+        self.queue_timeout = queue_timeout if queue_timeout is not None else float(os.getenv('HLS_QUEUE_TIMEOUT', '10'))
+
+        self.cache = SegmentCache(cache_dir / 'segments', cache_max_bytes, suffix='.ts')
+        self.index_dir = cache_dir / 'index'
+        self.index_dir.mkdir(parents=True, exist_ok=True)
+
+        self._indexes: Dict[str, Dict] = {}
+        self._index_locks: Dict[str, asyncio.Lock] = {}
+        self._in_flight: Dict[str, asyncio.Task] = {}
+        self._slots = asyncio.Semaphore(self.max_processes)
+
+    def _file_key(self, path: str) -> str:
+        stat = os.stat(path)
+        return hashlib.md5(f"{path}|{stat.st_size}|{stat.st_mtime}".encode()).hexdigest()
+
+    async def _probe_keyframes(self, path: str) -> List[float]:
+        """Video keyframe timestamps from packet flags, without decoding"""
+        try:
+            process = await asyncio.create_subprocess_exec(
+                'ffprobe', '-v', 'quiet', '-select_streams', 'v:0',
+                '-show_entries', 'packet=pts_time,flags', '-of', 'csv=p=0', path,
+                stdout=asyncio.subprocess.PIPE, stderr=asyncio.subprocess.DEVNULL
+            )
+        except OSError as e:
+            print(f"⚠️ Keyframe probe failed for {path}: {e}")
+            return []
+        stdout, _ = await process.communicate()
+
+        keyframes = []
+        for line in stdout.decode(errors='ignore').splitlines():
+            fields = line.split(',')
+            if len(fields) >= 2 and 'K' in fields[1]:
+                try:
+                    keyframes.append(float(fields[0]))
+                except ValueError:
+                    continue
+        return sorted(set(keyframes))
+
+    def _plan_segments(self, keyframes: List[float], duration: float) -> List[Dict]:
+        """Group keyframes into segments of at least the target duration"""
+        boundaries = [0.0]
+        for keyframe in keyframes:
+            if keyframe - boundaries[-1] >= self.segment_duration and keyframe < duration:
+                boundaries.append(keyframe)
+        if not keyframes:
+            # No keyframe info: fixed cuts, which ffmpeg snaps to the nearest keyframe
+            boundaries = [i * self.segment_duration for i in range(max(1, math.ceil(duration / self.segment_duration)))]
+
+        ends = boundaries[1:] + [duration]
+        return [{'start': round(start, 3), 'duration': round(end - start, 3)}
+                for start, end in zip(boundaries, ends) if end > start]
+
+    async def get_index(self, path: str) -> Dict:
+        """Segment plan and codecs for a file, probed once and persisted
+
+        Raises MediaDurationUnknownError rather than planning an empty playlist.
+        """
+        file_key = self._file_key(path)
+        if file_key in self._indexes:
+            return self._indexes[file_key]
+
+        lock = self._index_locks.setdefault(file_key, asyncio.Lock())
+        async with lock:
+            if file_key in self._indexes:
+                return self._indexes[file_key]
+
+            index_path = self.index_dir / f"{file_key}.json"
+            index = None
+            if index_path.exists():
+                with open(index_path, 'r') as f:
+                    index = json.load(f)
+            if not index or not index['segments']:
+                info = await media_probe.probe(path) or {}
+                duration = float(info.get('format', {}).get('duration') or 0)
+                if duration <= 0:
+                    # Not persisted, so the file is probed again once ffprobe can read it
+                    raise MediaDurationUnknownError(f"Could not determine the duration of {Path(path).name}")
+                codecs = await media_probe.stream_codecs(path)
+                keyframes = await self._probe_keyframes(path)
+                index = {
+                    'file_key': file_key,
+                    'duration': duration,
+                    'codecs': codecs,
+                    'segments': self._plan_segments(keyframes, duration)
+                }
+                with open(index_path, 'w') as f:
+                    json.dump(index, f)
+
+            self._indexes[file_key] = index
+            self._index_locks.pop(file_key, None)
+            return index
+
+    async def playlist(self, path: str) -> str:
+        index = await self.get_index(path)
+        segments = index['segments']
+        target = math.ceil(max((segment['duration'] for segment in segments), default=self.segment_duration))
+
+        lines = [
+            '#EXTM3U',
+            '#EXT-X-VERSION:3',
+            f'#EXT-X-TARGETDURATION:{target}',
+            '#EXT-X-MEDIA-SEQUENCE:0',
+            '#EXT-X-PLAYLIST-TYPE:VOD',
+        ]
+        for i, segment in enumerate(segments):
+            lines.append(f"#EXTINF:{segment['duration']:.3f},")
+            lines.append(f"segment_{i}.ts")
+        lines.append('#EXT-X-ENDLIST')
+        return '\n'.join(lines) + '\n'
+
+    def _command(self, path: str, segment: Dict, codecs: Dict, output: Path) -> List[str]:
+        if codecs['video'] and codecs['video'] not in TS_VIDEO_CODECS:
+            raise RemuxUnsupportedError(f"Video codec '{codecs['video']}' cannot be packaged as MPEG-TS")
+        audio = ['-c:a', 'copy'] if codecs['audio'] in TS_AUDIO_CODECS or not codecs['audio'] else ['-c:a', 'aac', '-b:a', '192k']
+
+        return [
+            'ffmpeg', '-nostdin', '-v', 'error', '-y',
+            '-ss', str(segment['start']), '-i', path, '-t', str(segment['duration']),
+            '-map', '0:v:0?', '-map', '0:a:0?',
+            '-c:v', 'copy', *audio, '-sn', '-dn',
+            # Keep the source timeline so segments line up with each other and with WebVTT
+            '-output_ts_offset', str(segment['start']), '-muxdelay', '0', '-muxpreload', '0',
+            '-f', 'mpegts', str(output)
+        ]
+
+    async def _generate(self, path: str, index: Dict, number: int, key: str):
+        command = self._command(path, index['segments'][number], index['codecs'], self.cache.part_path(key))
+        process = await asyncio.create_subprocess_exec(
+            *command, stdout=asyncio.subprocess.DEVNULL, stderr=asyncio.subprocess.DEVNULL
+        )
+        try:
+            returncode = await process.wait()
+        except asyncio.CancelledError:
+            process.kill()
+            self.cache.discard(key)
+            raise
+        if returncode != 0:
+            self.cache.discard(key)
+            raise RuntimeError(f"ffmpeg failed on segment {number} of {path}")
+        self.cache.commit(key)
+
+    async def _run_slot(self, path: str, index: Dict, number: int, key: str):
+        try:
+            await asyncio.wait_for(self._slots.acquire(), timeout=self.queue_timeout)
+        except asyncio.TimeoutError:
+            raise RemuxBusyError(f"All {self.max_processes} HLS packaging slots are busy")
+        try:
+            await self._generate(path, index, number, key)
+        finally:
+            self._slots.release()
+
+    def _segment_key(self, index: Dict, number: int) -> str:
+        return f"{index['file_key']}_{self.segment_duration:g}_{number}"
+
+    def _start(self, path: str, index: Dict, number: int) -> Optional[asyncio.Task]:
+        key = self._segment_key(index, number)
+        if self.cache.contains(key):
+            return None
+        task = self._in_flight.get(key)
+        if task is None:
+            task = asyncio.create_task(self._run_slot(path, index, number, key))
+            self._in_flight[key] = task
+            task.add_done_callback(lambda _: self._in_flight.pop(key, None))
+        return task
+
+    def _prefetch(self, path: str, index: Dict, number: int):
+        """Queue the next segments while slots are idle, so a playing client never waits"""
+        for following in range(number + 1, min(number + 1 + self.prefetch, len(index['segments']))):
+            if self._slots.locked():
+                break
+            task = self._start(path, index, following)
+            if task:
+                # Prefetch failures only mean the segment is produced on request instead
+                task.add_done_callback(lambda t: t.cancelled() or t.exception())
+
+    async def get_segment(self, path: str, number: int) -> Path:
+        index = await self.get_index(path)
+        if not 0 <= number < len(index['segments']):
+            raise IndexError(f"Segment {number} out of range")
+
+        key = self._segment_key(index, number)
+        task = self._start(path, index, number)
+        if task:
+            # Shield so a disconnecting client does not cancel a segment others may share
+            await asyncio.shield(task)
+        self._prefetch(path, index, number)
+
+        segment_path = self.cache.get(key)
+        if segment_path is None:
+            raise RuntimeError(f"Segment {number} of {path} was evicted before it could be served")
+        return segment_path
+
+    def get_stats(self) -> Dict:
+        return {
+            'segment_duration': self.segment_duration,
+            'max_processes': self.max_processes,
+            'in_flight': len(self._in_flight),
+            'indexed_files': len(self._indexes),
+            'cache': self.cache.get_stats()
+        }
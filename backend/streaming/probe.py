@@ -0,0 +1,62 @@
+"""
+Media Probe - cached, non-blocking ffprobe
+Results are keyed by (path, size, mtime) so a file is probed once until it changes.
+"""
+
+import os
+import json
+import asyncio
+from collections import OrderedDict
+from typing import Dict, Optional
+
+class MediaProbe:
+    """Runs ffprobe in a subprocess without blocking the event loop and caches the JSON"""
+
+    def __init__(self, max_entries: int = 1024):
+        self.max_entries = max_entries
+        self._cache: "OrderedDict[tuple, Dict]" = OrderedDict()
+
+    def _key(self, path: str) -> tuple:
+        stat = os.stat(path)
+        return (path, stat.st_size, stat.st_mtime)
+
+    async def _run(self, *args: str) -> Optional[Dict]:
+        """Parsed ffprobe JSON, or None when ffprobe is missing, fails or prints garbage"""
+        try:
+            process = await asyncio.create_subprocess_exec(
+                'ffprobe', '-v', 'quiet', '-print_format', 'json', *args,
+                stdout=asyncio.subprocess.PIPE, stderr=asyncio.subprocess.DEVNULL
+            )
+            stdout, _ = await process.communicate()
+            if process.returncode != 0:
+                return None
+            return json.loads(stdout)
+        except (OSError, ValueError) as e:
+            print(f"⚠️ ffprobe failed for {args[-1]}: {e}")
+            return None
+
+    async def probe(self, path: str) -> Optional[Dict]:
+        """Format, streams and chapters of a media file"""
+        key = self._key(path)
+        if key in self._cache:
+            self._cache.move_to_end(key)
+            return self._cache[key]
+
+        info = await self._run('-show_format', '-show_streams', '-show_chapters', path)
+        if info is not None:
+            self._cache[key] = info
+            if len(self._cache) > self.max_entries:
+                self._cache.popitem(last=False)
+        return info
+
+    async def stream_codecs(self, path: str) -> Dict[str, Optional[str]]:
+        """Codec of the first video and audio stream"""
+        info = await self.probe(path) or {}
+        codecs = {'video': None, 'audio': None}
+        for stream in info.get('streams', []):
+            kind = stream.get('codec_type')
+            if kind in codecs and codecs[kind] is None:
+                codecs[kind] = stream.get('codec_name')
+        return codecs
+
+media_probe = MediaProbe()
@@ -0,0 +1,217 @@
+"""
+Remux - on-the-fly container conversion to fragmented MP4
+mkv/avi/wmv/flv are rewrapped with ffmpeg in copy mode (no re-encode) and piped to the client.
+Seeks restart ffmpeg at the keyframe before the requested time; finished remuxes are kept in
+a SegmentCache.
+"""
+
+import os
+import asyncio
+import hashlib
+from pathlib import Path
+from typing import AsyncIterator, Dict, List, Optional, Tuple
+
+from monitoring import metrics
+from streaming.probe import media_probe
+from streaming.segment_cache import SegmentCache
+
+# Containers browsers cannot play natively
+REMUX_EXTENSIONS = {'.mkv', '.avi', '.wmv', '.flv'}
+
+# Codecs that can be copied into MP4 as-is
+MP4_VIDEO_CODECS = {'h264', 'hevc', 'av1', 'vp9', 'mpeg4'}
+MP4_AUDIO_CODECS = {'aac', 'mp3', 'ac3', 'eac3', 'opus', 'flac', 'alac'}
+
+# Fragment on keyframes so playback starts before ffmpeg finishes
+FRAGMENT_FLAGS = 'frag_keyframe+empty_moov+default_base_moof'
+CHUNK_SIZE = 64 * 1024
+
+# How far back to look for the keyframe preceding a seek target
+KEYFRAME_SEARCH_WINDOW = 15.0
+
+class RemuxBusyError(Exception):
+    """All remux slots stayed taken for the whole queue timeout"""
+
+class RemuxUnsupportedError(Exception):
+    """The video stream cannot be copied into MP4 and would need transcoding"""
+
+class RemuxManager:
+    """Runs a bounded number of ffmpeg remux processes and caches their output"""
+
+    def __init__(self, cache_dir: Optional[str] = None, max_processes: Optional[int] = None,
+                 cache_max_bytes: Optional[int] = None, queue_timeout: Optional[float] = None):
+        cache_dir = cache_dir or os.getenv('REMUX_CACHE_DIR', './data/remux')
+        max_processes = max_processes or int(os.getenv('REMUX_MAX_PROCESSES', '2'))
+        if cache_max_bytes is None:
+            cache_max_bytes = int(float(os.getenv('REMUX_CACHE_MAX_GB', '20')) * 1e9)
+
+        self.cache = SegmentCache(Path(cache_dir), cache_max_bytes)
+        self.max_processes = max_processes
+        self.queue_timeout = queue_timeout if queue_timeout is not None else float(os.getenv('REMUX_QUEUE_TIMEOUT', '10'))
+        self._slots = asyncio.Semaphore(max_processes)
+        self._writing = set()
+
+    @staticmethod
+    def needs_remux(path: str) -> bool:
+        return Path(path).suffix.lower() in REMUX_EXTENSIONS
+
+    def _cache_key(self, path: str, start: float) -> str:
+        stat = os.stat(path)
+        return hashlib.md5(f"{path}|{stat.st_size}|{stat.st_mtime}|{start:.3f}".encode()).hexdigest()
+
+    async def keyframe_before(self, path: str, position: float) -> float:
+        """Timestamp of the last video keyframe at or before `position`"""
+        if position <= 0:
+            return 0.0
+
+        window_start = max(0.0, position - KEYFRAME_SEARCH_WINDOW)
+        try:
+            process = await asyncio.create_subprocess_exec(
+                'ffprobe', '-v', 'quiet', '-select_streams', 'v:0', '-skip_frame', 'nokey',
+                '-read_intervals', f"{window_start}%{position + 0.001}",
+                '-show_entries', 'frame=pts_time,best_effort_timestamp_time', '-of', 'csv=p=0', path,
+                stdout=asyncio.subprocess.PIPE, stderr=asyncio.subprocess.DEVNULL
+            )
+        except OSError as e:
+            # Without ffprobe the requested time is the best guess; ffmpeg snaps it to a keyframe
+            print(f"⚠️ Keyframe lookup failed for {path}: {e}")
+            return round(position, 3)
+        stdout, _ = await process.communicate()
+
+        keyframe = window_start
+        for line in stdout.decode(errors='ignore').splitlines():
+            for field in line.split(','):
+                try:
+                    timestamp = float(field)
+                except ValueError:
+                    continue
+                if timestamp <= position:
+                    keyframe = max(keyframe, timestamp)
+                break
+        return round(keyframe, 3)
+
+    async def _build_command(self, path: str, start: float) -> List[str]:
+        codecs = await media_probe.stream_codecs(path)
+        if codecs['video'] and codecs['video'] not in MP4_VIDEO_CODECS:
+            raise RemuxUnsupportedError(f"Video codec '{codecs['video']}' cannot be remuxed to MP4")
+
+        # Copy audio when MP4 can hold it; otherwise AAC costs little next to video
+        audio = ['-c:a', 'copy'] if codecs['audio'] in MP4_AUDIO_CODECS or not codecs['audio'] else ['-c:a', 'aac', '-b:a', '192k']
+
+        command = ['ffmpeg', '-nostdin', '-v', 'error']
+        if start > 0:
+            command += ['-ss', str(start)]
+        command += [
+            '-i', path,
+            '-map', '0:v:0?', '-map', '0:a:0?',
+            '-c:v', 'copy', *audio,
+            '-sn', '-dn',
+            '-f', 'mp4', '-movflags', FRAGMENT_FLAGS,
+            'pipe:1'
+        ]
+        if codecs['video'] == 'hevc':
+            # Safari only plays HEVC in MP4 with the hvc1 tag
+            command[-1:-1] = ['-tag:v', 'hvc1']
+        return command
+
+    async def open_stream(self, path: str, start: float = 0.0) -> Tuple[Optional[Path], Optional['RemuxStream'], float]:
+        """Cached file path or a live fMP4 stream, plus the actual start time
+
+        Exactly one of the first two values is set. The start time is the keyframe
+        the output begins at, which the client adds to the player's current time.
+        A live stream holds a remux slot until its `aclose()`, which the caller must
+        schedule even if iteration never starts.
+        """
+        start = await self.keyframe_before(path, start)
+        key = self._cache_key(path, start)
+
+        cached = self.cache.get(key)
+        if cached:
+            metrics.remux_cache_requests.inc(result='hit')
+            return cached, None, start
+        metrics.remux_cache_requests.inc(result='miss')
+
+        command = await self._build_command(path, start)
+        try:
+            await asyncio.wait_for(self._slots.acquire(), timeout=self.queue_timeout)
+        except asyncio.TimeoutError:
+            raise RemuxBusyError(f"All {self.max_processes} remux slots are busy")
+        return None, RemuxStream(self, command, key), start
+
+    def _finish_part(self, part_file, key: str, completed: bool):
+        """Close a cache part file and promote or drop it (blocking; runs in a worker thread)"""
+        part_file.close()
+        if completed:
+            self.cache.commit(key)
+        else:
+            self.cache.discard(key)
+
+    def get_stats(self) -> Dict:
+        return {
+            'max_processes': self.max_processes,
+            'running': metrics.remux_processes.get(),
+            'cache': self.cache.get_stats()
+        }
+
+class RemuxStream:
+    """One live ffmpeg remux; ffmpeg starts on first iteration and the slot is freed by aclose()"""
+
+    def __init__(self, manager: RemuxManager, command: List[str], key: str):
+        self.manager = manager
+        self.command = command
+        self.key = key
+        self.process: Optional[asyncio.subprocess.Process] = None
+        self.closed = False
+
+    async def chunks(self) -> AsyncIterator[bytes]:
+        if self.closed:
+            return
+        part_file = None
+        writing = False
+        completed = False
+        metrics.active_streams.inc()
+        try:
+            self.process = await asyncio.create_subprocess_exec(
+                *self.command, stdout=asyncio.subprocess.PIPE, stderr=asyncio.subprocess.DEVNULL
+            )
+            metrics.remux_processes.inc()
+
+            # Only one writer per segment; concurrent viewers of the same start just stream
+            if self.key not in self.manager._writing:
+                self.manager._writing.add(self.key)
+                writing = True
+                part_file = await asyncio.to_thread(open, self.manager.cache.part_path(self.key), 'wb')
+
+            while True:
+                chunk = await self.process.stdout.read(CHUNK_SIZE)
+                if not chunk:
+                    break
+                if part_file:
+                    await asyncio.to_thread(part_file.write, chunk)
+                metrics.stream_bytes.inc(len(chunk), route='/api/player/remux')
+                yield chunk
+            completed = await self.process.wait() == 0
+        finally:
+            # No awaits here: this also runs when the client disconnects mid-stream
+            metrics.active_streams.dec()
+            if part_file:
+                # The segment stays claimed until its part file has been promoted or dropped
+                finishing = asyncio.get_running_loop().run_in_executor(None, self.manager._finish_part,
+                                                                       part_file, self.key, completed)
+                finishing.add_done_callback(lambda _: self.manager._writing.discard(self.key))
+            elif writing:
+                self.manager._writing.discard(self.key)
+            self._release()
+
+    def _release(self):
+        if self.process and self.process.returncode is None:
+            self.process.kill()
+        if not self.closed:
+            self.closed = True
+            self.manager._slots.release()
+            if self.process:
+                metrics.remux_processes.dec()
+
+    async def aclose(self):
+        """Kill ffmpeg and free the slot; safe to call more than once"""
+        self._release()
@@ -0,0 +1,71 @@
+"""
+Segment Cache - size-bounded on-disk cache for remuxed and packaged media
+Files are written to a .part sibling and renamed when complete; the least recently
+used entries are evicted once the directory exceeds its byte budget.
+"""
+
+import os
+from pathlib import Path
+from typing import Dict, Optional
+
+class SegmentCache:
+    """Media segments on disk, evicted least-recently-used when over the size budget"""
+
+    def __init__(self, cache_dir: Path, max_bytes: int, suffix: str = '.mp4'):
+        self.cache_dir = cache_dir
+        self.max_bytes = max_bytes
+        self.suffix = suffix
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+
+    def path_for(self, key: str) -> Path:
+        return self.cache_dir / f"{key}{self.suffix}"
+
+    def part_path(self, key: str) -> Path:
+        return self.cache_dir / f"{key}{self.suffix}.part"
+
+    def contains(self, key: str) -> bool:
+        return self.path_for(key).exists()
+
+    def get(self, key: str) -> Optional[Path]:
+        path = self.path_for(key)
+        if not path.exists():
+            return None
+        # mtime doubles as the last-access time for eviction
+        os.utime(path)
+        return path
+
+    def commit(self, key: str):
+        """Promote a fully written segment and trim the cache"""
+        self.part_path(key).replace(self.path_for(key))
+        self.evict()
+
+    def discard(self, key: str):
+        try:
+            self.part_path(key).unlink()
+        except FileNotFoundError:
+            pass
+
+    def evict(self):
+        entries = []
+        total = 0
+        for path in self.cache_dir.glob(f"*{self.suffix}"):
+            try:
+                stat = path.stat()
+            except FileNotFoundError:
+                continue
+            entries.append((stat.st_mtime, stat.st_size, path))
+            total += stat.st_size
+
+        entries.sort()
+        for _, size, path in entries:
+            if total <= self.max_bytes:
+                break
+            try:
+                path.unlink()
+                total -= size
+            except FileNotFoundError:
+                pass
+
+    def get_stats(self) -> Dict:
+        sizes = [path.stat().st_size for path in self.cache_dir.glob(f"*{self.suffix}")]
+        return {'segments': len(sizes), 'bytes': sum(sizes), 'max_bytes': self.max_bytes}
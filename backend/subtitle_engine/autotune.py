@@ -0,0 +1,171 @@
+"""
+Autotune - runtime tuning of LLM concurrency and cues-per-prompt
+Hill-climbs on measured cue throughput with AIMD back-off, and remembers the
+best settings per (Ollama host, model) so the next run starts at the sweet spot.
+"""
+
+import copy
+import json
+import time
+from pathlib import Path
+from typing import Dict, List, Optional
+
+class AdaptiveTuner:
+    """Tunes concurrency and cues-per-prompt for one (host, model) pair"""
+
+    def __init__(self, host: str, model: str, state_path: Path,
+                 max_concurrency: int = 16, max_cues_per_prompt: int = 8, window: int = 6):
+        self.host = host
+        self.model = model
+        self.key = f"{host}|{model}"
+        self.state_path = Path(state_path)
+        self.max_concurrency = max_concurrency
+        self.max_cues_per_prompt = max_cues_per_prompt
+        self.window = window
+
+        self.concurrency = 2
+        self.cues_per_prompt = 1
+        self.best_throughput = 0.0
+        self.tokens_per_second = 0.0
+        self.avg_latency = None
+
+        # Hill-climbing state: which knob is being explored and the last move made
+        self._dimension = 'concurrency'
+        self._last_move = None
+        self._window_started = time.monotonic()
+        self._window_cues = 0
+        self._window_calls = 0
+        self._window_errors = 0
+        self._window_latencies: List[float] = []
+
+        self._load()
+
+    def _load(self):
+        """Start from the persisted settings for this host and model, if any"""
+        try:
+            if self.state_path.exists():
+                with open(self.state_path, 'r') as f:
+                    state = json.load(f).get(self.key)
+                if state:
+                    self.concurrency = int(state.get('concurrency', self.concurrency))
+                    self.cues_per_prompt = int(state.get('cues_per_prompt', self.cues_per_prompt))
+                    self.tokens_per_second = float(state.get('tokens_per_second', 0.0))
+        except Exception as e:
+            print(f"Error loading autotune state: {e}")
+
+    def save(self):
+        """Persist the current settings alongside other (host, model) entries"""
+        try:
+            state = {}
+            if self.state_path.exists():
+                with open(self.state_path, 'r') as f:
+                    state = json.load(f)
+            state[self.key] = {
+                'host': self.host,
+                'model': self.model,
+                'concurrency': self.concurrency,
+                'cues_per_prompt': self.cues_per_prompt,
+                'throughput': round(self.best_throughput, 3),
+                'tokens_per_second': round(self.tokens_per_second, 2),
+                'updated': time.time()
+            }
+            self.state_path.parent.mkdir(parents=True, exist_ok=True)
+            with open(self.state_path, 'w') as f:
+                json.dump(state, f, indent=2)
+        except Exception as e:
+            print(f"Error saving autotune state: {e}")
+
+    def begin_run(self) -> 'AdaptiveTuner':
+        """Run-scoped tuner for one transformation, starting from the current settings
+
+        Overlapping transformations each climb on their own measurement windows;
+        fold the result back with merge() when the run ends.
+        """
+        run = copy.copy(self)
+        run.best_throughput = 0.0
+        run._last_move = None
+        run._reset_window()
+        return run
+
+    def merge(self, run: 'AdaptiveTuner'):
+        """Adopt the settings a finished run converged on"""
+        self.concurrency = run.concurrency
+        self.cues_per_prompt = run.cues_per_prompt
+        self.best_throughput = run.best_throughput
+        self.tokens_per_second = run.tokens_per_second
+        self.avg_latency = run.avg_latency
+        self._dimension = run._dimension
+
+    def _reset_window(self):
+        self._window_started = time.monotonic()
+        self._window_cues = 0
+        self._window_calls = 0
+        self._window_errors = 0
+        self._window_latencies = []
+
+    def record(self, cues: int, latency: float, tokens_per_second: Optional[float] = None, error: bool = False):
+        """Record one completed LLM call and adjust settings once a window is full"""
+        self._window_cues += cues
+        self._window_calls += 1
+        self._window_latencies.append(latency)
+        if error:
+            self._window_errors += 1
+        if tokens_per_second:
+            self.tokens_per_second += 0.2 * (tokens_per_second - self.tokens_per_second)
+
+        if self._window_calls >= max(self.window, self.concurrency):
+            self._adjust()
+
+    def _adjust(self):
+        """One hill-climbing step: keep moving while throughput improves, back off otherwise"""
+        elapsed = max(time.monotonic() - self._window_started, 1e-6)
+        throughput = self._window_cues / elapsed
+        self.avg_latency = sum(self._window_latencies) / len(self._window_latencies)
+        # Let the reference decay so the tuner follows load changes on the host
+        self.best_throughput *= 0.98
+
+        if self._window_errors:
+            # Multiplicative decrease: the server is overloaded or failing
+            self.concurrency = max(1, self.concurrency // 2)
+            self.cues_per_prompt = max(1, self.cues_per_prompt // 2)
+            self._last_move = None
+        elif throughput > self.best_throughput * 1.05:
+            # Additive increase along the knob currently being explored
+            self.best_throughput = throughput
+            self._step(+1)
+        elif self._last_move is not None:
+            # The last step did not pay off: undo it and explore the other knob
+            self._step(-self._last_move)
+            self._last_move = None
+            self._dimension = 'cues_per_prompt' if self._dimension == 'concurrency' else 'concurrency'
+        else:
+            # Probe the current knob; at its limit, move on to the other one
+            self._step(+1)
+            if self._last_move is None:
+                self._dimension = 'cues_per_prompt' if self._dimension == 'concurrency' else 'concurrency'
+
+        self._reset_window()
+
+    def _step(self, direction: int):
+        if self._dimension == 'concurrency':
+            new_value = min(self.max_concurrency, max(1, self.concurrency + direction))
+            moved = new_value != self.concurrency
+            self.concurrency = new_value
+        else:
+            new_value = min(self.max_cues_per_prompt, max(1, self.cues_per_prompt + direction))
+            moved = new_value != self.cues_per_prompt
+            self.cues_per_prompt = new_value
+        self._last_move = direction if moved else None
+
+    def get_state(self) -> Dict:
+        """Current settings and measurements"""
+        return {
+            'host': self.host,
+            'model': self.model,
+            'concurrency': self.concurrency,
+            'cues_per_prompt': self.cues_per_prompt,
+            'throughput': round(self.best_throughput, 3),
+            'tokens_per_second': round(self.tokens_per_second, 2),
+            'avg_latency': round(self.avg_latency, 3) if self.avg_latency is not None else None,
+            'exploring': self._dimension
+        }
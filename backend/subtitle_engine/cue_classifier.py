@@ -0,0 +1,86 @@
+"""
+Cue Classifier - cheap pre-pass that decides which cues actually need the LLM
+Sound effects, music, speaker labels and pure interjections are routed
+to passthrough or the mode's quick transform instead of Ollama.
+"""
+
+import re
+from typing import Dict, List
+
+# Routes a cue can take through the transformation pipeline
+ROUTE_PASSTHROUGH = 'passthrough'
+ROUTE_QUICK = 'quick'
+ROUTE_LLM = 'llm'
+
+# [MUSIC], (gasps), {door slams}
+SOUND_ANNOTATION = re.compile(r'[\[\(\{][^\]\)\}]*[\]\)\}]')
+# ♪ lyrics ♪ or # lyrics #
+MUSIC_LINE = re.compile(r'^\s*[♪♫#]')
+# JOHN:, DR. SMITH:, - MARY:
+SPEAKER_LABEL = re.compile(r"^\s*-?\s*[A-Z][A-Z0-9 .'\-]{0,30}:\s*")
+# Formatting tags from SRT/VTT (<i>, {\an8})
+MARKUP = re.compile(r'<[^>]+>|\{\\[^}]*\}')
+WORD = re.compile(r"[^\W\d_]+(?:'[^\W\d_]+)?")
+
+INTERJECTIONS = {
+    'ah', 'aah', 'aw', 'bye', 'eh', 'er', 'god', 'ha', 'haha', 'hey', 'hi', 'hm', 'hmm', 'huh',
+    'mm', 'mhm', 'nah', 'no', 'nope', 'oh', 'ok', 'okay', 'oops', 'ooh', 'ow', 'please', 'right',
+    'shh', 'sorry', 'thanks', 'uh', 'uhh', 'um', 'umm', 'what', 'whoa', 'wow', 'yeah', 'yes', 'yep', 'yo'
+}
+
+class CueClassifier:
+    """Rule-based classifier routing cues to passthrough, quick transform or LLM
+
+    `min_llm_words` above 1 also sends short real lines ("Go home.") to the quick
+    transform. That is only a fair trade for playful modes, so it is off by default.
+    """
+
+    def __init__(self, min_llm_words: int = 1):
+        self.min_llm_words = min_llm_words
+
+    def dialogue_text(self, text: str) -> str:
+        """Strip markup, sound annotations and speaker labels, leaving spoken words"""
+        text = MARKUP.sub('', text)
+        text = SOUND_ANNOTATION.sub(' ', text)
+        text = SPEAKER_LABEL.sub('', text)
+        return ' '.join(text.split())
+
+    def classify(self, text: str) -> str:
+        """Classify a single cue text into a route"""
+        if not text or not text.strip():
+            return ROUTE_PASSTHROUGH
+
+        if MUSIC_LINE.match(MARKUP.sub('', text)):
+            return ROUTE_PASSTHROUGH
+
+        words = WORD.findall(self.dialogue_text(text))
+        if not words:
+            # Pure annotation, label or punctuation
+            return ROUTE_PASSTHROUGH
+
+        if all(word.lower() in INTERJECTIONS for word in words):
+            return ROUTE_QUICK
+
+        if len(words) < self.min_llm_words:
+            return ROUTE_QUICK
+
+        return ROUTE_LLM
+
+    def classify_cues(self, subtitles: List[Dict]) -> List[str]:
+        """Classify every cue in a parsed subtitle list"""
+        return [self.classify(subtitle['text']) for subtitle in subtitles]
+
+    @staticmethod
+    def summarize(routes: List[str]) -> Dict:
+        """Count routes and report how many LLM calls were saved"""
+        total = len(routes)
+        llm = routes.count(ROUTE_LLM)
+        saved = total - llm
+        return {
+            'total_cues': total,
+            'llm': llm,
+            'quick': routes.count(ROUTE_QUICK),
+            'passthrough': routes.count(ROUTE_PASSTHROUGH),
+            'llm_calls_saved': saved,
+            'saved_ratio': round(saved / total, 3) if total else 0.0
+        }
@@ -0,0 +1,48 @@
+"""
+Incremental Transformation - carries transformed cues over to a new version of a subtitle file
+The new cue list is aligned against the one the cached transformation was made from, so a
+typo fix or a resync only sends the cues whose text actually changed back to the LLM.
+"""
+
+import re
+from difflib import SequenceMatcher
+from typing import Dict, List, Optional
+
+WHITESPACE = re.compile(r'\s+')
+
+def cue_key(text: str) -> str:
+    """Text as compared between versions; line wrapping and case do not count as edits"""
+    return WHITESPACE.sub(' ', text).strip().lower()
+
+def _pair_by_time(previous: List[Dict], current: List[Dict], old_range: range, new_range: range,
+                  matches: List[Optional[int]]):
+    """Inside a changed block, pair cues with identical text (moved or reordered lines) by closest start"""
+    candidates: Dict[str, List[int]] = {}
+    for index in old_range:
+        candidates.setdefault(cue_key(previous[index]['text']), []).append(index)
+    for position in new_range:
+        options = candidates.get(cue_key(current[position]['text']))
+        if not options:
+            continue
+        start = current[position]['start_time']
+        best = min(options, key=lambda index: abs(previous[index]['start_time'] - start))
+        options.remove(best)
+        matches[position] = best
+
+def align_cues(previous: List[Dict], current: List[Dict]) -> List[Optional[int]]:
+    """Index of the previous cue each current cue can take its transformation from, or None
+
+    Cues are aligned in order by text; timings are free to change, since they are always taken
+    from the current version.
+    """
+    matches: List[Optional[int]] = [None] * len(current)
+    # Short lines ("Yeah.", "No.") repeat too often for difflib's popularity heuristic
+    matcher = SequenceMatcher(None, [cue_key(sub['text']) for sub in previous],
+                              [cue_key(sub['text']) for sub in current], autojunk=False)
+    for tag, old_start, old_end, new_start, new_end in matcher.get_opcodes():
+        if tag == 'equal':
+            for offset in range(new_end - new_start):
+                matches[new_start + offset] = old_start + offset
+        elif tag == 'replace':
+            _pair_by_time(previous, current, range(old_start, old_end), range(new_start, new_end), matches)
+    return matches
@@ -0,0 +1,81 @@
+"""
+Language Identification - character trigram classifier for subtitle text
+Trigrams are hashed into a fixed number of buckets and scored against per-language
+log-probability profiles built from the bundled seed dialogue, all in a few NumPy calls.
+"""
+
+import re
+from typing import Optional, Tuple
+
+import numpy as np
+
+from subtitle_engine.language_profiles import SAMPLES
+
+BUCKET_BITS = 14
+# Odd 64-bit multipliers for hashing the three code points of a trigram
+HASH_MULTIPLIERS = (np.uint64(0x9E3779B97F4A7C15), np.uint64(0xC2B2AE3D27D4EB4F), np.uint64(0x165667B19E3779F9))
+NON_LETTERS = re.compile(r"[\W\d_]+")
+MARKUP = re.compile(r'<[^>]+>|\{[^}]*\}|\\[Nn]')
+MIN_TRIGRAMS = 40
+# Scales the mean per-trigram log-likelihood margin into a softmax confidence
+CONFIDENCE_SCALE = 8.0
+
+# Evenly spaced slices of the file that are sampled for cue text
+SAMPLE_WINDOWS = 12
+SAMPLE_WINDOW_CHARS = 400
+
+def trigram_ids(text: str) -> np.ndarray:
+    """Hashed bucket of every character trigram, with word boundaries as spaces"""
+    letters = ' ' + NON_LETTERS.sub(' ', text.lower()).strip() + ' '
+    codes = np.frombuffer(letters.encode('utf-32-le'), dtype=np.uint32).astype(np.uint64)
+    if len(codes) < 3:
+        return np.zeros(0, dtype=np.int64)
+    a, b, c = HASH_MULTIPLIERS
+    hashed = codes[:-2] * a ^ codes[1:-1] * b ^ codes[2:] * c
+    return (hashed >> np.uint64(64 - BUCKET_BITS)).astype(np.int64)
+
+class LanguageProfiles:
+    """Smoothed trigram log-probabilities per language"""
+
+    def __init__(self, samples=SAMPLES):
+        self.languages = sorted(samples)
+        counts = np.ones((len(self.languages), 1 << BUCKET_BITS), dtype=np.float64)
+        for row, language in enumerate(self.languages):
+            counts[row] += np.bincount(trigram_ids(samples[language]), minlength=1 << BUCKET_BITS)
+        self.log_probs = np.log(counts / counts.sum(axis=1, keepdims=True)).astype(np.float32)
+
+    def classify(self, text: str) -> Tuple[Optional[str], float]:
+        """Most likely language of the text and a confidence in [0, 1], or (None, 0.0) for too little text"""
+        ids = trigram_ids(text)
+        if len(ids) < MIN_TRIGRAMS:
+            return None, 0.0
+        scores = self.log_probs[:, ids].mean(axis=1, dtype=np.float64) * CONFIDENCE_SCALE
+        weights = np.exp(scores - scores.max())
+        best = int(np.argmax(scores))
+        return self.languages[best], float(weights[best] / weights.sum())
+
+_profiles: Optional[LanguageProfiles] = None
+
+def get_profiles() -> LanguageProfiles:
+    global _profiles
+    if _profiles is None:
+        _profiles = LanguageProfiles()
+    return _profiles
+
+def sample_cue_text(text: str, ass: bool = False) -> str:
+    """Cue text from evenly spaced windows of a subtitle file, without timings, numbering or markup"""
+    step = max(len(text) // SAMPLE_WINDOWS, SAMPLE_WINDOW_CHARS)
+    lines = []
+    for start in range(0, len(text), step):
+        # Drop the partial lines at either edge of the window
+        for line in text[start:start + SAMPLE_WINDOW_CHARS].splitlines()[1:-1]:
+            if ass:
+                if line.startswith('Dialogue:'):
+                    lines.append(line.split(',', 9)[-1])
+            elif line.strip() and '-->' not in line and not line.strip().isdigit() and line != 'WEBVTT':
+                lines.append(line)
+    return MARKUP.sub(' ', ' '.join(lines))
+
+def detect_language(text: str, ass: bool = False) -> Tuple[Optional[str], float]:
+    """Language of a subtitle file's decoded text"""
+    return get_profiles().classify(sample_cue_text(text, ass))
@@ -0,0 +1,149 @@
+"""
+Language Profiles - seed dialogue the n-gram language identifier is trained on at startup
+Each sample is everyday subtitle-style speech; a few hundred words is enough for character
+trigram statistics to tell these languages apart on a sampled subtitle file.
+"""
+
+SAMPLES = {
+    'en': """
+        What are you doing here? I thought you left hours ago. I did, but I forgot my keys, and then
+        the car would not start. Come on, we have to go right now, they are waiting for us downstairs.
+        Listen to me, I know this is hard, but you need to trust me. I have never lied to you, not once.
+        Where were you last night? I called you three times and you never picked up the phone.
+        It does not matter anymore. Everything is going to be fine, I promise. Do you want something
+        to drink? There is coffee in the kitchen if you want it. Thank you, that would be nice.
+        I think we should talk about what happened yesterday. She said that he was going to come back
+        with the money, but nobody has seen him since the morning. Why would anyone do something like that?
+        Because they were scared. We are running out of time, so tell me everything you know.
+        I can't believe you would say that to my face. Get out of my house and don't ever come back.
+        Wait, please, just let me explain. I was only trying to help. Okay, what do you want me to do?
+        Let's find out who is behind this before it is too late. The weather should be better tomorrow.
+        My father always told me that the truth would come out eventually. Have you eaten anything today?
+    """,
+    'es': """
+        ¿Qué estás haciendo aquí? Pensé que te habías ido hace horas. Sí, pero olvidé las llaves y luego
+        el coche no quiso arrancar. Vamos, tenemos que irnos ahora mismo, nos están esperando abajo.
+        Escúchame, sé que esto es difícil, pero necesito que confíes en mí. Nunca te he mentido, ni una vez.
+        ¿Dónde estuviste anoche? Te llamé tres veces y nunca contestaste el teléfono.
+        Ya no importa. Todo va a salir bien, te lo prometo. ¿Quieres algo de beber? Hay café en la cocina
+        si quieres. Gracias, eso estaría muy bien. Creo que deberíamos hablar de lo que pasó ayer.
+        Ella dijo que él iba a volver con el dinero, pero nadie lo ha visto desde la mañana.
+        ¿Por qué alguien haría algo así? Porque tenían miedo. Se nos acaba el tiempo, así que dime todo lo que sabes.
+        No puedo creer que me digas eso a la cara. Sal de mi casa y no vuelvas nunca más.
+        Espera, por favor, déjame explicarte. Solo estaba intentando ayudar. Bueno, ¿qué quieres que haga?
+        Vamos a averiguar quién está detrás de esto antes de que sea demasiado tarde. Mañana hará mejor tiempo.
+        Mi padre siempre me decía que la verdad saldría a la luz tarde o temprano. ¿Has comido algo hoy?
+    """,
+    'fr': """
+        Qu'est-ce que tu fais ici? Je croyais que tu étais parti depuis des heures. Oui, mais j'ai oublié
+        mes clés, et ensuite la voiture n'a pas voulu démarrer. Allez, il faut partir maintenant, ils nous
+        attendent en bas. Écoute-moi, je sais que c'est difficile, mais tu dois me faire confiance.
+        Je ne t'ai jamais menti, pas une seule fois. Où étais-tu hier soir? Je t'ai appelé trois fois
+        et tu n'as jamais répondu au téléphone. Ça n'a plus d'importance. Tout va bien se passer, je te le
+        promets. Tu veux quelque chose à boire? Il y a du café dans la cuisine si tu veux. Merci, ce serait
+        gentil. Je pense qu'on devrait parler de ce qui s'est passé hier. Elle a dit qu'il allait revenir
+        avec l'argent, mais personne ne l'a vu depuis ce matin. Pourquoi quelqu'un ferait une chose pareille?
+        Parce qu'ils avaient peur. Le temps presse, alors dis-moi tout ce que tu sais. Je n'arrive pas à croire
+        que tu me dises ça en face. Sors de chez moi et ne reviens jamais. Attends, s'il te plaît, laisse-moi
+        t'expliquer. J'essayais seulement d'aider. D'accord, qu'est-ce que tu veux que je fasse? Trouvons qui
+        est derrière tout ça avant qu'il ne soit trop tard. Il fera plus beau demain. Mon père m'a toujours dit
+        que la vérité finirait par éclater. Est-ce que tu as mangé quelque chose aujourd'hui?
+    """,
+    'de': """
+        Was machst du hier? Ich dachte, du bist schon vor Stunden gegangen. Bin ich auch, aber ich habe meine
+        Schlüssel vergessen, und dann ist das Auto nicht angesprungen. Komm schon, wir müssen sofort los,
+        sie warten unten auf uns. Hör mir zu, ich weiß, dass das schwer ist, aber du musst mir vertrauen.
+        Ich habe dich nie belogen, nicht ein einziges Mal. Wo warst du gestern Abend? Ich habe dich dreimal
+        angerufen und du bist nie ans Telefon gegangen. Das ist jetzt egal. Alles wird gut, das verspreche ich
+        dir. Möchtest du etwas trinken? In der Küche ist Kaffee, wenn du willst. Danke, das wäre schön.
+        Ich glaube, wir sollten darüber reden, was gestern passiert ist. Sie hat gesagt, dass er mit dem Geld
+        zurückkommen würde, aber niemand hat ihn seit dem Morgen gesehen. Warum sollte jemand so etwas tun?
+        Weil sie Angst hatten. Uns läuft die Zeit davon, also erzähl mir alles, was du weißt. Ich kann nicht
+        glauben, dass du mir das ins Gesicht sagst. Raus aus meinem Haus und komm nie wieder zurück. Warte,
+        bitte, lass es mich erklären. Ich wollte doch nur helfen. Okay, was soll ich tun? Finden wir heraus,
+        wer dahintersteckt, bevor es zu spät ist. Morgen soll das Wetter besser werden. Mein Vater hat immer
+        gesagt, dass die Wahrheit irgendwann ans Licht kommt. Hast du heute schon etwas gegessen?
+    """,
+    'it': """
+        Che cosa ci fai qui? Pensavo che te ne fossi andato ore fa. Sì, ma ho dimenticato le chiavi, e poi
+        la macchina non voleva partire. Dai, dobbiamo andare subito, ci stanno aspettando di sotto.
+        Ascoltami, so che è difficile, ma devi fidarti di me. Non ti ho mai mentito, neanche una volta.
+        Dove eri ieri sera? Ti ho chiamato tre volte e non hai mai risposto al telefono. Non importa più.
+        Andrà tutto bene, te lo prometto. Vuoi qualcosa da bere? C'è del caffè in cucina se lo vuoi.
+        Grazie, sarebbe gentile. Penso che dovremmo parlare di quello che è successo ieri. Lei ha detto che
+        lui sarebbe tornato con i soldi, ma nessuno lo ha visto da stamattina. Perché qualcuno dovrebbe fare
+        una cosa del genere? Perché avevano paura. Il tempo sta per scadere, quindi dimmi tutto quello che sai.
+        Non posso credere che tu me lo dica in faccia. Esci da casa mia e non tornare mai più. Aspetta, ti prego,
+        lasciami spiegare. Stavo solo cercando di aiutare. Va bene, che cosa vuoi che faccia? Scopriamo chi c'è
+        dietro tutto questo prima che sia troppo tardi. Domani il tempo dovrebbe essere migliore. Mio padre mi
+        diceva sempre che la verità sarebbe venuta a galla prima o poi. Hai mangiato qualcosa oggi?
+    """,
+    'pt': """
+        O que você está fazendo aqui? Pensei que tinha ido embora há horas. Fui, mas esqueci as chaves, e
+        depois o carro não quis pegar. Vamos, temos que ir agora mesmo, eles estão esperando lá embaixo.
+        Escuta, eu sei que isso é difícil, mas você precisa confiar em mim. Eu nunca menti para você, nem uma vez.
+        Onde você estava ontem à noite? Eu liguei três vezes e você nunca atendeu o telefone. Isso não importa
+        mais. Vai ficar tudo bem, eu prometo. Você quer alguma coisa para beber? Tem café na cozinha, se quiser.
+        Obrigado, seria ótimo. Acho que devíamos conversar sobre o que aconteceu ontem. Ela disse que ele ia
+        voltar com o dinheiro, mas ninguém o viu desde a manhã. Por que alguém faria uma coisa dessas?
+        Porque estavam com medo. O nosso tempo está acabando, então me conta tudo o que você sabe. Não acredito
+        que você disse isso na minha cara. Sai da minha casa e nunca mais volte. Espera, por favor, deixa eu
+        explicar. Eu só estava tentando ajudar. Tudo bem, o que você quer que eu faça? Vamos descobrir quem está
+        por trás disso antes que seja tarde demais. Amanhã o tempo deve melhorar. O meu pai sempre me dizia que
+        a verdade acabaria aparecendo. Você já comeu alguma coisa hoje? Não, ainda não, estou sem fome.
+    """,
+    'nl': """
+        Wat doe jij hier? Ik dacht dat je uren geleden al weg was. Dat was ik ook, maar ik was mijn sleutels
+        vergeten, en toen wilde de auto niet starten. Kom op, we moeten nu meteen gaan, ze wachten beneden
+        op ons. Luister naar me, ik weet dat dit moeilijk is, maar je moet me vertrouwen. Ik heb nooit tegen
+        je gelogen, geen enkele keer. Waar was je gisteravond? Ik heb je drie keer gebeld en je hebt nooit
+        opgenomen. Het maakt niet meer uit. Alles komt goed, dat beloof ik je. Wil je iets drinken? Er staat
+        koffie in de keuken als je wilt. Dank je, dat zou fijn zijn. Ik denk dat we moeten praten over wat er
+        gisteren is gebeurd. Ze zei dat hij terug zou komen met het geld, maar niemand heeft hem sinds vanochtend
+        gezien. Waarom zou iemand zoiets doen? Omdat ze bang waren. We hebben bijna geen tijd meer, dus vertel me
+        alles wat je weet. Ik kan niet geloven dat je dat in mijn gezicht zegt. Ga mijn huis uit en kom nooit
+        meer terug. Wacht, alsjeblieft, laat het me uitleggen. Ik probeerde alleen maar te helpen. Oké, wat wil
+        je dat ik doe? Laten we uitzoeken wie hierachter zit voordat het te laat is. Morgen wordt het beter weer.
+        Mijn vader zei altijd dat de waarheid uiteindelijk boven zou komen. Heb je vandaag al iets gegeten?
+    """,
+    'sv': """
+        Vad gör du här? Jag trodde att du gick för flera timmar sedan. Det gjorde jag, men jag glömde mina
+        nycklar, och sedan ville bilen inte starta. Kom igen, vi måste gå nu, de väntar på oss där nere.
+        Lyssna på mig, jag vet att det här är svårt, men du måste lita på mig. Jag har aldrig ljugit för dig,
+        inte en enda gång. Var var du i går kväll? Jag ringde dig tre gånger och du svarade aldrig. Det spelar
+        ingen roll längre. Allt kommer att bli bra, jag lovar. Vill du ha något att dricka? Det finns kaffe i
+        köket om du vill. Tack, det vore trevligt. Jag tycker att vi borde prata om det som hände i går.
+        Hon sa att han skulle komma tillbaka med pengarna, men ingen har sett honom sedan i morse. Varför skulle
+        någon göra något sådant? För att de var rädda. Vi har ont om tid, så berätta allt du vet. Jag kan inte
+        tro att du säger så rakt i ansiktet på mig. Gå ut ur mitt hus och kom aldrig tillbaka. Vänta, snälla,
+        låt mig förklara. Jag försökte bara hjälpa till. Okej, vad vill du att jag ska göra? Vi tar reda på vem
+        som ligger bakom det här innan det är för sent. Vädret ska bli bättre i morgon. Min pappa sa alltid att
+        sanningen till slut skulle komma fram. Har du ätit något i dag? Nej, jag är inte hungrig just nu.
+    """,
+    'pl': """
+        Co ty tutaj robisz? Myślałem, że wyszedłeś kilka godzin temu. Wyszedłem, ale zapomniałem kluczy, a
+        potem samochód nie chciał odpalić. Chodź, musimy iść natychmiast, czekają na nas na dole. Posłuchaj
+        mnie, wiem, że to trudne, ale musisz mi zaufać. Nigdy cię nie okłamałem, ani razu. Gdzie byłeś wczoraj
+        wieczorem? Dzwoniłem do ciebie trzy razy i nigdy nie odebrałeś telefonu. To już nie ma znaczenia.
+        Wszystko będzie dobrze, obiecuję. Chcesz coś do picia? W kuchni jest kawa, jeśli chcesz. Dziękuję,
+        byłoby miło. Myślę, że powinniśmy porozmawiać o tym, co się wczoraj stało. Powiedziała, że on wróci
+        z pieniędzmi, ale nikt go nie widział od rana. Dlaczego ktoś miałby zrobić coś takiego? Bo się bali.
+        Kończy nam się czas, więc powiedz mi wszystko, co wiesz. Nie mogę uwierzyć, że mówisz mi to prosto
+        w twarz. Wynoś się z mojego domu i nigdy nie wracaj. Zaczekaj, proszę, pozwól mi wyjaśnić. Chciałem
+        tylko pomóc. Dobrze, co mam zrobić? Dowiedzmy się, kto za tym stoi, zanim będzie za późno. Jutro
+        pogoda ma być lepsza. Mój ojciec zawsze mówił, że prawda w końcu wyjdzie na jaw. Jadłeś dzisiaj coś?
+    """,
+    'ru': """
+        Что ты здесь делаешь? Я думал, ты ушёл несколько часов назад. Ушёл, но забыл ключи, а потом машина
+        не захотела заводиться. Давай, нам нужно идти прямо сейчас, они ждут нас внизу. Послушай меня, я знаю,
+        что это трудно, но ты должен мне доверять. Я никогда тебе не врал, ни разу. Где ты был вчера вечером?
+        Я звонил тебе три раза, а ты так и не взял трубку. Это уже не важно. Всё будет хорошо, обещаю.
+        Хочешь чего-нибудь выпить? На кухне есть кофе, если хочешь. Спасибо, было бы неплохо. Думаю, нам нужно
+        поговорить о том, что случилось вчера. Она сказала, что он вернётся с деньгами, но никто не видел его
+        с самого утра. Зачем кому-то делать такое? Потому что они боялись. У нас мало времени, так что расскажи
+        мне всё, что знаешь. Не могу поверить, что ты говоришь мне это в лицо. Убирайся из моего дома и никогда
+        не возвращайся. Подожди, пожалуйста, дай мне объяснить. Я просто хотел помочь. Хорошо, что ты хочешь,
+        чтобы я сделал? Давай выясним, кто за этим стоит, пока не стало слишком поздно. Завтра погода должна быть
+        лучше. Мой отец всегда говорил, что правда рано или поздно выйдет наружу. Ты сегодня что-нибудь ел?
+    """
+}
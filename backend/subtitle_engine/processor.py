@@ -2,21 +2,51 @@ import os
 import json
 import hashlib
 import asyncio
+import time
+import threading
 from pathlib import Path
-from typing import Dict, List, Optional
+import re
+from collections import OrderedDict, deque
+from typing import AsyncIterator, Dict, List, Optional, Tuple
 import pysrt
 import webvtt
 import subprocess
 import ollama
 from dotenv import load_dotenv
 from caption_modes.modes import CaptionModes
+from subtitle_engine.cue_classifier import CueClassifier, ROUTE_LLM, ROUTE_QUICK
+from subtitle_engine.autotune import AdaptiveTuner
+from subtitle_engine.telemetry import LLMTelemetry
+from subtitle_engine.timeline import CueTimeline
+from subtitle_engine.timing import TimingStore, apply_timing
+from subtitle_engine.incremental import align_cues
+from subtitle_engine.stats import subtitle_stats
+from monitoring import metrics
 
 load_dotenv()
 
+# Stop sequences shared by the blocking and streaming generation paths
+STOP_SEQUENCES = ['\n\n', 'Original caption:', 'Transformed caption:']
+# Multi-cue prompts answer with one numbered line per caption, so blank lines must not stop them
+BATCH_STOP_SEQUENCES = ['Original captions:', 'Transformed captions:']
+NUMBERED_LINE = re.compile(r'^\s*(\d+)[.):]\s*(.+?)\s*$')
+
+# Length budget for streamed captions: characters allowed per second of cue display
+STREAM_CHARS_PER_SECOND = float(os.getenv('CAPTION_STREAM_CHARS_PER_SECOND', '25'))
+STREAM_MIN_CHARS = int(os.getenv('CAPTION_STREAM_MIN_CHARS', '80'))
+STREAM_MAX_CHARS = int(os.getenv('CAPTION_STREAM_MAX_CHARS', '400'))
+
+# Deadline-aware degradation: seconds of slack required before a cue's display time
+DEADLINE_MARGIN = float(os.getenv('CAPTION_DEADLINE_MARGIN', '0.5'))
+# Smoothing factor for the per-cue LLM latency estimate
+LATENCY_EWMA_ALPHA = 0.2
+
 class SubtitleProcessor:
     def __init__(self):
         # Initialize Ollama client
-        self.ollama_client = ollama.Client(host=os.getenv('OLLAMA_HOST', 'http://localhost:11434'))
+        self.ollama_host = os.getenv('OLLAMA_HOST', 'http://localhost:11434')
+        self.ollama_client = ollama.Client(host=self.ollama_host)
+        self.async_ollama_client = ollama.AsyncClient(host=self.ollama_host)
         self.current_model = os.getenv('OLLAMA_MODEL', 'llama3.2')
         
         # Test Ollama connection
@@ -40,6 +70,33 @@ class SubtitleProcessor:
         # Load caption modes from our consolidated modes file
         self.caption_modes = CaptionModes.get_all_modes()
         self.quick_transforms = CaptionModes.get_quick_transforms()
+        
+        # Pre-pass that keeps non-dialogue cues away from the LLM
+        self.cue_classifier = CueClassifier(int(os.getenv('CAPTION_MIN_LLM_WORDS', '1')))
+        
+        # Live playback state for deadline-aware streaming
+        self.playheads: Dict[str, tuple] = {}
+        self.llm_latency_estimate = float(os.getenv('CAPTION_LLM_LATENCY_ESTIMATE', '2.0'))
+        
+        # Concurrency and cues-per-prompt autotuning, one tuner per (host, model)
+        self.autotune_path = Path(os.getenv('CAPTION_AUTOTUNE_FILE', './data/autotune.json'))
+        self.tuners: Dict[Tuple[str, str], AdaptiveTuner] = {}
+        
+        # Per-call Ollama metrics and running job ETAs
+        self.telemetry = LLMTelemetry()
+        
+        # Time-indexed cue lookups, keyed by file version and mode
+        self.timelines: "OrderedDict[tuple, CueTimeline]" = OrderedDict()
+        self.max_timelines = int(os.getenv('CAPTION_TIMELINE_CACHE_SIZE', '32'))
+        self.timeline_lock = threading.Lock()
+        
+        # Per-file retiming, applied whenever cues are rendered
+        self.timing = TimingStore()
+        
+        # Parsed cue lists keyed by file version, shared by transforms, lookups and info requests
+        self.parsed: "OrderedDict[tuple, List[Dict]]" = OrderedDict()
+        self.max_parsed = int(os.getenv('CAPTION_PARSE_CACHE_SIZE', '16'))
+        self.parse_lock = threading.Lock()
     
     def get_available_modes(self) -> Dict:
         """Get list of available caption transformation modes"""
@@ -64,9 +121,25 @@ class SubtitleProcessor:
             return False
     
     def parse_subtitle_file(self, subtitle_path: str) -> List[Dict]:
-        """Parse subtitle file into structured data"""
-        subtitle_path = Path(subtitle_path)
+        """Parse subtitle file into structured data
+        
+        Results are cached per (path, mtime, size); the cue dicts are shared, so callers copy before editing.
+        """
+        stat = os.stat(subtitle_path)
+        key = (str(subtitle_path), stat.st_mtime, stat.st_size)
+        with self.parse_lock:
+            if key in self.parsed:
+                self.parsed.move_to_end(key)
+                return list(self.parsed[key])
         
+        subtitles = self._parse_subtitle_file(Path(subtitle_path))
+        with self.parse_lock:
+            self.parsed[key] = subtitles
+            while len(self.parsed) > self.max_parsed:
+                self.parsed.popitem(last=False)
+        return list(subtitles)
+    
+    def _parse_subtitle_file(self, subtitle_path: Path) -> List[Dict]:
         if subtitle_path.suffix.lower() == '.srt':
             return self._parse_srt(subtitle_path)
         elif subtitle_path.suffix.lower() == '.vtt':
@@ -131,55 +204,445 @@ class SubtitleProcessor:
         """Get cache file path for a given cache key"""
         return self.cache_dir / f"{cache_key}.json"
     
+    def _get_lineage_path(self, subtitle_path: str, mode: str) -> Path:
+        """Pointer to the latest cached transformation of a file in a mode, whatever its version"""
+        lineage_key = hashlib.md5(f"{subtitle_path}{mode}".encode()).hexdigest()
+        return self.cache_dir / f"lineage_{lineage_key}.json"
+    
+    def get_tuner(self) -> AdaptiveTuner:
+        """Get the autotuner for the current Ollama host and model"""
+        key = (self.ollama_host, self.current_model)
+        if key not in self.tuners:
+            self.tuners[key] = AdaptiveTuner(self.ollama_host, self.current_model, self.autotune_path)
+        return self.tuners[key]
+    
+    async def _generate(self, prompt: str, options: Dict, mode: str, cues: int = 1) -> Dict:
+        """Run a non-streaming generation without blocking the event loop, recording its metrics"""
+        model = self.current_model
+        started_at = time.monotonic()
+        try:
+            response = await self.async_ollama_client.generate(
+                model=model,
+                prompt=prompt,
+                options=options
+            )
+        except Exception:
+            self.telemetry.record_call(model, mode, None, time.monotonic() - started_at, cues, error=True)
+            raise
+        
+        self.telemetry.record_call(model, mode, response, time.monotonic() - started_at, cues)
+        return response
+    
+    def _response_stats(self, response: Dict) -> Dict:
+        """Extract token throughput from an Ollama response"""
+        eval_count = response.get('eval_count') or 0
+        eval_duration = response.get('eval_duration') or 0
+        return {
+            'eval_count': eval_count,
+            'tokens_per_second': eval_count / (eval_duration / 1e9) if eval_duration else None
+        }
+    
+    async def _llm_transform(self, texts: List[str], mode: str) -> Tuple[List[Optional[str]], Dict]:
+        """Transform one or more captions in a single Ollama call
+        
+        Returns the transformed texts (None where a multi-cue answer was missing a line) and call stats.
+        """
+        prompt = self.caption_modes[mode]['prompt']
+        
+        if len(texts) == 1:
+            full_prompt = f"{prompt}\n\nOriginal caption: {texts[0]}\n\nTransformed caption:"
+            response = await self._generate(full_prompt, {
+                'temperature': 0.7,
+                'top_p': 0.9,
+                'num_predict': 200,
+                'stop': STOP_SEQUENCES
+            }, mode)
+            transformed_text = response['response'].strip()
+            return [transformed_text or texts[0]], self._response_stats(response)
+        
+        numbered = '\n'.join(f"{i + 1}. {text}" for i, text in enumerate(texts))
+        full_prompt = (f"{prompt}\n\nTransform each of the following captions separately. "
+                       f"Reply with exactly one line per caption, numbered the same way.\n\n"
+                       f"Original captions:\n{numbered}\n\nTransformed captions:\n")
+        response = await self._generate(full_prompt, {
+            'temperature': 0.7,
+            'top_p': 0.9,
+            'num_predict': 200 * len(texts),
+            'stop': BATCH_STOP_SEQUENCES
+        }, mode, len(texts))
+        
+        transformed = [None] * len(texts)
+        for line in response['response'].splitlines():
+            match = NUMBERED_LINE.match(line)
+            if match and 1 <= int(match.group(1)) <= len(texts):
+                transformed[int(match.group(1)) - 1] = match.group(2)
+        return transformed, self._response_stats(response)
+
+    async def title_segments(self, excerpts: List[str]) -> List[Optional[str]]:
+        """Short titles for consecutive sections of a video from their dialogue, in one call
+
+        Sections without dialogue get None.
+        """
+        numbered = [(i, text) for i, text in enumerate(excerpts) if text.strip()]
+        if not numbered:
+            return [None] * len(excerpts)
+
+        sections = '\n'.join(f"{n + 1}. {text}" for n, (_, text) in enumerate(numbered))
+        prompt = ("Give each of the following sections of a video a short chapter title of at most "
+                  "six words, based on what is said in it. Reply with exactly one line per section, "
+                  f"numbered the same way, with the title only.\n\nSections:\n{sections}\n\nTitles:\n")
+        response = await self._generate(prompt, {
+            'temperature': 0.3,
+            'num_predict': 20 * len(numbered),
+            'stop': ['Sections:']
+        }, 'chapters', len(numbered))
+
+        titles: List[Optional[str]] = [None] * len(excerpts)
+        for line in response['response'].splitlines():
+            match = NUMBERED_LINE.match(line)
+            if match and 1 <= int(match.group(1)) <= len(numbered):
+                titles[numbered[int(match.group(1)) - 1][0]] = match.group(2).strip('"*')
+        return titles
+
+    def _has_llm_prompt(self, mode: str) -> bool:
+        """Whether a mode transforms through the LLM; unknown modes and empty prompts pass text through"""
+        return mode != 'original' and bool(self.caption_modes.get(mode, {}).get('prompt'))
+    
     async def transform_caption_text(self, text: str, mode: str) -> str:
         """Transform a single caption using the specified mode"""
-        if mode == 'original' or mode not in self.caption_modes:
+        if not self._has_llm_prompt(mode):
             return text
         
-        prompt = self.caption_modes[mode]['prompt']
-        if not prompt:
+        try:
+            # Use Ollama for caption transformation
+            transformed, _ = await self._llm_transform([text], mode)
+            return transformed[0]
+                
+        except Exception as e:
+            print(f"Error transforming caption with Ollama: {e}")
+            # Fallback to quick transform if available
+            if mode in self.quick_transforms:
+                print(f"🔄 Using quick transform fallback for {mode} mode")
+                return self.quick_transforms[mode](text)
+            return text
+    
+    def _transform_without_llm(self, text: str, mode: str, route: str) -> str:
+        """Apply a non-LLM route: the mode's quick transform or passthrough"""
+        if route == ROUTE_QUICK and mode in self.quick_transforms:
+            return self.quick_transforms[mode](text)
+        return text
+    
+    def _report_classification(self, subtitle_path: str, summary: Dict):
+        """Log how many LLM calls the cue classifier saved for a file"""
+        print(f"⏭️ Skipped LLM for {summary['llm_calls_saved']}/{summary['total_cues']} cues "
+              f"({summary['saved_ratio']:.0%}) in {Path(subtitle_path).name}")
+    
+    def _stream_char_budget(self, duration: Optional[float]) -> int:
+        """Maximum transformed caption length for a cue shown for `duration` seconds"""
+        if not duration or duration <= 0:
+            return STREAM_MAX_CHARS
+        return int(min(STREAM_MAX_CHARS, max(STREAM_MIN_CHARS, duration * STREAM_CHARS_PER_SECOND)))
+    
+    async def stream_caption_text(self, text: str, mode: str, duration: Optional[float] = None) -> str:
+        """Transform a single caption from Ollama's token stream, stopping early on stop sequences or length budget"""
+        if not self._has_llm_prompt(mode):
             return text
         
+        prompt = self.caption_modes[mode]['prompt']
+        char_budget = self._stream_char_budget(duration)
+        full_prompt = f"{prompt}\n\nOriginal caption: {text}\n\nTransformed caption:"
+        
+        model = self.current_model
+        started_at = time.monotonic()
+        final_chunk = None
+        streamed_tokens = 0
         try:
-            # Use Ollama for caption transformation
-            full_prompt = f"{prompt}\n\nOriginal caption: {text}\n\nTransformed caption:"
-            
-            response = self.ollama_client.generate(
-                model=self.current_model,
+            stream = await self.async_ollama_client.generate(
+                model=model,
                 prompt=full_prompt,
+                stream=True,
                 options={
                     'temperature': 0.7,
                     'top_p': 0.9,
-                    'max_tokens': 200,
-                    'stop': ['\n\n', 'Original caption:', 'Transformed caption:']
+                    # Roughly 3-4 characters per token; leave headroom for the stop check
+                    'num_predict': char_budget // 3 + 8,
+                    'stop': STOP_SEQUENCES
                 }
             )
             
-            transformed_text = response['response'].strip()
+            generated = ''
+            try:
+                async for chunk in stream:
+                    generated += chunk.get('response', '')
+                    streamed_tokens += 1
+                    
+                    # Cut at the first stop sequence the server did not catch
+                    stop_at = min((generated.find(stop) for stop in STOP_SEQUENCES if stop in generated), default=-1)
+                    if stop_at >= 0:
+                        generated = generated[:stop_at]
+                        break
+                    
+                    # Rambling output: keep what fits and stop paying for tokens
+                    if len(generated.strip()) >= char_budget:
+                        generated = self._trim_to_budget(generated.strip(), char_budget)
+                        break
+                    
+                    if chunk.get('done'):
+                        final_chunk = chunk
+                        break
+            finally:
+                # Closing the stream drops the HTTP connection, which stops generation server-side
+                await stream.aclose()
+            
+            latency = time.monotonic() - started_at
+            self._record_llm_latency(latency)
+            self.telemetry.record_call(model, mode, final_chunk, latency, streamed_tokens=streamed_tokens)
+            transformed_text = generated.strip()
             return transformed_text if transformed_text else text
-                
+        
         except Exception as e:
-            print(f"Error transforming caption with Ollama: {e}")
-            # Fallback to quick transform if available
+            print(f"Error streaming caption from Ollama: {e}")
+            self.telemetry.record_call(model, mode, None, time.monotonic() - started_at, error=True)
             if mode in self.quick_transforms:
                 print(f"🔄 Using quick transform fallback for {mode} mode")
                 return self.quick_transforms[mode](text)
             return text
     
-    async def transform_subtitles(self, subtitle_path: str, mode: str, batch_size: int = 5) -> Dict:
-        """Transform entire subtitle file using specified mode"""
+    def _record_llm_latency(self, seconds: float):
+        """Fold a measured per-cue LLM latency into the running estimate"""
+        self.llm_latency_estimate += LATENCY_EWMA_ALPHA * (seconds - self.llm_latency_estimate)
+    
+    def update_playhead(self, subtitle_path: str, position: float, playing: bool = True):
+        """Record the current playback position for a subtitle being streamed"""
+        self.playheads[subtitle_path] = (position, time.monotonic(), playing)
+    
+    def clear_playhead(self, subtitle_path: str):
+        """Forget playback state once a client stops watching"""
+        self.playheads.pop(subtitle_path, None)
+    
+    def _current_playhead(self, subtitle_path: str) -> Optional[float]:
+        """Extrapolate the playhead from the last reported position, or None if not playing live"""
+        if subtitle_path not in self.playheads:
+            return None
+        position, reported_at, playing = self.playheads[subtitle_path]
+        if not playing:
+            return position
+        return position + (time.monotonic() - reported_at)
+    
+    def _trim_to_budget(self, text: str, char_budget: int) -> str:
+        """Trim text to the budget, preferring a sentence or word boundary"""
+        if len(text) <= char_budget:
+            return text
+        
+        trimmed = text[:char_budget]
+        sentence_end = max(trimmed.rfind('. '), trimmed.rfind('! '), trimmed.rfind('? '))
+        if sentence_end > char_budget // 2:
+            return trimmed[:sentence_end + 1]
+        
+        word_end = trimmed.rfind(' ')
+        if word_end > 0:
+            return trimmed[:word_end].rstrip(',;:') + '...'
+        return trimmed
+    
+    def _load_cached_result(self, cache_path: Path) -> Optional[Dict]:
+        """Load a cached transformation result, or None if missing or unreadable"""
+        if not cache_path.exists():
+            return None
+        
+        try:
+            with open(cache_path, 'r') as f:
+                return json.load(f)
+        except Exception as e:
+            print(f"Error reading cache: {e}")
+            return None
+    
+    def _save_cached_result(self, cache_path: Path, result: Dict):
+        """Write a transformation result to the cache"""
+        try:
+            with open(cache_path, 'w') as f:
+                json.dump(result, f, indent=2)
+            with open(self._get_lineage_path(result['subtitle_path'], result['mode']), 'w') as f:
+                json.dump({"cache_key": result['cache_key']}, f)
+            print(f"💾 Cached transformation result")
+        except Exception as e:
+            print(f"Error caching result: {e}")
+    
+    def _reusable_transforms(self, subtitle_path: str, mode: str, subtitles: List[Dict]) -> Dict[int, str]:
+        """Transformed text from the file's previous version for every cue whose text did not change"""
+        try:
+            with open(self._get_lineage_path(subtitle_path, mode), 'r') as f:
+                previous_key = json.load(f)['cache_key']
+        except (OSError, ValueError, KeyError):
+            return {}
+        previous = self._load_cached_result(self._get_cache_path(previous_key))
+        if not previous or len(previous.get('source_texts', [])) != len(previous.get('subtitles', [])):
+            return {}
+        
+        # Timings come from the current cues, so a resync alone reuses everything
+        transformed = previous['subtitles']
+        originals = [dict(sub, text=text) for sub, text in zip(transformed, previous['source_texts'])]
+        matches = align_cues(originals, subtitles)
+        return {position: transformed[index]['text'] for position, index in enumerate(matches) if index is not None}
+    
+    async def transform_subtitles_stream(self, subtitle_path: str, mode: str, max_concurrent: Optional[int] = None,
+                                         playhead: Optional[float] = None) -> AsyncIterator[Dict]:
+        """Transform a subtitle file, yielding each cue in order as soon as it is ready
+        
+        While a playhead is known for the file, each LLM cue gets a display deadline. Cues the LLM
+        cannot finish in time are emitted with the quick transform (marked `degraded`) and re-emitted
+        with `upgraded` set once the LLM result lands; the cache always receives the LLM result.
+        """
         cache_key = self._get_cache_key(subtitle_path, mode)
         cache_path = self._get_cache_path(cache_key)
         
-        # Check cache first
-        if cache_path.exists():
+        cached_result = self._load_cached_result(cache_path)
+        metrics.caption_cache_requests.inc(result='hit' if cached_result else 'miss')
+        if cached_result:
+            # Every cached cue is final and available at once, so no display deadline can be missed
+            print(f"📋 Streaming cached transformation for {mode} mode")
+            for subtitle in cached_result.get('subtitles', []):
+                yield subtitle
+            return
+        
+        if playhead is not None:
+            self.update_playhead(subtitle_path, playhead)
+        
+        subtitles = self.parse_subtitle_file(subtitle_path)
+        if not self._has_llm_prompt(mode):
+            for subtitle in subtitles:
+                yield subtitle.copy()
+            return
+        
+        routes = self.cue_classifier.classify_cues(subtitles)
+        classification = CueClassifier.summarize(routes)
+        reused = {position: text for position, text in self._reusable_transforms(subtitle_path, mode, subtitles).items()
+                  if routes[position] == ROUTE_LLM}
+        concurrency = max(1, max_concurrent or self.get_tuner().concurrency)
+        semaphore = asyncio.Semaphore(concurrency)
+        started = {}
+        
+        async def transform_cue(position: int, subtitle: Dict, route: str) -> Dict:
+            subtitle_copy = subtitle.copy()
+            if position in reused:
+                subtitle_copy['text'] = reused[position]
+                return subtitle_copy
+            if route != ROUTE_LLM:
+                subtitle_copy['text'] = self._transform_without_llm(subtitle['text'], mode, route)
+                return subtitle_copy
+            
+            metrics.ollama_queue_depth.inc()
             try:
-                with open(cache_path, 'r') as f:
-                    cached_result = json.load(f)
-                    print(f"📋 Using cached transformation for {mode} mode")
-                    return cached_result
-            except Exception as e:
-                print(f"Error reading cache: {e}")
+                async with semaphore:
+                    started[position] = time.monotonic()
+                    duration = subtitle['end_time'] - subtitle['start_time']
+                    subtitle_copy['text'] = await self.stream_caption_text(subtitle['text'], mode, duration)
+                    job.advance(1)
+                    return subtitle_copy
+            finally:
+                metrics.ollama_queue_depth.dec()
+        
+        def predicted_remaining(position: int) -> float:
+            """Seconds until the LLM result for a cue is expected"""
+            if position in started:
+                return max(0.0, started[position] + self.llm_latency_estimate - time.monotonic())
+            # Earlier cues were either awaited or degraded, so only degraded ones can still be ahead
+            queued_ahead = len(degraded) - len(landed)
+            return self.llm_latency_estimate * (1 + queued_ahead / concurrency)
+        
+        def time_until_display(subtitle: Dict) -> Optional[float]:
+            """Seconds until a cue must be on screen, or None without live playback"""
+            current = self._current_playhead(subtitle_path)
+            if current is None:
+                return None
+            return subtitle['start_time'] - current
+        
+        print(f"🎭 Streaming {len(subtitles)} captions in {mode} mode...")
+        self._report_classification(subtitle_path, classification)
+        if reused:
+            print(f"♻️ Reusing {len(reused)} unchanged captions from the previous version of the file")
+        job = self.telemetry.start_job(cache_key, subtitle_path, mode, self.current_model,
+                                       classification['llm'] - len(reused))
+        tasks = [asyncio.create_task(transform_cue(position, subtitle, route))
+                 for position, (subtitle, route) in enumerate(zip(subtitles, routes))]
+        
+        degraded = {}
+        degraded_count = 0
+        # Degraded positions in the order their LLM result arrived
+        landed = deque()
+        
+        def landed_upgrades() -> List[Dict]:
+            """Pop degraded cues whose LLM result has since arrived"""
+            upgrades = []
+            while landed:
+                upgrades.append(dict(degraded.pop(landed.popleft()).result(), upgraded=True))
+            return upgrades
+        
+        try:
+            # Later cues keep generating while earlier ones are handed out
+            for position, task in enumerate(tasks):
+                if not task.done() and routes[position] == ROUTE_LLM and position not in reused:
+                    remaining = time_until_display(subtitles[position])
+                    if remaining is not None:
+                        slack = remaining - DEADLINE_MARGIN
+                        if predicted_remaining(position) <= slack:
+                            await asyncio.wait({task}, timeout=slack)
+                        
+                        if not task.done():
+                            # Deadline missed: show the quick transform now, upgrade later
+                            degraded[position] = task
+                            degraded_count += 1
+                            task.add_done_callback(lambda _, position=position: landed.append(position))
+                            fallback = subtitles[position].copy()
+                            fallback['text'] = self._transform_without_llm(fallback['text'], mode, ROUTE_QUICK)
+                            fallback['degraded'] = True
+                            yield fallback
+                            continue
+                
+                yield await task
+                for upgrade in landed_upgrades():
+                    yield upgrade
+            
+            for task in list(degraded.values()):
+                await task
+            for upgrade in landed_upgrades():
+                yield upgrade
+            # Results whose done callbacks have not run yet
+            for position in list(degraded):
+                yield dict(degraded.pop(position).result(), upgraded=True)
+        finally:
+            self.telemetry.finish_job(cache_key)
+            for task in tasks:
+                if not task.done():
+                    task.cancel()
+        
+        if degraded_count:
+            print(f"⏱️ {degraded_count} cues missed their deadline and were upgraded after display")
+        
+        self._save_cached_result(cache_path, {
+            "mode": mode,
+            "subtitle_path": subtitle_path,
+            "subtitles": [task.result() for task in tasks],
+            "source_texts": [subtitle['text'] for subtitle in subtitles],
+            "cache_key": cache_key,
+            "classification": classification,
+            "reused": len(reused)
+        })
+    
+    async def transform_subtitles(self, subtitle_path: str, mode: str, batch_size: Optional[int] = None) -> Dict:
+        """Transform entire subtitle file using specified mode
+        
+        Cues flow through a continuously fed worker pipeline. Concurrency and cues-per-prompt
+        come from the autotuner unless `batch_size` pins a fixed concurrency of single-cue calls.
+        """
+        cache_key = self._get_cache_key(subtitle_path, mode)
+        cache_path = self._get_cache_path(cache_key)
+        
+        # Check cache first
+        cached_result = self._load_cached_result(cache_path)
+        metrics.caption_cache_requests.inc(result='hit' if cached_result else 'miss')
+        if cached_result:
+            print(f"📋 Using cached transformation for {mode} mode")
+            return cached_result
         
         # Parse original subtitles
         try:
@@ -187,7 +650,8 @@ class SubtitleProcessor:
         except Exception as e:
             return {"error": f"Failed to parse subtitle file: {e}"}
         
-        if mode == 'original':
+        if not self._has_llm_prompt(mode):
+            # Original, unknown or prompt-less modes pass the cues through unchanged
             result = {
                 "mode": mode,
                 "subtitle_path": subtitle_path,
@@ -195,51 +659,125 @@ class SubtitleProcessor:
                 "cache_key": cache_key
             }
         else:
-            # Transform subtitles in batches
             print(f"🎭 Transforming {len(subtitles)} captions to {mode} mode...")
             
+            # Only real dialogue goes to the LLM; the rest is resolved up front
+            routes = self.cue_classifier.classify_cues(subtitles)
+            classification = CueClassifier.summarize(routes)
+            self._report_classification(subtitle_path, classification)
+            
             transformed_subtitles = []
-            for i in range(0, len(subtitles), batch_size):
-                batch = subtitles[i:i + batch_size]
-                
-                # Transform batch
-                tasks = []
-                for subtitle in batch:
-                    task = self.transform_caption_text(subtitle['text'], mode)
-                    tasks.append(task)
-                
-                # Wait for batch to complete
-                transformed_texts = await asyncio.gather(*tasks)
+            llm_positions = []
+            for position, (subtitle, route) in enumerate(zip(subtitles, routes)):
+                subtitle_copy = subtitle.copy()
+                if route == ROUTE_LLM:
+                    llm_positions.append(position)
+                else:
+                    subtitle_copy['text'] = self._transform_without_llm(subtitle['text'], mode, route)
+                transformed_subtitles.append(subtitle_copy)
+            
+            # After an edit to the file, only changed or new dialogue goes back to the LLM
+            reused = self._reusable_transforms(subtitle_path, mode, subtitles)
+            reused_count = 0
+            for position in llm_positions:
+                if position in reused:
+                    transformed_subtitles[position]['text'] = reused[position]
+                    reused_count += 1
+            if reused_count:
+                llm_positions = [position for position in llm_positions if position not in reused]
+                print(f"♻️ Reusing {reused_count} unchanged captions, {len(llm_positions)} left for the LLM")
+            
+            # Each run tunes its own copy so concurrent transformations don't share measurement windows
+            shared_tuner = None if batch_size else self.get_tuner()
+            tuner = shared_tuner.begin_run() if shared_tuner else None
+            
+            async def run_chunk(positions: List[int]) -> Tuple[List[int], List[str]]:
+                texts = [subtitles[position]['text'] for position in positions]
+                started_at = time.monotonic()
+                try:
+                    transformed, stats = await self._llm_transform(texts, mode)
+                    failed = False
+                except Exception as e:
+                    print(f"Error transforming captions with Ollama: {e}")
+                    transformed, stats, failed = [None] * len(texts), {}, True
                 
-                # Update subtitles with transformed text
-                for subtitle, transformed_text in zip(batch, transformed_texts):
-                    subtitle_copy = subtitle.copy()
-                    subtitle_copy['text'] = transformed_text
-                    transformed_subtitles.append(subtitle_copy)
+                if tuner:
+                    tuner.record(len(positions), time.monotonic() - started_at, stats.get('tokens_per_second'), failed)
                 
-                print(f"✅ Processed batch {i//batch_size + 1}/{(len(subtitles) + batch_size - 1)//batch_size}")
+                for i, text in enumerate(texts):
+                    if transformed[i] is not None:
+                        continue
+                    if failed:
+                        transformed[i] = self._transform_without_llm(text, mode, ROUTE_QUICK)
+                    else:
+                        # Line missing from a multi-cue answer: retry that cue on its own
+                        transformed[i] = await self.transform_caption_text(text, mode)
+                return positions, transformed
+            
+            # No batch barriers: a new chunk starts as soon as any in-flight call finishes
+            job = self.telemetry.start_job(cache_key, subtitle_path, mode, self.current_model, len(llm_positions))
+            pending = deque(llm_positions)
+            in_flight = set()
+            completed = 0
+            next_report = 0.1
+            metrics.ollama_queue_depth.inc(len(llm_positions))
+            try:
+                while pending or in_flight:
+                    concurrency = tuner.concurrency if tuner else batch_size
+                    cues_per_prompt = tuner.cues_per_prompt if tuner else 1
+                    while pending and len(in_flight) < concurrency:
+                        chunk = [pending.popleft() for _ in range(min(cues_per_prompt, len(pending)))]
+                        in_flight.add(asyncio.create_task(run_chunk(chunk)))
+                    
+                    done, in_flight = await asyncio.wait(in_flight, return_when=asyncio.FIRST_COMPLETED)
+                    for task in done:
+                        positions, transformed = task.result()
+                        for position, transformed_text in zip(positions, transformed):
+                            transformed_subtitles[position]['text'] = transformed_text
+                        completed += len(positions)
+                        job.advance(len(positions))
+                        metrics.ollama_queue_depth.dec(len(positions))
+                    
+                    if completed >= next_report * len(llm_positions):
+                        eta = job.eta_seconds()
+                        print(f"✅ Processed {completed}/{len(llm_positions)} captions"
+                              + (f" (concurrency {tuner.concurrency}, {tuner.cues_per_prompt} cues/prompt)" if tuner else "")
+                              + (f", ETA {eta:.0f}s" if eta is not None else ""))
+                        next_report = completed / len(llm_positions) + 0.1
+            finally:
+                metrics.ollama_queue_depth.dec(len(llm_positions) - completed)
+                self.telemetry.finish_job(cache_key)
+                for task in in_flight:
+                    task.cancel()
+            
+            if tuner:
+                shared_tuner.merge(tuner)
+                shared_tuner.save()
             
             result = {
                 "mode": mode,
                 "subtitle_path": subtitle_path,
                 "subtitles": transformed_subtitles,
-                "cache_key": cache_key
+                "source_texts": [subtitle['text'] for subtitle in subtitles],
+                "cache_key": cache_key,
+                "classification": classification,
+                "reused": reused_count,
+                "autotune": tuner.get_state() if tuner else None
             }
         
         # Cache the result
-        try:
-            with open(cache_path, 'w') as f:
-                json.dump(result, f, indent=2)
-            print(f"💾 Cached transformation result")
-        except Exception as e:
-            print(f"Error caching result: {e}")
+        self._save_cached_result(cache_path, result)
         
         return result
     
+    def apply_timing(self, subtitle_path: Optional[str], subtitles: List[Dict]) -> List[Dict]:
+        """Cues with the file's stored timing adjustments applied (the cached cues stay untouched)"""
+        return apply_timing(subtitles, self.timing.get(subtitle_path)) if subtitle_path else subtitles
+    
     def export_subtitles(self, subtitles_data: Dict, output_path: str, format: str = 'srt') -> bool:
         """Export transformed subtitles to file"""
         try:
-            subtitles = subtitles_data['subtitles']
+            subtitles = self.apply_timing(subtitles_data.get('subtitle_path'), subtitles_data['subtitles'])
             
             if format.lower() == 'srt':
                 return self._export_srt(subtitles, output_path)
@@ -275,21 +813,25 @@ class SubtitleProcessor:
             print(f"Error exporting SRT: {e}")
             return False
     
+    def format_vtt(self, subtitles: List[Dict], header: Optional[List[str]] = None) -> str:
+        """Render cues as a WebVTT document; `header` lines go right after the signature"""
+        vtt_content = ["WEBVTT", *(header or []), ""]
+        
+        for sub in subtitles:
+            start_time = self._seconds_to_vtt_time(sub['start_time'])
+            end_time = self._seconds_to_vtt_time(sub['end_time'])
+            
+            vtt_content.append(f"{start_time} --> {end_time}")
+            vtt_content.append(sub['text'])
+            vtt_content.append("")  # Blank line between subtitles
+        
+        return '\n'.join(vtt_content)
+    
     def _export_vtt(self, subtitles: List[Dict], output_path: str) -> bool:
         """Export subtitles as VTT format"""
         try:
-            vtt_content = ["WEBVTT", ""]
-            
-            for sub in subtitles:
-                start_time = self._seconds_to_vtt_time(sub['start_time'])
-                end_time = self._seconds_to_vtt_time(sub['end_time'])
-                
-                vtt_content.append(f"{start_time} --> {end_time}")
-                vtt_content.append(sub['text'])
-                vtt_content.append("")  # Blank line between subtitles
-            
             with open(output_path, 'w', encoding='utf-8') as f:
-                f.write('\n'.join(vtt_content))
+                f.write(self.format_vtt(subtitles))
             
             return True
             
@@ -315,23 +857,67 @@ class SubtitleProcessor:
         
         return f"{hours:02d}:{minutes:02d}:{secs:02d}.{milliseconds:03d}"
     
-    def get_subtitle_info(self, subtitle_path: str) -> Dict:
-        """Get information about a subtitle file"""
+    def get_subtitle_info(self, subtitle_path: str, stats: Optional[Dict] = None) -> Dict:
+        """Get information about a subtitle file, from scan-time stats when the library has them"""
         try:
-            subtitles = self.parse_subtitle_file(subtitle_path)
+            stats = stats or subtitle_stats(subtitle_path)
             
             return {
                 "path": subtitle_path,
-                "format": Path(subtitle_path).suffix.lower(),
-                "count": len(subtitles),
-                "duration": subtitles[-1]['end_time'] if subtitles else 0,
-                "languages": ["en"],  # Could be enhanced to detect language
+                "format": stats["format"],
+                "count": stats["count"],
+                "duration": stats["duration"],
+                "encoding": stats["encoding"],
+                "languages": [stats["language"]] if stats["language"] else [],
+                "language_confidence": stats.get("language_confidence"),
                 "available_modes": list(self.caption_modes.keys())
             }
             
         except Exception as e:
             return {"error": f"Failed to analyze subtitle file: {e}"}
     
+    def get_timeline(self, subtitle_path: str, mode: str) -> Optional[CueTimeline]:
+        """Timeline of the original cues, or of a finished transformation (None if not cached yet)"""
+        stat = os.stat(subtitle_path)
+        timing = self.timing.get(subtitle_path)
+        key = (subtitle_path, mode, stat.st_mtime, stat.st_size, json.dumps(timing, sort_keys=True))
+        with self.timeline_lock:
+            if key in self.timelines:
+                self.timelines.move_to_end(key)
+                return self.timelines[key]
+        
+        if mode == 'original':
+            subtitles = self.parse_subtitle_file(subtitle_path)
+        else:
+            # Lookups never start LLM work; transform the file first
+            cached_result = self._load_cached_result(self._get_cache_path(self._get_cache_key(subtitle_path, mode)))
+            if not cached_result:
+                return None
+            subtitles = cached_result.get('subtitles', [])
+        
+        timeline = CueTimeline(apply_timing(subtitles, timing))
+        with self.timeline_lock:
+            self.timelines[key] = timeline
+            if len(self.timelines) > self.max_timelines:
+                self.timelines.popitem(last=False)
+        return timeline
+    
+    def lookup_cues(self, subtitle_path: str, modes: List[str], time: float, end: Optional[float] = None,
+                    next_count: int = 3) -> Dict:
+        """Cues on screen at `time` (or during [time, end)) and the next few, per mode"""
+        results = {}
+        for mode in modes:
+            timeline = self.get_timeline(subtitle_path, mode)
+            if timeline is None:
+                results[mode] = {"status": "not_transformed", "active": [], "next": []}
+                continue
+            results[mode] = {
+                "status": "ready",
+                "active": timeline.overlapping(time, end),
+                "next": timeline.upcoming(end if end and end > time else time, next_count)
+            }
+        return results
+    
     def get_available_models(self) -> List[Dict]:
         """Get list of available Ollama models"""
         try:
@@ -0,0 +1,102 @@
+"""
+Subtitle Stats - cue count, duration, encoding and language of a subtitle file
+Computed by the media scanner from the raw text without parsing cues
+plus a trigram language check on sampled cues, so subtitle info can be answered from the library entry.
+"""
+
+import os
+import re
+import codecs
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+from subtitle_engine.language import detect_language
+
+# Bumped whenever stored stats gain fields, so the next scan recomputes them
+STATS_VERSION = 2
+LANGUAGE_MIN_CONFIDENCE = float(os.getenv('SUBTITLE_LANGUAGE_MIN_CONFIDENCE', '0.5'))
+PREFERRED_LANGUAGES = [code.strip() for code in os.getenv('SUBTITLE_LANGUAGES', 'en').split(',') if code.strip()]
+
+# 00:01:02,345 --> 00:01:04,000 (SRT) or 01:02.345 --> 01:04.000 (VTT)
+CUE_TIMING = re.compile(r'^\s*(?:\d+:)?\d{1,2}:\d{2}[,.]\d{1,3}\s*-->\s*(?:(\d+):)?(\d{1,2}):(\d{2})[,.](\d{1,3})', re.M)
+# Dialogue: 0,0:01:02.34,0:01:04.00,... (ASS/SSA)
+ASS_DIALOGUE = re.compile(r'^Dialogue:[^,]*,[^,]*,(\d+):(\d{2}):(\d{2})\.(\d{1,3})', re.M)
+
+BOMS = [(codecs.BOM_UTF8, 'utf-8-sig'), (codecs.BOM_UTF16_LE, 'utf-16'), (codecs.BOM_UTF16_BE, 'utf-16')]
+
+# Language tags in file names like Movie.en.srt or Movie.English.forced.srt
+LANGUAGE_TAGS = {
+    'en': 'en', 'eng': 'en', 'english': 'en',
+    'es': 'es', 'spa': 'es', 'spanish': 'es',
+    'fr': 'fr', 'fre': 'fr', 'fra': 'fr', 'french': 'fr',
+    'de': 'de', 'ger': 'de', 'deu': 'de', 'german': 'de',
+    'it': 'it', 'ita': 'it', 'italian': 'it',
+    'pt': 'pt', 'por': 'pt', 'portuguese': 'pt',
+    'nl': 'nl', 'dut': 'nl', 'nld': 'nl', 'dutch': 'nl',
+    'sv': 'sv', 'swe': 'sv', 'swedish': 'sv',
+    'pl': 'pl', 'pol': 'pl', 'polish': 'pl',
+    'ru': 'ru', 'rus': 'ru', 'russian': 'ru'
+}
+
+def signature(path: str) -> Dict:
+    stat = os.stat(path)
+    return {'mtime': stat.st_mtime, 'size': stat.st_size}
+
+def decode_subtitle(raw: bytes) -> Tuple[str, str]:
+    """Text and encoding of a subtitle file: BOM, then UTF-8, then Windows-1252"""
+    for bom, encoding in BOMS:
+        if raw.startswith(bom):
+            return raw.decode(encoding, errors='replace'), encoding
+    try:
+        return raw.decode('utf-8'), 'utf-8'
+    except UnicodeDecodeError:
+        return raw.decode('cp1252', errors='replace'), 'cp1252'
+
+def filename_language(path: str) -> Optional[str]:
+    """Language from a tag between the video stem and the extension, if any"""
+    for part in reversed(Path(path).stem.lower().split('.')[1:]):
+        if part in LANGUAGE_TAGS:
+            return LANGUAGE_TAGS[part]
+    return None
+
+def language_rank(language: Optional[str]) -> int:
+    """Sort key for subtitle tracks: preferred languages in order, then unknown, then the rest"""
+    if language in PREFERRED_LANGUAGES:
+        return PREFERRED_LANGUAGES.index(language)
+    return len(PREFERRED_LANGUAGES) + (1 if language else 0)
+
+def order_subtitles(subtitles: List[str], stats: Optional[Dict[str, Dict]] = None) -> List[str]:
+    """Distinct subtitle paths, preferred languages first (detected language, else the file name tag)"""
+    stats = stats or {}
+    def rank(path: str) -> int:
+        language = stats.get(path, {}).get('language') or filename_language(path)
+        return language_rank(language)
+    return sorted(dict.fromkeys(subtitles), key=rank)
+
+def _seconds(hours: Optional[str], minutes: str, seconds: str, fraction: str) -> float:
+    return int(hours or 0) * 3600 + int(minutes) * 60 + int(seconds) + int(fraction) / 10 ** len(fraction)
+
+def subtitle_stats(path: str) -> Dict:
+    """Stats of one subtitle file, stamped with the mtime/size they were computed from"""
+    stats = {'version': STATS_VERSION, 'signature': signature(path), 'format': Path(path).suffix.lower()}
+    with open(path, 'rb') as f:
+        text, stats['encoding'] = decode_subtitle(f.read())
+
+    # Count timing markers and read only the last cue's end, which keeps this to C-speed scans
+    ass = stats['format'] in ('.ass', '.ssa')
+    marker = '\nDialogue:' if ass else '-->'
+    text_with_edge = '\n' + text
+    stats['count'] = text_with_edge.count(marker)
+    last_line = text_with_edge.rfind('\n', 0, text_with_edge.rfind(marker) + 1) + 1
+    last = (ASS_DIALOGUE if ass else CUE_TIMING).search(text_with_edge, last_line)
+    stats['duration'] = round(_seconds(*last.groups()), 3) if last else 0.0
+
+    # The file name tag only decides when the cue text is too short or ambiguous
+    language, confidence = detect_language(text, ass)
+    if language and confidence >= LANGUAGE_MIN_CONFIDENCE:
+        stats['language'], stats['language_source'] = language, 'content'
+    else:
+        stats['language'] = filename_language(path)
+        stats['language_source'] = 'filename' if stats['language'] else None
+    stats['language_confidence'] = round(confidence, 3)
+    return stats
@@ -0,0 +1,149 @@
+"""
+LLM Telemetry - per-call Ollama metrics, per model/mode aggregates and live ETAs
+Ollama reports its own timings (nanoseconds) on every final response; those are
+folded into running totals so throughput changes between models are visible.
+"""
+
+import time
+from typing import Dict, Optional
+from monitoring import metrics
+
+# Ollama response fields captured per call (durations are nanoseconds)
+OLLAMA_FIELDS = ('eval_count', 'eval_duration', 'prompt_eval_count', 'prompt_eval_duration',
+                 'load_duration', 'total_duration')
+
+class TransformJob:
+    """Progress of one running transformation, with an ETA from recent cue throughput"""
+
+    def __init__(self, job_id: str, subtitle_path: str, mode: str, model: str,
+                 total_cues: int, seconds_per_cue: Optional[float] = None):
+        self.job_id = job_id
+        self.subtitle_path = subtitle_path
+        self.mode = mode
+        self.model = model
+        self.total_cues = total_cues
+        self.completed_cues = 0
+        self.started_at = time.time()
+        self._started_monotonic = time.monotonic()
+        self._last_update = self._started_monotonic
+        # Seeded from the model/mode history until this job has its own measurements
+        self.seconds_per_cue = seconds_per_cue
+
+    def advance(self, cues: int):
+        """Record finished cues and update the per-cue time estimate"""
+        if cues <= 0:
+            return
+        now = time.monotonic()
+        observed = (now - self._last_update) / cues
+        self._last_update = now
+        self.completed_cues += cues
+        if self.seconds_per_cue is None:
+            self.seconds_per_cue = observed
+        else:
+            self.seconds_per_cue += 0.2 * (observed - self.seconds_per_cue)
+
+    def wall_seconds(self) -> float:
+        return time.monotonic() - self._started_monotonic
+
+    def eta_seconds(self) -> Optional[float]:
+        """Estimated seconds until the job finishes, or None without any data"""
+        if self.seconds_per_cue is None:
+            return None
+        return max(0, self.total_cues - self.completed_cues) * self.seconds_per_cue
+
+    def to_dict(self) -> Dict:
+        eta = self.eta_seconds()
+        return {
+            'job_id': self.job_id,
+            'subtitle_path': self.subtitle_path,
+            'mode': self.mode,
+            'model': self.model,
+            'total_cues': self.total_cues,
+            'completed_cues': self.completed_cues,
+            'progress': round(self.completed_cues / self.total_cues, 3) if self.total_cues else 1.0,
+            'elapsed_seconds': round(time.time() - self.started_at, 1),
+            'eta_seconds': round(eta, 1) if eta is not None else None
+        }
+
+class LLMTelemetry:
+    """Collects Ollama call metrics aggregated per (model, mode) and tracks running jobs"""
+
+    def __init__(self):
+        self.aggregates: Dict[str, Dict] = {}
+        self.jobs: Dict[str, TransformJob] = {}
+        # Wall time and cues of finished jobs per model/mode; unlike summed call latency,
+        # this already reflects however many calls ran concurrently
+        self.job_totals: Dict[str, Dict] = {}
+
+    def record_call(self, model: str, mode: str, response: Optional[Dict], latency: float,
+                    cues: int = 1, error: bool = False, streamed_tokens: int = 0):
+        """Fold one generate call into the (model, mode) aggregate"""
+        metrics.ollama_requests.inc(model=model, outcome='error' if error else 'ok')
+        metrics.ollama_request_duration.observe(latency, model=model)
+        
+        key = f"{model}|{mode}"
+        if key not in self.aggregates:
+            self.aggregates[key] = {
+                'model': model,
+                'mode': mode,
+                'calls': 0,
+                'cues': 0,
+                'errors': 0,
+                'latency_seconds': 0.0,
+                **{field: 0 for field in OLLAMA_FIELDS}
+            }
+        aggregate = self.aggregates[key]
+        aggregate['calls'] += 1
+        aggregate['cues'] += cues
+        aggregate['latency_seconds'] += latency
+        if error:
+            aggregate['errors'] += 1
+
+        response = response or {}
+        for field in OLLAMA_FIELDS:
+            aggregate[field] += response.get(field) or 0
+        if streamed_tokens and not response.get('eval_count'):
+            # Stream closed early: Ollama never sent its final stats, so count what arrived
+            aggregate['eval_count'] += streamed_tokens
+
+    def seconds_per_cue(self, model: str, mode: str) -> Optional[float]:
+        """Historical wall time per cue of finished jobs for a model/mode, used to seed new ETAs"""
+        totals = self.job_totals.get(f"{model}|{mode}")
+        if not totals or not totals['cues']:
+            return None
+        return totals['seconds'] / totals['cues']
+
+    def start_job(self, job_id: str, subtitle_path: str, mode: str, model: str, total_cues: int) -> TransformJob:
+        """Register a running transformation"""
+        job = TransformJob(job_id, subtitle_path, mode, model, total_cues, self.seconds_per_cue(model, mode))
+        self.jobs[job_id] = job
+        return job
+
+    def finish_job(self, job_id: str):
+        """Drop a job once its result is cached, keeping its measured throughput"""
+        job = self.jobs.pop(job_id, None)
+        if not job or not job.completed_cues:
+            return
+        totals = self.job_totals.setdefault(f"{job.model}|{job.mode}", {'seconds': 0.0, 'cues': 0})
+        totals['seconds'] += job.wall_seconds()
+        totals['cues'] += job.completed_cues
+
+    def _summarize(self, aggregate: Dict) -> Dict:
+        calls = aggregate['calls']
+        eval_seconds = aggregate['eval_duration'] / 1e9
+        prompt_seconds = aggregate['prompt_eval_duration'] / 1e9
+        return {
+            **aggregate,
+            'avg_latency_seconds': round(aggregate['latency_seconds'] / calls, 3) if calls else None,
+            'avg_load_seconds': round(aggregate['load_duration'] / 1e9 / calls, 3) if calls else None,
+            'tokens_per_second': round(aggregate['eval_count'] / eval_seconds, 2) if eval_seconds else None,
+            'prompt_tokens_per_second': round(aggregate['prompt_eval_count'] / prompt_seconds, 2) if prompt_seconds else None,
+            'error_rate': round(aggregate['errors'] / calls, 3) if calls else 0.0
+        }
+
+    def get_stats(self) -> Dict:
+        """Aggregates per model/mode plus every running job with its ETA"""
+        return {
+            'models': [self._summarize(aggregate) for aggregate in self.aggregates.values()],
+            'jobs': [job.to_dict() for job in self.jobs.values()]
+        }
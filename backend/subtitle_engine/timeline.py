@@ -0,0 +1,37 @@
+"""
+Cue Timeline - time-indexed lookups over parsed or transformed cues
+Start times are kept sorted next to a running maximum of end times, so the cues on
+screen at any moment are found with two binary searches instead of a scan.
+"""
+
+from typing import Dict, List, Optional
+
+import numpy as np
+
+class CueTimeline:
+    """Sorted start/end arrays over one list of cues"""
+
+    def __init__(self, subtitles: List[Dict]):
+        order = sorted(range(len(subtitles)), key=lambda i: subtitles[i]['start_time'])
+        self.subtitles = [subtitles[i] for i in order]
+        self.starts = np.array([sub['start_time'] for sub in self.subtitles], dtype=np.float64)
+        self.ends = np.array([sub['end_time'] for sub in self.subtitles], dtype=np.float64)
+        # Non-decreasing, so the first cue that can still be on screen is a binary search away
+        self.reach = np.maximum.accumulate(self.ends) if len(self.ends) else self.ends
+
+    def __len__(self) -> int:
+        return len(self.subtitles)
+
+    def overlapping(self, start: float, end: Optional[float] = None) -> List[Dict]:
+        """Cues shown at `start`, or at any point of [start, end)"""
+        first = int(np.searchsorted(self.reach, start, side='right'))
+        if end is None or end <= start:
+            last = int(np.searchsorted(self.starts, start, side='right'))
+        else:
+            last = int(np.searchsorted(self.starts, end, side='left'))
+        return [self.subtitles[i] for i in range(first, last) if self.ends[i] > start]
+
+    def upcoming(self, time: float, count: int) -> List[Dict]:
+        """The next `count` cues starting after `time`"""
+        first = int(np.searchsorted(self.starts, time, side='right'))
+        return self.subtitles[first:first + count]
@@ -0,0 +1,80 @@
+"""
+Subtitle Timing - per-file retiming applied when cues are rendered
+Offset, framerate stretch and drift anchors are stored apart from the subtitle file,
+so retiming never touches its mtime or any cached transformation.
+"""
+
+import os
+import json
+from pathlib import Path
+from typing import Dict, List, Optional
+
+import numpy as np
+
+def normalise_timing(offset: float = 0.0, stretch: float = 1.0, anchors: Optional[List[List[float]]] = None,
+                     source: str = 'manual') -> Dict:
+    """Validated timing parameters
+
+    A cue at time t is shown at t * stretch + offset + drift(t), where drift
+    interpolates the [time, delay] anchors linearly and holds the outer values.
+    `source` tells manual adjustments apart from automatic sync results.
+    """
+    if stretch <= 0:
+        raise ValueError("stretch must be positive")
+    points = sorted((float(time), float(delay)) for time, delay in (anchors or []))
+    if len({time for time, _ in points}) != len(points):
+        raise ValueError("anchor times must be unique")
+    return {'offset': float(offset), 'stretch': float(stretch), 'anchors': [list(point) for point in points],
+            'source': source}
+
+def is_identity(timing: Optional[Dict]) -> bool:
+    return not timing or (timing['offset'] == 0 and timing['stretch'] == 1 and
+                          not any(delay for _, delay in timing['anchors']))
+
+def retime(times: np.ndarray, timing: Dict) -> np.ndarray:
+    adjusted = times * timing['stretch'] + timing['offset']
+    if timing['anchors']:
+        anchor_times, delays = np.array(timing['anchors']).T
+        adjusted += np.interp(times, anchor_times, delays)
+    return np.maximum(adjusted, 0.0)
+
+def apply_timing(subtitles: List[Dict], timing: Optional[Dict]) -> List[Dict]:
+    """Copies of the cues with retimed start/end; the input is returned untouched if there is nothing to do"""
+    if is_identity(timing) or not subtitles:
+        return subtitles
+    starts = retime(np.array([sub['start_time'] for sub in subtitles], dtype=np.float64), timing)
+    ends = retime(np.array([sub['end_time'] for sub in subtitles], dtype=np.float64), timing)
+    ends = np.maximum(ends, starts)
+    return [dict(sub, start_time=start, end_time=end)
+            for sub, start, end in zip(subtitles, np.round(starts, 3).tolist(), np.round(ends, 3).tolist())]
+
+class TimingStore:
+    """Timing parameters per subtitle file, persisted as JSON"""
+
+    def __init__(self, path: Optional[Path] = None):
+        self.path = path or Path(os.getenv('SUBTITLE_TIMING_FILE', './data/subtitle_timing.json'))
+        self.timings: Dict[str, Dict] = {}
+        if self.path.exists():
+            try:
+                with open(self.path, 'r') as f:
+                    self.timings = json.load(f)
+            except Exception as e:
+                print(f"⚠️ Could not read subtitle timings: {e}")
+
+    def get(self, subtitle_path: str) -> Optional[Dict]:
+        return self.timings.get(subtitle_path)
+
+    def set(self, subtitle_path: str, timing: Optional[Dict]):
+        """Store (or with an identity timing, clear) the parameters of a file"""
+        if is_identity(timing):
+            self.timings.pop(subtitle_path, None)
+        else:
+            self.timings[subtitle_path] = timing
+        self._save()
+
+    def _save(self):
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        temp_path = self.path.with_suffix('.tmp')
+        with open(temp_path, 'w') as f:
+            json.dump(self.timings, f, indent=2)
+        temp_path.replace(self.path)
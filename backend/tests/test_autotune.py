@@ -0,0 +1,98 @@
+import json
+
+import pytest
+
+from subtitle_engine import autotune
+from subtitle_engine.autotune import AdaptiveTuner
+
+class Clock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = Clock()
+    monkeypatch.setattr(autotune.time, 'monotonic', clock)
+    return clock
+
+@pytest.fixture
+def tuner(tmp_path, clock):
+    return AdaptiveTuner('http://ollama:11434', 'llama3', tmp_path / 'autotune.json', window=2).begin_run()
+
+def run_window(tuner, clock, cues_per_second, error=False):
+    """Fill one measurement window at the given throughput"""
+    calls = max(tuner.window, tuner.concurrency)
+    clock.now += calls / cues_per_second
+    for index in range(calls):
+        tuner.record(cues=1, latency=0.5, error=error and index == 0)
+
+def test_starts_from_defaults(tuner):
+    assert (tuner.concurrency, tuner.cues_per_prompt) == (2, 1)
+
+def test_climbs_concurrency_while_throughput_improves(tuner, clock):
+    for throughput in (10, 20, 40):
+        run_window(tuner, clock, throughput)
+    assert tuner.concurrency == 5
+    assert tuner.cues_per_prompt == 1
+
+def test_undoes_a_step_that_did_not_pay_off_and_switches_knob(tuner, clock):
+    run_window(tuner, clock, 10)
+    assert tuner.concurrency == 3
+    run_window(tuner, clock, 10)
+    assert tuner.concurrency == 2
+    assert tuner.get_state()['exploring'] == 'cues_per_prompt'
+    run_window(tuner, clock, 10)
+    assert tuner.cues_per_prompt == 2
+
+def test_errors_halve_both_knobs(tuner, clock):
+    tuner.concurrency, tuner.cues_per_prompt = 8, 4
+    run_window(tuner, clock, 50, error=True)
+    assert (tuner.concurrency, tuner.cues_per_prompt) == (4, 2)
+
+def test_knobs_stay_within_limits(tmp_path, clock):
+    tuner = AdaptiveTuner('host', 'model', tmp_path / 'autotune.json', max_concurrency=3, window=1).begin_run()
+    for throughput in range(1, 20):
+        run_window(tuner, clock, throughput * 10)
+    assert 1 <= tuner.concurrency <= 3
+    assert 1 <= tuner.cues_per_prompt <= tuner.max_cues_per_prompt
+    tuner.concurrency = tuner.cues_per_prompt = 1
+    for _ in range(3):
+        run_window(tuner, clock, 1, error=True)
+    assert (tuner.concurrency, tuner.cues_per_prompt) == (1, 1)
+
+def test_overlapping_runs_keep_separate_windows(tmp_path, clock):
+    shared = AdaptiveTuner('host', 'model', tmp_path / 'autotune.json', window=2)
+    first, second = shared.begin_run(), shared.begin_run()
+    # A failing call in one run must not halve the other run's settings
+    run_window(first, clock, 10, error=True)
+    run_window(second, clock, 10)
+    assert (first.concurrency, second.concurrency) == (1, 3)
+    assert shared.concurrency == 2
+
+    shared.merge(second)
+    shared.save()
+    assert AdaptiveTuner('host', 'model', tmp_path / 'autotune.json').concurrency == 3
+    # The next run starts from the merged settings with a fresh window
+    assert shared.begin_run().concurrency == 3
+
+def test_settings_persist_per_host_and_model(tmp_path, clock):
+    path = tmp_path / 'autotune.json'
+    first = AdaptiveTuner('host-a', 'llama3', path)
+    first.concurrency, first.cues_per_prompt = 6, 3
+    first.save()
+    other = AdaptiveTuner('host-b', 'llama3', path)
+    other.concurrency = 4
+    other.save()
+
+    assert set(json.loads(path.read_text())) == {'host-a|llama3', 'host-b|llama3'}
+    restored = AdaptiveTuner('host-a', 'llama3', path)
+    assert (restored.concurrency, restored.cues_per_prompt) == (6, 3)
+    assert AdaptiveTuner('host-a', 'mistral', path).concurrency == 2
+
+def test_unreadable_state_falls_back_to_defaults(tmp_path, clock):
+    path = tmp_path / 'autotune.json'
+    path.write_text('{not json')
+    assert AdaptiveTuner('host', 'model', path).concurrency == 2
@@ -0,0 +1,25 @@
+from media_analysis.signals import load_cues
+from benchmarks.generators import generate_cues, generate_media_tree, generate_subtitle_file
+
+def test_cues_are_reproducible_and_ordered():
+    cues = generate_cues(200, seed=7)
+    assert cues == generate_cues(200, seed=7)
+    assert cues != generate_cues(200, seed=8)
+    assert [cue['index'] for cue in cues] == list(range(1, 201))
+    for cue, following in zip(cues, cues[1:]):
+        assert cue['start_time'] < cue['end_time'] < following['start_time']
+
+def test_subtitle_files_parse_back(tmp_path):
+    for name in ('a.srt', 'a.vtt'):
+        path = generate_subtitle_file(str(tmp_path / name), 50, seed=3)
+        cues = load_cues(path)
+        assert len(cues) == 50
+        assert cues[0]['text'] == generate_cues(50, seed=3)[0]['text']
+
+def test_media_tree_counts_match_the_files_on_disk(tmp_path):
+    created = generate_media_tree(str(tmp_path), 40, seed=1, subtitle_ratio=0.5)
+    videos = [path for path in tmp_path.rglob('*') if path.suffix in ('.mkv', '.mp4', '.avi', '.m4v')]
+    subtitles = [path for path in tmp_path.rglob('*') if path.suffix in ('.srt', '.vtt')]
+    assert created['videos'] == len(videos) == created['tv'] + created['movies'] == 40
+    assert created['subtitles'] == len(subtitles)
+    assert all(path.stat().st_size == 0 for path in videos)
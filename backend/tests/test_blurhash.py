@@ -0,0 +1,54 @@
+from PIL import Image
+
+from media_analysis.artwork import BASE83, _encode83, _linear_to_srgb, _srgb_to_linear, blurhash, build_artwork
+
+def decode83(text):
+    value = 0
+    for char in text:
+        value = value * 83 + BASE83.index(char)
+    return value
+
+def test_encode83_round_trips():
+    for value in (0, 1, 82, 83, 6888, 16777215):
+        assert decode83(_encode83(value, 4)) == value
+    assert _encode83(0, 2) == '00'
+
+def test_srgb_conversion_round_trips():
+    assert all(_linear_to_srgb(_srgb_to_linear(value)) == value for value in range(256))
+
+def test_length_and_size_flag_follow_the_component_counts():
+    image = Image.new('RGB', (120, 80), (10, 120, 200))
+    assert len(blurhash(image)) == 6 + 2 * 11
+    assert blurhash(image)[0] == _encode83(3 + 2 * 9, 1)
+    small = blurhash(image, x_components=1, y_components=1)
+    assert len(small) == 6
+    assert small[:2] == '00'
+
+def test_average_colour_of_a_solid_image():
+    for colour in ((255, 0, 0), (10, 120, 200), (255, 255, 255)):
+        dc = decode83(blurhash(Image.new('RGB', (50, 75), colour))[2:6])
+        assert (dc >> 16, (dc >> 8) & 255, dc & 255) == colour
+
+def test_structure_changes_the_hash():
+    left = Image.new('RGB', (64, 64), (0, 0, 0))
+    left.paste((255, 255, 255), (0, 0, 32, 64))
+    right = left.transpose(Image.FLIP_LEFT_RIGHT)
+    assert blurhash(left) != blurhash(right)
+    # Same average colour either way
+    assert blurhash(left)[2:6] == blurhash(right)[2:6]
+
+def test_non_rgb_input_is_converted():
+    assert blurhash(Image.new('L', (40, 40), 128)) == blurhash(Image.new('RGB', (40, 40), (128, 128, 128)))
+
+def test_build_artwork_keeps_only_variants_and_manifest(tmp_path):
+    # A previously downloaded original skips the network fetch
+    Image.new('RGB', (600, 900), (200, 30, 30)).save(tmp_path / 'original', 'PNG')
+    manifest = build_artwork('https://image.tmdb.org/t/p/original/x.jpg', str(tmp_path), {'grid': 342, 'detail': 780})
+
+    assert sorted(path.name for path in tmp_path.iterdir()) == ['detail.webp', 'grid.webp', 'manifest.json']
+    assert manifest['variants'] == ['detail', 'grid']
+    assert (manifest['width'], manifest['height']) == (600, 900)
+    with Image.open(tmp_path / 'grid.webp') as grid, Image.open(tmp_path / 'detail.webp') as detail:
+        assert grid.size == (342, 513)
+        # Never upscaled past the original
+        assert detail.size == (600, 900)
@@ -0,0 +1,49 @@
+from media_analysis.chapters import ChapterGenerator, format_container_chapters, plan_boundaries
+
+def signals(duration, black=(), scenes=()):
+    return {'duration': duration, 'black': [list(span) for span in black], 'scenes': [list(scene) for scene in scenes]}
+
+def cues_with_pauses(duration, pauses):
+    """A cue every 3 s, except for silences starting at the given times"""
+    cues, time = [], 0.0
+    while time < duration:
+        pause = next((length for start, length in pauses if start <= time < start + length), None)
+        if pause:
+            time += pause
+            continue
+        cues.append({'start_time': time, 'end_time': time + 2.5, 'text': 'Line.'})
+        time += 3.0
+    return cues
+
+def test_short_files_get_no_chapters():
+    assert plan_boundaries(signals(900, black=[(300, 302)]), [], 120, 600) == []
+
+def test_fades_win_over_plain_scene_cuts():
+    boundaries = plan_boundaries(signals(1800, black=[(598, 600), (1199, 1201)], scenes=[(400, 90), (900, 95)]),
+                                 [], 120, 600)
+    assert boundaries == [600, 1201]
+
+def test_cuts_inside_dialogue_pauses_are_preferred():
+    scenes = [(300, 60), (612, 40), (1212, 40), (1500, 70)]
+    cues = cues_with_pauses(1800, [(606, 10), (1206, 10)])
+    assert plan_boundaries(signals(1800, scenes=scenes), cues, 120, 600) == [612, 1212]
+
+def test_boundaries_keep_the_minimum_length_apart_and_from_the_ends():
+    scenes = [(50, 99), (700, 98), (760, 97), (1750, 99), (1300, 60)]
+    boundaries = plan_boundaries(signals(1800, scenes=scenes), [], 120, 600)
+    assert boundaries == [700, 1300]
+
+def test_container_chapters_are_formatted_for_the_player():
+    chapters = format_container_chapters([{'start_time': '0.0', 'end_time': '61.5', 'tags': {'title': 'Opening'}},
+                                          {'start_time': '61.5', 'end_time': '120'}])
+    assert chapters == [{'id': 0, 'title': 'Opening', 'start_time': 0.0, 'end_time': 61.5},
+                        {'id': 1, 'title': 'Chapter 2', 'start_time': 61.5, 'end_time': 120.0}]
+
+def test_results_for_a_changed_file_are_dropped():
+    entry = {'filepath': '/m/a.mkv', 'file_hash': 'new'}
+    generator = ChapterGenerator(None, lambda path: entry if path == entry['filepath'] else None)
+    generator._store('/m/a.mkv', {'file_hash': 'old', 'source': 'none', 'chapters': []})
+    assert 'chapters' not in entry
+    generator._store('/m/a.mkv', {'file_hash': 'new', 'source': 'none', 'chapters': [], 'excerpts': []})
+    assert entry['chapters'] == {'file_hash': 'new', 'source': 'none', 'chapters': []}
+    assert generator.is_current(entry)
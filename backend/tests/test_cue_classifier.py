@@ -0,0 +1,42 @@
+import pytest
+
+from subtitle_engine.cue_classifier import CueClassifier, ROUTE_LLM, ROUTE_PASSTHROUGH, ROUTE_QUICK
+
+@pytest.fixture
+def classifier():
+    return CueClassifier()
+
+@pytest.mark.parametrize('text', ['', '   ', '[MUSIC]', '(door slams)', '{\\an8}[SIRENS WAILING]',
+                                  '♪ Never gonna give you up ♪', '<i># la la la #</i>', 'JOHN:', '...'])
+def test_non_dialogue_passes_through(classifier, text):
+    assert classifier.classify(text) == ROUTE_PASSTHROUGH
+
+@pytest.mark.parametrize('text', ['Yeah.', 'Oh, okay.', '- Hmm? - What?', 'JOHN: Hey!'])
+def test_interjections_take_the_quick_route(classifier, text):
+    assert classifier.classify(text) == ROUTE_QUICK
+
+@pytest.mark.parametrize('text', ['I told you we should have left earlier.',
+                                  'MARY: [sighs] We need to talk about this.',
+                                  '<i>Where did you put the keys?</i>',
+                                  'Go home.', 'Stop!', 'Oh, hello there.'])
+def test_dialogue_goes_to_the_llm(classifier, text):
+    assert classifier.classify(text) == ROUTE_LLM
+
+def test_dialogue_text_strips_markup_annotations_and_labels(classifier):
+    assert classifier.dialogue_text('<i>DR. SMITH:</i> (coughs) Sit   down.') == 'Sit down.'
+
+def test_short_lines_skip_the_llm_only_when_configured():
+    classifier = CueClassifier(min_llm_words=3)
+    assert classifier.classify('Go home.') == ROUTE_QUICK
+    assert classifier.classify('Where did you go?') == ROUTE_LLM
+
+def test_summarize_counts_routes_and_saved_calls(classifier):
+    routes = classifier.classify_cues([{'text': '[MUSIC]'}, {'text': 'Yeah.'},
+                                       {'text': 'I told you we should have left earlier.'}, {'text': 'Okay.'}])
+    assert routes == [ROUTE_PASSTHROUGH, ROUTE_QUICK, ROUTE_LLM, ROUTE_QUICK]
+    assert classifier.summarize(routes) == {
+        'total_cues': 4, 'llm': 1, 'quick': 2, 'passthrough': 1, 'llm_calls_saved': 3, 'saved_ratio': 0.75
+    }
+
+def test_summarize_empty():
+    assert CueClassifier.summarize([])['saved_ratio'] == 0.0
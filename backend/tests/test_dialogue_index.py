@@ -0,0 +1,87 @@
+import asyncio
+import os
+
+import pytest
+
+from search.dialogue import DialogueIndex, build_match_query, display_title, stream_link
+
+SRT = """1
+00:00:01,000 --> 00:00:03,000
+Where did you put the keys?
+
+2
+00:01:10,500 --> 00:01:12,000
+The keys are on the kitchen table.
+
+3
+00:02:00,000 --> 00:02:02,000
+Nobody expects the Spanish Inquisition!
+"""
+
+@pytest.fixture
+def index(tmp_path):
+    index = DialogueIndex(str(tmp_path / 'dialogue.db'))
+    yield index
+    index.close()
+
+@pytest.fixture
+def movie(tmp_path):
+    subtitle = tmp_path / 'Movie.en.srt'
+    subtitle.write_text(SRT, encoding='utf-8')
+    return {'filepath': str(tmp_path / 'Movie.mkv'), 'subtitles': [str(subtitle)], 'content_type': 'movie',
+            'basic_info': {'title': 'Movie'}}
+
+def test_match_query_quotes_every_term():
+    assert build_match_query('kitchen table') == '"kitchen" "table"'
+    assert build_match_query('"the keys" kitch*') == '"the keys" "kitch"*'
+    # FTS5 syntax typed by the user is searched as words
+    assert build_match_query('keys OR NEAR(table)') == '"keys" "OR" "NEAR table"'
+    assert build_match_query('!!! ""') is None
+
+def test_display_title_and_stream_link():
+    episode = {'filepath': '/tv/x.mkv', 'content_type': 'tv_show', 'basic_info': {'show_name': 'Show', 'season': 2, 'episode': 5}}
+    assert display_title(episode) == 'Show S02E05'
+    assert display_title({'filepath': '/m/Some Film.mp4'}) == 'Some Film'
+    assert stream_link('/m/a b.mkv', 70.5) == '/api/player/stream/%2Fm%2Fa%20b.mkv?start=68.5'
+    assert stream_link('/m/a.mp4', 1.0) == '/api/player/stream/%2Fm%2Fa.mp4#t=0.0'
+
+def test_search_finds_cues_with_time_and_snippet(index, movie):
+    assert index.index_item(movie) == 1
+    results = index.search('keys')
+    assert sorted(result['cue_index'] for result in results) == [0, 1]
+    first = next(result for result in results if result['cue_index'] == 0)
+    assert first['url'].endswith('?start=0.0')
+    kitchen = index.search('kitchen')
+    assert len(kitchen) == 1
+    assert kitchen[0]['start_time'] == 70.5
+    assert kitchen[0]['title'] == 'Movie'
+    assert '<mark>kitchen</mark>' in kitchen[0]['snippet']
+    assert index.search('inquis*')[0]['cue_index'] == 2
+    assert index.search('"table keys"') == []
+
+def test_unchanged_subtitles_are_not_reindexed(index, movie):
+    assert index.index_item(movie) == 1
+    assert index.index_item(movie) == 0
+    subtitle = movie['subtitles'][0]
+    with open(subtitle, 'a', encoding='utf-8') as f:
+        f.write("\n4\n00:03:00,000 --> 00:03:01,000\nGoodbye.\n")
+    os.utime(subtitle, (1, 1))
+    assert index.index_item(movie) == 1
+    assert index.get_stats()['cues'] == 4
+    assert len(index.search('keys')) == 2
+
+def test_sync_drops_vanished_items(index, movie):
+    index.sync([movie])
+    assert index.get_stats()['items'] == 1
+    index.sync([])
+    assert index.get_stats()['cues'] == 0
+    assert index.search('keys') == []
+
+def test_listener_failures_are_logged(index, capsys):
+    async def add_broken_entry():
+        index.on_media_added({'filepath': 'Broken.mkv'})
+        index.on_media_added({'filepath': 'Broken.mkv', 'subtitles': None})
+        await index._run(lambda: None)
+
+    asyncio.run(add_broken_entry())
+    assert capsys.readouterr().out.count('❌ Dialogue index index_item failed') == 1
@@ -0,0 +1,46 @@
+import json
+
+import pytest
+from fastapi.testclient import TestClient
+
+from benchmarks.fake_ollama import FakeOllamaConfig, create_app
+
+PROMPT = "Transform these captions.\nOriginal captions:\n1. Hello there.\n2. Where are you?\nTransformed captions:"
+
+@pytest.fixture
+def client():
+    return TestClient(create_app(FakeOllamaConfig(models=['llama3.2'], latency=0, tokens_per_second=0)))
+
+def generate(client, prompt=PROMPT, **body):
+    return client.post('/api/generate', json={'model': 'llama3.2', 'prompt': prompt, 'stream': False, **body}).json()
+
+def test_answers_are_deterministic_and_keep_cue_numbering(client):
+    first = generate(client)
+    assert first == {**generate(client), 'created_at': first['created_at']}
+    lines = first['response'].splitlines()
+    assert [line.split('.')[0] for line in lines] == ['1', '2']
+    assert lines[0].endswith('Hello there.')
+    assert first['done'] and first['eval_count'] == len(first['response'].split())
+
+def test_streamed_chunks_end_with_timing_fields(client):
+    response = client.post('/api/generate', json={'model': 'llama3.2', 'prompt': PROMPT, 'stream': True})
+    chunks = [json.loads(line) for line in response.text.splitlines()]
+    assert not any(chunk['done'] for chunk in chunks[:-1])
+    assert chunks[-1]['done'] and chunks[-1]['eval_count'] == len(chunks) - 1
+    assert ''.join(chunk['response'] for chunk in chunks) == generate(client)['response']
+
+def test_num_predict_and_stop_sequences(client):
+    assert generate(client, prompt='ramble on', options={'num_predict': 3})['eval_count'] <= 3
+    stopped = generate(client, options={'stop': ['\n2.']})
+    assert '2.' not in stopped['response']
+
+def test_unknown_models_and_injected_errors():
+    client = TestClient(create_app(FakeOllamaConfig(latency=0, error_rate=1.0, error_status=503)))
+    assert client.post('/api/generate', json={'model': 'nope', 'prompt': 'x', 'stream': False}).status_code == 404
+    assert client.post('/api/generate', json={'model': 'llama3.2', 'prompt': 'x', 'stream': False}).status_code == 503
+    assert client.get('/fake/stats').json()['errors'] == 2
+
+def test_embeddings_are_stable_per_text(client):
+    vectors = client.post('/api/embed', json={'model': 'm', 'input': ['a', 'b', 'a']}).json()['embeddings']
+    assert len(vectors[0]) == 384
+    assert vectors[0] == vectors[2] != vectors[1]
@@ -0,0 +1,79 @@
+import asyncio
+import json
+
+import pytest
+
+from streaming import hls
+from streaming.hls import HLSPackager, MediaDurationUnknownError
+
+@pytest.fixture
+def packager(tmp_path):
+    return HLSPackager(cache_dir=str(tmp_path), segment_duration=6)
+
+def test_segments_start_on_keyframes_at_least_the_target_apart(packager):
+    keyframes = [0.0, 2.0, 4.0, 6.5, 8.0, 12.0, 13.0, 19.0]
+    assert packager._plan_segments(keyframes, 21.0) == [
+        {'start': 0.0, 'duration': 6.5},
+        {'start': 6.5, 'duration': 6.5},
+        {'start': 13.0, 'duration': 6.0},
+        {'start': 19.0, 'duration': 2.0},
+    ]
+
+def test_segments_cover_the_whole_file(packager):
+    keyframes = [i * 2.002 for i in range(60)]
+    segments = packager._plan_segments(keyframes, 119.0)
+    assert segments[0]['start'] == 0.0
+    for segment, following in zip(segments, segments[1:]):
+        assert following['start'] == pytest.approx(segment['start'] + segment['duration'], abs=0.002)
+    assert segments[-1]['start'] + segments[-1]['duration'] == pytest.approx(119.0, abs=0.002)
+
+def test_keyframes_past_the_duration_are_ignored(packager):
+    assert packager._plan_segments([0.0, 7.0, 30.0], 10.0) == [{'start': 0.0, 'duration': 7.0},
+                                                               {'start': 7.0, 'duration': 3.0}]
+
+def test_fixed_cuts_without_keyframe_info(packager):
+    assert packager._plan_segments([], 15.0) == [{'start': 0.0, 'duration': 6.0},
+                                                 {'start': 6.0, 'duration': 6.0},
+                                                 {'start': 12.0, 'duration': 3.0}]
+
+def test_unknown_duration_gives_no_segments(packager):
+    assert packager._plan_segments([], 0.0) == []
+
+@pytest.fixture
+def probed(monkeypatch, packager):
+    """Stub ffprobe: the returned dict sets the reported duration"""
+    info = {'duration': None}
+
+    async def probe(path):
+        return {'format': {'duration': info['duration']}} if info['duration'] is not None else None
+
+    async def stream_codecs(path):
+        return {'video': 'h264', 'audio': 'aac'}
+
+    async def no_keyframes(path):
+        return []
+
+    monkeypatch.setattr(hls.media_probe, 'probe', probe)
+    monkeypatch.setattr(hls.media_probe, 'stream_codecs', stream_codecs)
+    monkeypatch.setattr(packager, '_probe_keyframes', no_keyframes)
+    return info
+
+def test_unknown_duration_is_an_error_and_not_persisted(packager, probed, tmp_path):
+    media = tmp_path / 'movie.mkv'
+    media.write_bytes(b'video')
+    with pytest.raises(MediaDurationUnknownError):
+        asyncio.run(packager.playlist(str(media)))
+    assert list(packager.index_dir.iterdir()) == []
+
+    # Once ffprobe can read the file, the next request plans real segments
+    probed['duration'] = '13.0'
+    playlist = asyncio.run(packager.playlist(str(media)))
+    assert playlist.count('#EXTINF') == 3 and playlist.endswith('#EXT-X-ENDLIST\n')
+
+def test_empty_persisted_index_is_probed_again(packager, probed, tmp_path):
+    media = tmp_path / 'movie.mkv'
+    media.write_bytes(b'video')
+    stale = {'file_key': packager._file_key(str(media)), 'duration': 0.0, 'codecs': {}, 'segments': []}
+    (packager.index_dir / f"{stale['file_key']}.json").write_text(json.dumps(stale))
+    probed['duration'] = '5.0'
+    assert asyncio.run(packager.get_index(str(media)))['segments'] == [{'start': 0.0, 'duration': 5.0}]
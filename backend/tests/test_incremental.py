@@ -0,0 +1,41 @@
+from subtitle_engine.incremental import align_cues, cue_key
+
+def cues(*texts, step=2.0, shift=0.0):
+    return [{'index': i + 1, 'start_time': i * step + shift, 'end_time': i * step + shift + 1.5, 'text': text}
+            for i, text in enumerate(texts)]
+
+def test_cue_key_ignores_wrapping_and_case():
+    assert cue_key('Where are\nyou  GOING? ') == 'where are you going?'
+
+def test_unchanged_file_reuses_everything():
+    previous = cues('One.', 'Two.', 'Three.')
+    assert align_cues(previous, cues('One.', 'Two.', 'Three.')) == [0, 1, 2]
+
+def test_resync_keeps_every_cue():
+    previous = cues('One.', 'Two.', 'Three.')
+    assert align_cues(previous, cues('One.', 'Two.', 'Three.', shift=3.5)) == [0, 1, 2]
+
+def test_only_edited_cues_are_new():
+    previous = cues('One.', 'Tow.', 'Three.')
+    assert align_cues(previous, cues('One.', 'Two.', 'Three.')) == [0, None, 2]
+
+def test_inserted_and_deleted_cues():
+    previous = cues('One.', 'Two.', 'Three.', 'Four.')
+    assert align_cues(previous, cues('One.', 'New line.', 'Two.', 'Four.')) == [0, None, 1, 3]
+
+def test_rewrapped_line_is_not_an_edit():
+    previous = cues('Where are\nyou going?', 'Home.')
+    assert align_cues(previous, cues('Where are you going?', 'Home.')) == [0, 1]
+
+def test_repeated_short_lines_pair_by_closest_start():
+    previous = cues('Yeah.', 'Changed A.', 'Yeah.', 'End.')
+    current = cues('Yeah.', 'Yeah.', 'Changed B.', 'End.')
+    matches = align_cues(previous, current)
+    assert matches[0] == 0 and matches[3] == 3
+    assert matches[2] is None
+    # The second "Yeah." maps to an unused previous "Yeah."
+    assert matches[1] == 2
+
+def test_empty_versions():
+    assert align_cues([], cues('One.')) == [None]
+    assert align_cues(cues('One.'), []) == []
@@ -0,0 +1,69 @@
+import numpy as np
+import pytest
+
+from media_analysis.intro import SAMPLE_RATE, IntroDetector, _longest_run, analyze_season, fingerprint, match_segment
+
+rng = np.random.default_rng(1)
+
+def noise(seconds):
+    return rng.standard_normal(int(seconds * SAMPLE_RATE)).astype(np.float32) * 0.3
+
+def episode(path, number, file_hash=None, season=1):
+    return {'filepath': path, 'file_hash': file_hash or f'hash-{number}', 'content_type': 'tv_show',
+            'basic_info': {'show_name': 'Show', 'season': season, 'episode': number}}
+
+class Pool:
+    def __init__(self):
+        self.jobs = []
+
+    def submit(self, key, kind, func, *args, **kwargs):
+        self.jobs.append(key)
+        return True
+
+def test_longest_run():
+    assert _longest_run(np.array([0, 1, 1, 0, 1, 1, 1, 0], dtype=bool)) == (4, 7)
+    assert _longest_run(np.zeros(5, dtype=bool)) == (0, 0)
+
+def test_fingerprint_shape():
+    assert fingerprint(noise(2)).shape[1] == 32
+    assert fingerprint(noise(0.01)).shape == (0, 32)
+
+def test_shared_audio_is_found_on_both_timelines():
+    intro = noise(20)
+    first = np.concatenate([noise(5), intro, noise(20)])
+    second = np.concatenate([noise(12), intro, noise(10)])
+    match = match_segment(fingerprint(first), fingerprint(second))
+    assert match['start_a'] == pytest.approx(5, abs=1)
+    assert match['end_a'] == pytest.approx(25, abs=1)
+    assert match['start_b'] == pytest.approx(12, abs=1)
+    assert match['similarity'] > 0.7
+
+def test_unrelated_audio_does_not_match():
+    assert match_segment(fingerprint(noise(30)), fingerprint(noise(30))) is None
+    assert match_segment(fingerprint(noise(30)), fingerprint(noise(0.01))) is None
+
+def test_lone_episode_gets_a_final_answer(tmp_path):
+    path = tmp_path / 'Show.S01E01.mkv'
+    path.write_bytes(b'')
+    library = {'tv_shows': {str(path): episode(str(path), 1)}}
+    pool = Pool()
+    updates = []
+    detector = IntroDetector(pool, lambda: library, on_update=lambda: updates.append(True), cache_dir=str(tmp_path))
+
+    assert detector.enqueue_missing(library) == 0
+    intro = library['tv_shows'][str(path)]['markers']['intro']
+    assert intro['status'] == 'unavailable'
+    assert detector.is_current(library['tv_shows'][str(path)])
+    assert updates and not pool.jobs
+
+    # A second episode makes the season comparable again
+    second = tmp_path / 'Show.S01E02.mkv'
+    second.write_bytes(b'')
+    library['tv_shows'][str(second)] = episode(str(second), 2)
+    assert detector.enqueue_missing(library) == 1
+    assert pool.jobs == ['intro:Show:1']
+
+def test_episodes_without_audio_are_unavailable(tmp_path):
+    episodes = [(str(tmp_path / f'missing{number}.mkv'), f'hash-{number}') for number in (1, 2)]
+    results = analyze_season(episodes, str(tmp_path), 60, 15, 150)
+    assert {path: result['status'] for path, result in results.items()} == {path: 'unavailable' for path, _ in episodes}
@@ -0,0 +1,58 @@
+import numpy as np
+import pytest
+
+from subtitle_engine.language import (BUCKET_BITS, MIN_TRIGRAMS, detect_language, get_profiles,
+                                      sample_cue_text, trigram_ids)
+
+PASSAGES = {
+    'en': "I don't know what you're talking about. We were supposed to meet at the station an hour ago, "
+          "and you never showed up. Where have you been all this time?",
+    'es': "No sé de qué estás hablando. Se suponía que nos encontraríamos en la estación hace una hora "
+          "y nunca apareciste. ¿Dónde has estado todo este tiempo?",
+    'fr': "Je ne sais pas de quoi tu parles. On devait se retrouver à la gare il y a une heure "
+          "et tu n'es jamais venu. Où étais-tu pendant tout ce temps ?",
+    'de': "Ich weiß nicht, wovon du redest. Wir wollten uns vor einer Stunde am Bahnhof treffen, "
+          "und du bist nie aufgetaucht. Wo warst du die ganze Zeit?",
+    'ru': "Я не понимаю, о чём ты говоришь. Мы должны были встретиться на вокзале час назад, "
+          "а ты так и не пришёл. Где ты был всё это время?",
+}
+
+def test_trigram_ids_are_bucketed_per_character_trigram():
+    ids = trigram_ids('Hello, world!')
+    # " hello world " has 13 characters, so 11 trigrams
+    assert len(ids) == 11
+    assert ids.dtype == np.int64
+    assert ids.min() >= 0 and ids.max() < 1 << BUCKET_BITS
+    assert np.array_equal(ids, trigram_ids('HELLO world 42'))
+
+def test_trigram_ids_of_empty_text():
+    assert len(trigram_ids('')) == 0
+    assert len(trigram_ids('123 !!')) == 0
+
+@pytest.mark.parametrize('language', sorted(PASSAGES))
+def test_classifies_unseen_dialogue(language):
+    detected, confidence = get_profiles().classify(PASSAGES[language])
+    assert detected == language
+    assert 0.5 <= confidence <= 1.0
+
+def test_too_little_text_is_not_classified():
+    assert get_profiles().classify('Oui, merci.') == (None, 0.0)
+    assert len(trigram_ids('Oui, merci.')) < MIN_TRIGRAMS
+
+def test_sample_cue_text_drops_timings_numbers_and_markup():
+    srt = ''.join(f"{i}\n00:00:{i:02d},000 --> 00:00:{i:02d},900\n<i>Line {i} of dialogue</i>\n\n" for i in range(1, 40))
+    sample = sample_cue_text('WEBVTT\n\n' + srt)
+    assert 'dialogue' in sample
+    assert '-->' not in sample and '<i>' not in sample and 'WEBVTT' not in sample
+
+def test_sample_cue_text_reads_only_ass_dialogue_text():
+    ass = '[Events]\n' + ''.join(f"Dialogue: 0,0:00:{i:02d}.00,0:00:{i:02d}.90,Default,,0,0,0,,{{\\i1}}Hello there, {i}\\Nfriend\n"
+                                 for i in range(1, 30))
+    sample = sample_cue_text(ass, ass=True)
+    assert 'Hello there' in sample
+    assert 'Default' not in sample and '\\N' not in sample and '{' not in sample
+
+def test_detect_language_on_a_subtitle_file():
+    lines = PASSAGES['de'].split('. ')
+    srt = ''.join(f"{i + 1}\n00:00:{i:02d},000 --> 00:00:{i:02d},900\n{lines[i % len(lines)]}\n\n" for i in range(40))
+    assert detect_language(srt)[0] == 'de'
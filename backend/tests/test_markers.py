@@ -0,0 +1,50 @@
+from media_analysis.markers import MarkerAnalyzer, detect_credits, detect_recap
+
+def cue(start, end, text='Some dialogue here.'):
+    return {'start_time': start, 'end_time': end, 'text': text}
+
+def signals(duration=1800.0, black=(), scenes=()):
+    return {'duration': duration, 'black': [list(span) for span in black], 'scenes': [list(scene) for scene in scenes]}
+
+def test_credits_start_at_the_fade_after_the_last_line():
+    cues = [cue(10, 12), cue(1700, 1702)]
+    assert detect_credits(signals(black=[(1705, 1707)]), cues) == {'start': 1707, 'end': 1800, 'confidence': 0.8}
+
+def test_credits_fall_back_to_the_last_line():
+    assert detect_credits(signals(), [cue(1700, 1702)]) == {'start': 1702, 'end': 1800, 'confidence': 0.5}
+
+def test_no_credits_when_dialogue_runs_to_the_end_or_stops_too_early():
+    assert detect_credits(signals(), [cue(1790, 1795)]) is None
+    assert detect_credits(signals(), [cue(100, 102)]) is None
+    assert detect_credits(signals(duration=0), []) is None
+
+def test_credits_without_subtitles_use_a_late_fade():
+    black = [(300, 302), (1690, 1692)]
+    assert detect_credits(signals(black=black), []) == {'start': 1692, 'end': 1800, 'confidence': 0.4}
+
+def test_recap_ends_at_the_first_fade():
+    cues = [cue(2, 4, 'Previously on Show...'), cue(6, 8), cue(60, 62)]
+    assert detect_recap(signals(black=[(5, 6), (65, 66)]), cues) == {'start': 1, 'end': 65, 'confidence': 0.7}
+
+def test_recap_ends_at_a_dialogue_pause_and_gains_for_fast_cuts():
+    cues = [cue(2, 4, 'Last time on Show...'), cue(20, 22), cue(50, 52)]
+    scenes = [(time, 40) for time in range(5, 50, 2)]
+    assert detect_recap(signals(scenes=scenes), cues) == {'start': 1, 'end': 22, 'confidence': 0.6}
+
+def test_no_recap_without_an_opener():
+    assert detect_recap(signals(black=[(30, 31)]), [cue(2, 4), cue(6, 8)]) is None
+    assert detect_recap(signals(black=[(400, 401)]), [cue(300, 302, 'Previously on Show...')]) is None
+
+def test_next_episode_links_follow_episode_numbers():
+    library = {'tv_shows': {}}
+    for number in (2, 1, 3):
+        path = f'/tv/Show.S01E0{number}.mkv'
+        library['tv_shows'][path] = {'filepath': path, 'file_hash': f'h{number}', 'content_type': 'tv_show',
+                                     'basic_info': {'show_name': 'Show', 'season': 1, 'episode': number}}
+    analyzer = MarkerAnalyzer(None, lambda: library, lambda path: library['tv_shows'].get(path))
+    analyzer._store({path: {'file_hash': entry['file_hash'], 'credits': None, 'recap': None}
+                     for path, entry in library['tv_shows'].items()})
+    links = {path: entry['markers']['next_episode'] for path, entry in library['tv_shows'].items()}
+    assert links == {'/tv/Show.S01E01.mkv': '/tv/Show.S01E02.mkv', '/tv/Show.S01E02.mkv': '/tv/Show.S01E03.mkv',
+                     '/tv/Show.S01E03.mkv': None}
+    assert all(analyzer.is_current(entry) for entry in library['tv_shows'].values())
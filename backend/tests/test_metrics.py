@@ -0,0 +1,55 @@
+import pytest
+
+from monitoring.metrics import MetricsRegistry
+
+@pytest.fixture
+def registry():
+    return MetricsRegistry()
+
+def test_counter_tracks_each_label_set(registry):
+    counter = registry.counter('requests_total', 'Requests')
+    counter.inc(route='/a')
+    counter.inc(2, route='/a')
+    counter.inc(route='/b')
+    assert counter.get(route='/a') == 3
+    assert counter.get(route='/b') == 1
+    assert counter.get(route='/c') == 0
+
+def test_label_order_does_not_matter(registry):
+    counter = registry.counter('requests_total', 'Requests')
+    counter.inc(route='/a', status=200)
+    counter.inc(status='200', route='/a')
+    assert counter.get(route='/a', status=200) == 2
+
+def test_gauge_goes_up_and_down(registry):
+    gauge = registry.gauge('active', 'Active')
+    gauge.inc()
+    gauge.inc()
+    gauge.dec()
+    assert gauge.get() == 1
+    gauge.set(7)
+    assert gauge.get() == 7
+
+def test_registering_a_name_twice_returns_the_first_metric(registry):
+    first = registry.counter('requests_total', 'Requests')
+    assert registry.counter('requests_total', 'Requests again') is first
+
+def test_histogram_renders_cumulative_buckets(registry):
+    histogram = registry.histogram('latency_seconds', 'Latency', buckets=(0.1, 1.0))
+    for value in (0.05, 0.1, 0.5, 3.0):
+        histogram.observe(value, model='m')
+    lines = registry.render().splitlines()
+    assert lines[:2] == ['# HELP latency_seconds Latency', '# TYPE latency_seconds histogram']
+    assert 'latency_seconds_bucket{model="m",le="0.1"} 2' in lines
+    assert 'latency_seconds_bucket{model="m",le="1.0"} 3' in lines
+    assert 'latency_seconds_bucket{model="m",le="+Inf"} 4' in lines
+    assert 'latency_seconds_sum{model="m"} 3.65' in lines
+    assert 'latency_seconds_count{model="m"} 4' in lines
+
+def test_render_escapes_label_values(registry):
+    registry.counter('files_total', 'Files').inc(path='C:\\media\\"x"\n')
+    assert 'files_total{path="C:\\\\media\\\\\\"x\\"\\n"} 1' in registry.render()
+
+def test_render_without_labels(registry):
+    registry.gauge('up', 'Up').set(1)
+    assert registry.render() == '# HELP up Up\n# TYPE up gauge\nup 1\n'
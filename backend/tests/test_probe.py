@@ -0,0 +1,35 @@
+import asyncio
+import os
+import stat
+
+from streaming.probe import MediaProbe
+
+def fake_ffprobe(directory, output):
+    script = directory / 'ffprobe'
+    script.write_text(f"#!/bin/sh\nprintf '%s' '{output}'\n")
+    script.chmod(script.stat().st_mode | stat.S_IEXEC)
+
+def test_missing_ffprobe_gives_no_info(tmp_path, monkeypatch):
+    media = tmp_path / 'a.mkv'
+    media.write_bytes(b'')
+    monkeypatch.setenv('PATH', str(tmp_path / 'empty'))
+    probe = MediaProbe()
+    assert asyncio.run(probe.probe(str(media))) is None
+    assert asyncio.run(probe.stream_codecs(str(media))) == {'video': None, 'audio': None}
+
+def test_unparseable_output_gives_no_info(tmp_path, monkeypatch):
+    media = tmp_path / 'a.mkv'
+    media.write_bytes(b'')
+    fake_ffprobe(tmp_path, 'not json')
+    monkeypatch.setenv('PATH', f"{tmp_path}{os.pathsep}{os.environ['PATH']}")
+    assert asyncio.run(MediaProbe().probe(str(media))) is None
+
+def test_results_are_cached_until_the_file_changes(tmp_path, monkeypatch):
+    media = tmp_path / 'a.mkv'
+    media.write_bytes(b'')
+    fake_ffprobe(tmp_path, '{"format": {"duration": "12.5"}}')
+    monkeypatch.setenv('PATH', f"{tmp_path}{os.pathsep}{os.environ['PATH']}")
+    probe = MediaProbe()
+    assert asyncio.run(probe.probe(str(media))) == {'format': {'duration': '12.5'}}
+    fake_ffprobe(tmp_path, '{}')
+    assert asyncio.run(probe.probe(str(media))) == {'format': {'duration': '12.5'}}
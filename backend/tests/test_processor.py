@@ -0,0 +1,178 @@
+import asyncio
+import json
+
+import pytest
+
+from subtitle_engine.processor import SubtitleProcessor
+
+class FakeStream:
+    """Async iterator over canned generate chunks that records how far it was read"""
+
+    def __init__(self, chunks, latency=0.0):
+        self.chunks = list(chunks)
+        self.latency = latency
+        self.consumed = 0
+        self.closed = False
+
+    def __aiter__(self):
+        return self
+
+    async def __anext__(self):
+        if self.consumed >= len(self.chunks):
+            raise StopAsyncIteration
+        await asyncio.sleep(self.latency)
+        chunk = self.chunks[self.consumed]
+        self.consumed += 1
+        return chunk
+
+    async def aclose(self):
+        self.closed = True
+
+class StreamingOllama:
+    """Stand-in for ollama.AsyncClient whose streamed answers come from a callable"""
+
+    def __init__(self, answer, latency=0.0):
+        self.answer = answer
+        self.latency = latency
+        self.streams = []
+
+    async def generate(self, model='', prompt='', options=None, stream=False):
+        caption = prompt.rsplit('Original caption: ', 1)[1].split('\n')[0]
+        chunks = [{'response': token} for token in self.answer(caption)] + [{'response': '', 'done': True}]
+        self.streams.append(FakeStream(chunks, self.latency))
+        return self.streams[-1]
+
+@pytest.fixture
+def processor(tmp_path, monkeypatch):
+    monkeypatch.setenv('CAPTION_MODE_CACHE_DIR', str(tmp_path / 'cache'))
+    monkeypatch.setenv('CAPTION_AUTOTUNE_FILE', str(tmp_path / 'autotune.json'))
+    monkeypatch.setenv('SUBTITLE_TIMING_FILE', str(tmp_path / 'timing.json'))
+    monkeypatch.setattr(SubtitleProcessor, 'get_available_models', lambda self: [])
+    return SubtitleProcessor()
+
+def test_stream_returns_full_text_without_limit(processor):
+    processor.async_ollama_client = StreamingOllama(lambda caption: ['Ahoy ', 'there', ', matey!'])
+    text = asyncio.run(processor.stream_caption_text('Hello there, friend.', 'pirate', duration=3.0))
+    assert text == 'Ahoy there, matey!'
+    stream = processor.async_ollama_client.streams[0]
+    assert stream.consumed == len(stream.chunks)
+    assert stream.closed
+
+def test_stream_stops_at_stop_sequence(processor):
+    answer = ['Arr, ', 'matey!', '\n\n', 'Original caption: ', 'more ', 'rambling']
+    processor.async_ollama_client = StreamingOllama(lambda caption: answer)
+    text = asyncio.run(processor.stream_caption_text('Hello there, friend.', 'pirate', duration=3.0))
+    assert text == 'Arr, matey!'
+    stream = processor.async_ollama_client.streams[0]
+    # Nothing after the stop sequence was read, and the connection was dropped
+    assert stream.consumed == 3
+    assert stream.closed
+
+def test_stream_stops_at_char_budget(processor):
+    processor.async_ollama_client = StreamingOllama(lambda caption: ['yarr '] * 200)
+    budget = processor._stream_char_budget(1.0)
+    text = asyncio.run(processor.stream_caption_text('Hello there, friend.', 'pirate', duration=1.0))
+    assert len(text) <= budget + len('...')
+    assert text.endswith('...')
+    stream = processor.async_ollama_client.streams[0]
+    assert stream.consumed < 200
+    assert stream.closed
+
+def test_stream_falls_back_on_error(processor):
+    class BrokenOllama:
+        async def generate(self, **kwargs):
+            raise ConnectionError('ollama is down')
+
+    processor.async_ollama_client = BrokenOllama()
+    text = asyncio.run(processor.stream_caption_text('Hello there, friend.', 'pirate'))
+    # The quick transform decorates the caption with a random pirate phrase
+    assert 'Hello there, friend.' in text and text != 'Hello there, friend.'
+
+def test_stream_passes_original_mode_through(processor):
+    processor.async_ollama_client = StreamingOllama(lambda caption: ['unused'])
+    assert asyncio.run(processor.stream_caption_text('Hello there.', 'original')) == 'Hello there.'
+    assert processor.async_ollama_client.streams == []
+
+def write_srt(path, cues):
+    blocks = []
+    for i, (start, text) in enumerate(cues):
+        stamp = lambda seconds: f"00:{int(seconds) // 60:02d}:{int(seconds) % 60:02d},{int(seconds % 1 * 1000):03d}"
+        blocks.append(f"{i + 1}\n{stamp(start)} --> {stamp(start + 2)}\n{text}\n")
+    path.write_text('\n'.join(blocks))
+    return str(path)
+
+def collect(processor, *args, **kwargs):
+    async def run():
+        return [event async for event in processor.transform_subtitles_stream(*args, **kwargs)]
+    return asyncio.run(run())
+
+def final_events(events):
+    return [event for event in events if not event.get('degraded')]
+
+def test_missed_deadline_degrades_then_upgrades(processor, tmp_path):
+    path = write_srt(tmp_path / 'episode.srt', [(0.0, 'Where are you going tonight?'),
+                                                 (30.0, 'I am going home now.'),
+                                                 (60.0, 'Then I will come along.')])
+    processor.async_ollama_client = StreamingOllama(lambda caption: ['Arr ', caption], latency=0.05)
+    processor.llm_latency_estimate = 0.05
+    events = collect(processor, path, 'pirate', playhead=0.0)
+
+    # The first cue is due immediately, so the quick transform is shown before the LLM answers
+    assert events[0]['index'] == 1 and events[0]['degraded']
+    assert not events[0]['text'].startswith('Arr ')
+    upgrades = [event for event in events if event.get('upgraded')]
+    assert [(event['index'], event['text']) for event in upgrades] == [(1, 'Arr Where are you going tonight?')]
+    assert events.index(upgrades[0]) > 0
+
+    # Cues with enough slack wait for the LLM and arrive in order
+    in_order = [event['index'] for event in events if not event.get('degraded') and not event.get('upgraded')]
+    assert in_order == [2, 3]
+    assert sorted(event['index'] for event in final_events(events)) == [1, 2, 3]
+
+    # The cache keeps the LLM result, not the fallback
+    cached = collect(processor, path, 'pirate', playhead=0.0)
+    assert [(event['index'], event['text']) for event in cached] == [
+        (1, 'Arr Where are you going tonight?'), (2, 'Arr I am going home now.'), (3, 'Arr Then I will come along.')]
+
+def test_stream_without_playhead_keeps_every_cue_in_order(processor, tmp_path):
+    lines = [f"Line number {i} is spoken here." for i in range(12)]
+    path = write_srt(tmp_path / 'episode.srt', [(i * 3.0, line) for i, line in enumerate(lines)])
+    # Answers of different lengths finish out of order under concurrency
+    processor.async_ollama_client = StreamingOllama(
+        lambda caption: ['x '] * (12 - int(caption.split()[2])) + [caption], latency=0.005)
+    events = collect(processor, path, 'pirate', max_concurrent=4)
+    assert [event['index'] for event in events] == list(range(1, 13))
+    assert not any(event.get('degraded') or event.get('upgraded') for event in events)
+    assert all(event['text'].endswith(line) for event, line in zip(events, lines))
+
+def test_ndjson_stream_reports_each_cue_once(processor, tmp_path):
+    from fastapi import FastAPI
+    from fastapi.testclient import TestClient
+    import api.captions as captions_api
+
+    path = write_srt(tmp_path / 'episode.srt', [(0.0, 'Where are you going tonight?'),
+                                                 (0.5, 'Somewhere far from here.'),
+                                                 (40.0, 'I am going home now.'),
+                                                 (80.0, 'Then I will come along.')])
+    processor.async_ollama_client = StreamingOllama(lambda caption: ['Arr ', caption], latency=0.05)
+    processor.llm_latency_estimate = 0.05
+    app = FastAPI()
+    app.include_router(captions_api.router, prefix='/api/captions')
+    captions_api.set_subtitle_processor(processor)
+
+    response = TestClient(app).post('/api/captions/transform/stream',
+                                    json={'subtitle_path': path, 'mode': 'pirate', 'playhead': 0.0})
+    events = [json.loads(line) for line in response.text.splitlines()]
+    assert not any('error' in event for event in events)
+
+    degraded = [event['index'] for event in events if event.get('degraded')]
+    assert degraded == [1, 2]
+    # Every degraded cue is upgraded exactly once, after it was shown
+    for index in degraded:
+        shown = next(i for i, event in enumerate(events) if event['index'] == index)
+        upgrades = [i for i, event in enumerate(events) if event['index'] == index and event.get('upgraded')]
+        assert len(upgrades) == 1 and upgrades[0] > shown
+    # First appearances follow cue order, and each cue gets exactly one final version
+    first_seen = list(dict.fromkeys(event['index'] for event in events))
+    assert first_seen == [1, 2, 3, 4]
+    assert sorted(event['index'] for event in final_events(events)) == [1, 2, 3, 4]
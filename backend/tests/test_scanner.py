@@ -0,0 +1,34 @@
+import asyncio
+
+import pytest
+
+from media_scanner.scanner import MediaScanner
+
+@pytest.fixture
+def scanner(tmp_path, monkeypatch):
+    monkeypatch.setenv('MEDIA_LIBRARY_FILE', str(tmp_path / 'media_library.json'))
+    scanner = MediaScanner([str(tmp_path)])
+
+    async def no_metadata(title, content_type):
+        return {}
+
+    scanner.fetch_tmdb_metadata = no_metadata
+    return scanner
+
+def test_edited_subtitles_notify_without_readding(scanner, tmp_path):
+    video = tmp_path / 'Movie (2020).mkv'
+    video.write_bytes(b'video')
+    subtitle = tmp_path / 'Movie (2020).en.srt'
+    subtitle.write_text("1\n00:00:01,000 --> 00:00:02,000\nHello there.\n", encoding='utf-8')
+    added, changed = [], []
+    scanner.add_listener(on_added=added.append, on_subtitles_changed=changed.append)
+
+    asyncio.run(scanner.process_new_file(str(video)))
+    asyncio.run(scanner.process_new_file(str(video)))
+    assert len(added) == 1 and changed == []
+
+    subtitle.write_text("1\n00:00:01,000 --> 00:00:02,000\nHello there, friend.\n", encoding='utf-8')
+    asyncio.run(scanner.process_new_file(str(video)))
+    assert len(added) == 1
+    assert [entry['filepath'] for entry in changed] == [str(video)]
+    assert changed[0]['subtitle_stats'][str(subtitle)]['count'] == 1
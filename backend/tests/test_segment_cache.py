@@ -0,0 +1,42 @@
+import os
+
+from streaming.segment_cache import SegmentCache
+
+def write_part(cache, key, size):
+    cache.part_path(key).write_bytes(b'x' * size)
+
+def test_commit_promotes_the_part_file(tmp_path):
+    cache = SegmentCache(tmp_path, max_bytes=1000)
+    write_part(cache, 'a', 10)
+    assert cache.get('a') is None
+    cache.commit('a')
+    assert cache.get('a') == tmp_path / 'a.mp4'
+    assert not cache.part_path('a').exists()
+
+def test_discard_drops_the_part_file(tmp_path):
+    cache = SegmentCache(tmp_path, max_bytes=1000)
+    write_part(cache, 'a', 10)
+    cache.discard('a')
+    cache.discard('a')
+    assert list(tmp_path.iterdir()) == []
+
+def test_least_recently_used_segments_are_evicted(tmp_path):
+    cache = SegmentCache(tmp_path, max_bytes=300, suffix='.ts')
+    for age, key in enumerate(['old', 'used', 'new']):
+        write_part(cache, key, 100)
+        cache.commit(key)
+        os.utime(cache.path_for(key), (1000 + age, 1000 + age))
+    # Reading a segment makes it the most recently used
+    cache.get('old')
+    write_part(cache, 'newest', 100)
+    cache.commit('newest')
+    assert sorted(path.name for path in tmp_path.glob('*.ts')) == ['new.ts', 'newest.ts', 'old.ts']
+
+def test_part_files_do_not_count_towards_the_budget(tmp_path):
+    cache = SegmentCache(tmp_path, max_bytes=100)
+    write_part(cache, 'done', 100)
+    cache.commit('done')
+    write_part(cache, 'writing', 500)
+    cache.evict()
+    assert cache.contains('done')
+    assert cache.get_stats() == {'segments': 1, 'bytes': 100, 'max_bytes': 100}
@@ -0,0 +1,77 @@
+import numpy as np
+import pytest
+
+from search.semantic import SemanticIndex, VectorShard, build_windows, normalise
+
+def cue(start, text):
+    return {'start_time': start, 'end_time': start + 2, 'text': text}
+
+def unit(*values):
+    return normalise(np.array(values, dtype=np.float32))
+
+def test_windows_overlap_by_the_stride():
+    cues = [cue(time, f'line {time}') for time in range(0, 60, 5)]
+    windows = build_windows(cues, window_seconds=20, stride_seconds=10)
+    assert [window['start'] for window in windows] == [0, 10, 20, 30, 40, 50]
+    assert windows[0] == {'start': 0, 'end': 17, 'text': 'line 0 line 5 line 10 line 15'}
+    assert windows[-1]['text'] == 'line 50 line 55'
+
+def test_windows_skip_empty_text():
+    assert build_windows([cue(0, ''), cue(30, 'hello')], 20, 10) == [{'start': 30, 'end': 32, 'text': 'hello'}]
+
+def test_search_ranks_by_cosine_similarity(tmp_path):
+    shard = VectorShard(tmp_path / 'shard', 'model-a')
+    shard.add('/m/a.mkv', 'sig-a', [{'start': 0, 'end': 5, 'text': 'storm'}, {'start': 5, 'end': 9, 'text': 'keys'}],
+              unit([1, 0, 0], [0, 1, 0]))
+    shard.add('/m/b.mkv', 'sig-b', [{'start': 10, 'end': 12, 'text': 'rain'}], unit([0.9, 0.1, 0]))
+    results = shard.search(unit(1, 0, 0), k=2)
+    assert [(item, start, text) for _, item, start, _, text in results] == [('/m/a.mkv', 0.0, 'storm'),
+                                                                             ('/m/b.mkv', 10.0, 'rain')]
+    assert results[0][0] == pytest.approx(1.0, abs=1e-3)
+
+def test_removed_and_replaced_items_are_not_returned(tmp_path):
+    shard = VectorShard(tmp_path / 'shard', 'model-a')
+    shard.add('/m/a.mkv', 'sig-1', [{'start': 0, 'end': 5, 'text': 'old'}], unit([1, 0]))
+    shard.add('/m/a.mkv', 'sig-2', [{'start': 0, 'end': 5, 'text': 'new'}], unit([0, 1]))
+    assert [result[4] for result in shard.search(unit(1, 0), k=5)] == ['new']
+    shard.remove('/m/a.mkv')
+    assert shard.search(unit(1, 0), k=5) == []
+    assert shard.get_stats()['items'] == 0
+
+def test_shard_reloads_from_disk_and_resets_on_model_change(tmp_path):
+    shard = VectorShard(tmp_path / 'shard', 'model-a')
+    shard.add('/m/a.mkv', 'sig-a', [{'start': 3, 'end': 5, 'text': 'storm'}], unit([1, 0]))
+    reloaded = VectorShard(tmp_path / 'shard', 'model-a')
+    assert reloaded.signatures == {'/m/a.mkv': 'sig-a'}
+    assert reloaded.search(unit(1, 0), k=1)[0][1:] == ('/m/a.mkv', 3.0, 5.0, 'storm')
+    assert VectorShard(tmp_path / 'shard', 'model-b').count == 0
+
+def test_compaction_keeps_live_rows(tmp_path):
+    shard = VectorShard(tmp_path / 'shard', 'model-a')
+    rng = np.random.default_rng(0)
+    for n in range(4):
+        windows = [{'start': i, 'end': i + 1, 'text': f'{n}-{i}'} for i in range(400)]
+        shard.add(f'/m/{n}.mkv', 'sig', windows, normalise(rng.standard_normal((400, 8)).astype(np.float32)))
+    target = normalise(rng.standard_normal(8).astype(np.float32))
+    shard.add('/m/target.mkv', 'sig', [{'start': 7, 'end': 8, 'text': 'target'}], target[None, :])
+    for n in range(3):
+        shard.remove(f'/m/{n}.mkv')
+    assert shard.count == 401
+    assert set(shard.signatures) == {'/m/3.mkv', '/m/target.mkv'}
+    assert shard.search(target, k=1)[0][1:] == ('/m/target.mkv', 7.0, 8.0, 'target')
+
+def test_root_filter_uses_resolved_shard_keys(tmp_path):
+    movies, shows = tmp_path / 'movies', tmp_path / 'shows'
+    index = SemanticIndex([str(movies), str(shows)], index_dir=str(tmp_path / 'index'), model='model-a')
+    assert index.shard_key(f"{movies}/") == str(movies.resolve())
+    assert index.shard_key(str(shows / '..' / 'shows')) == str(shows.resolve())
+    assert index.shard_key(str(tmp_path / 'elsewhere')) is None
+
+    index.shard(index.root_for(str(movies / 'a.mkv'))).add(
+        str(movies / 'a.mkv'), 'sig-a', [{'start': 0, 'end': 5, 'text': 'storm'}], unit([1, 0]))
+    index.shard(index.root_for(str(shows / 'b.mkv'))).add(
+        str(shows / 'b.mkv'), 'sig-b', [{'start': 0, 'end': 5, 'text': 'rain'}], unit([0.9, 0.1]))
+    assert [hit['text'] for hit in index._search(unit(1, 0), 5, None)] == ['storm', 'rain']
+    assert [hit['text'] for hit in index._search(unit(1, 0), 5, index.shard_key(str(shows)))] == ['rain']
+    # A known root without a shard yet has no results instead of searching everything
+    assert index._search(unit(1, 0), 5, 'other') == []
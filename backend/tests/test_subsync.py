@@ -0,0 +1,121 @@
+import numpy as np
+import pytest
+
+from media_analysis import subsync
+from media_analysis.subsync import (ENVELOPE_RATE, SAMPLE_RATE, SubtitleSync, analyze_sync, cue_signal,
+                                    global_offset, local_offset, speech_envelope)
+
+rng = np.random.default_rng(3)
+
+@pytest.fixture(autouse=True)
+def seeded():
+    # Same synthetic film whichever tests are selected
+    global rng
+    rng = np.random.default_rng(3)
+
+def random_cues(count=120, duration=600.0):
+    starts = np.sort(rng.uniform(5, duration - 10, count))
+    cues, last_end = [], 0.0
+    for start in starts:
+        start = max(start, last_end + 0.3)
+        end = start + rng.uniform(1.0, 3.5)
+        cues.append({'start_time': float(start), 'end_time': float(end), 'text': 'Line.'})
+        last_end = end
+    return cues
+
+def speech_audio(cues, duration, delay=0.0, stretch=1.0):
+    """Noise bursts where each cue is spoken, after retiming the cues"""
+    samples = rng.standard_normal(int(duration * SAMPLE_RATE)).astype(np.float32) * 0.001
+    for cue in cues:
+        start = int((cue['start_time'] * stretch + delay) * SAMPLE_RATE)
+        end = int((cue['end_time'] * stretch + delay) * SAMPLE_RATE)
+        samples[start:end] += rng.standard_normal(len(samples[start:end])).astype(np.float32) * 0.3
+    return samples
+
+def write_srt(path, cues):
+    def stamp(seconds):
+        millis = int(round(seconds * 1000))
+        return f"{millis // 3600000:02d}:{millis // 60000 % 60:02d}:{millis // 1000 % 60:02d},{millis % 1000:03d}"
+    path.write_text(''.join(f"{i + 1}\n{stamp(cue['start_time'])} --> {stamp(cue['end_time'])}\n{cue['text']}\n\n"
+                            for i, cue in enumerate(cues)), encoding='utf-8')
+
+def test_cue_signal_marks_on_screen_frames():
+    signal = cue_signal([{'start_time': 0.5, 'end_time': 1.0}, {'start_time': 0.8, 'end_time': 1.2}], 200)
+    assert signal[:50].sum() == 0
+    assert signal[50:120].all()
+    assert signal[120:].sum() == 0
+
+def test_speech_envelope_follows_loud_frames():
+    cues = [{'start_time': 2.0, 'end_time': 4.0}]
+    envelope = speech_envelope(speech_audio(cues, 6.0))
+    assert len(envelope) == 6 * ENVELOPE_RATE
+    assert envelope[250:350].mean() > 0.8
+    assert envelope[:150].mean() < 0.2
+
+def test_global_offset_recovers_the_delay():
+    cues = random_cues()
+    envelope = speech_envelope(speech_audio(cues, 620, delay=2.5))
+    lag, prominence = global_offset(envelope, cue_signal(cues, len(envelope)), max_lag=60 * ENVELOPE_RATE)
+    assert lag / ENVELOPE_RATE == pytest.approx(2.5, abs=0.05)
+    assert prominence > subsync.MIN_PROMINENCE
+
+def test_local_offset_searches_around_the_global_one():
+    cues = random_cues()
+    envelope = speech_envelope(speech_audio(cues, 620, delay=-1.5))
+    signal = cue_signal(cues, len(envelope))
+    lag, _ = local_offset(envelope, signal, 100 * ENVELOPE_RATE, 160 * ENVELOPE_RATE, center=-ENVELOPE_RATE,
+                          radius=2 * ENVELOPE_RATE)
+    assert lag / ENVELOPE_RATE == pytest.approx(-1.5, abs=0.05)
+    assert local_offset(envelope, np.ones_like(signal), 0, 1000, 0, 100) is None
+
+def test_analyze_sync_reports_offset_and_framerate_stretch(tmp_path, monkeypatch):
+    cues = random_cues()
+    subtitle = tmp_path / 'Movie.srt'
+    write_srt(subtitle, cues)
+
+    audio = speech_audio(cues, 640, delay=3.0, stretch=25 / 23.976)
+    monkeypatch.setattr(subsync, 'decode_speech_band', lambda path: audio)
+    result = analyze_sync('Movie.mkv', str(subtitle), max_offset=60)
+    assert result['status'] == 'synced'
+    assert result['offset'] == pytest.approx(3.0, abs=0.1)
+    assert result['stretch'] == pytest.approx(25 / 23.976, rel=1e-3)
+
+    monkeypatch.setattr(subsync, 'decode_speech_band', lambda path: speech_audio(cues, 620))
+    assert analyze_sync('Movie.mkv', str(subtitle), max_offset=60)['status'] == 'in_sync'
+
+def test_too_few_cues_are_unreliable(tmp_path):
+    subtitle = tmp_path / 'Short.srt'
+    write_srt(subtitle, random_cues(count=5, duration=60))
+    assert analyze_sync('Short.mkv', str(subtitle), max_offset=60)['status'] == 'unreliable'
+
+class Timing:
+    def __init__(self, current=None):
+        self.values = {} if current is None else dict(current)
+
+    def get(self, path):
+        return self.values.get(path)
+
+    def set(self, path, timing):
+        if timing is None:
+            self.values.pop(path, None)
+        else:
+            self.values[path] = timing
+
+def test_automatic_results_never_replace_manual_timing(tmp_path):
+    subtitle = tmp_path / 'Movie.srt'
+    subtitle.write_text('', encoding='utf-8')
+    entry = {'filepath': str(tmp_path / 'Movie.mkv'), 'file_hash': 'h'}
+    manual = {'offset': 1.0, 'stretch': 1.0, 'anchors': [], 'source': 'manual'}
+    timing = Timing({str(subtitle): manual})
+    sync = SubtitleSync(None, lambda path: entry, timing)
+    signature = sync.signature(str(subtitle), entry)
+    result = {'status': 'synced', 'offset': 2.0, 'stretch': 1.0, 'anchors': []}
+
+    sync._store(entry['filepath'], str(subtitle), signature, result)
+    assert timing.get(str(subtitle)) is manual
+    assert entry['subtitle_sync'][str(subtitle)]['signature'] == signature
+
+    timing.set(str(subtitle), None)
+    sync._store(entry['filepath'], str(subtitle), signature, result)
+    assert timing.get(str(subtitle))['source'] == 'auto'
+    assert timing.get(str(subtitle))['offset'] == 2.0
@@ -0,0 +1,77 @@
+import pytest
+
+from subtitle_engine import stats
+from subtitle_engine.stats import decode_subtitle, filename_language, language_rank, order_subtitles, subtitle_stats
+
+ENGLISH = ["I told you we should have left before the storm.", "Nobody listens to me in this house.",
+           "Where did you put the keys to the truck?", "We have to find them before it gets dark."]
+SPANISH = ["Te dije que deberíamos habernos ido antes de la tormenta.", "Nadie me escucha en esta casa.",
+           "¿Dónde pusiste las llaves de la camioneta?", "Tenemos que encontrarlos antes de que oscurezca."]
+
+def srt(lines, count=40):
+    blocks = []
+    for index in range(count):
+        start, end = index * 3, index * 3 + 2
+        blocks.append(f"{index + 1}\n00:{start // 60:02d}:{start % 60:02d},000 --> "
+                      f"00:{end // 60:02d}:{end % 60:02d},500\n{lines[index % len(lines)]}\n")
+    return '\n'.join(blocks)
+
+@pytest.fixture
+def preferred(monkeypatch):
+    monkeypatch.setattr(stats, 'PREFERRED_LANGUAGES', ['en', 'fr'])
+
+def test_srt_count_duration_and_content_language(tmp_path):
+    path = tmp_path / 'Movie.srt'
+    path.write_text(srt(ENGLISH), encoding='utf-8')
+    result = subtitle_stats(str(path))
+    assert result['count'] == 40
+    assert result['duration'] == 119.5
+    assert result['format'] == '.srt'
+    assert result['encoding'] == 'utf-8'
+    assert (result['language'], result['language_source']) == ('en', 'content')
+    assert result['signature']['size'] == path.stat().st_size
+
+def test_content_beats_a_wrong_file_name_tag(tmp_path):
+    path = tmp_path / 'Movie.en.srt'
+    path.write_text(srt(SPANISH), encoding='utf-8')
+    assert subtitle_stats(str(path))['language'] == 'es'
+
+def test_file_name_tag_decides_when_text_is_too_short(tmp_path):
+    path = tmp_path / 'Movie.French.forced.srt'
+    path.write_text(srt(['Oui.'], count=3), encoding='utf-8')
+    result = subtitle_stats(str(path))
+    assert (result['language'], result['language_source']) == ('fr', 'filename')
+
+def test_vtt_and_ass_timings(tmp_path):
+    vtt = tmp_path / 'Movie.vtt'
+    vtt.write_text("WEBVTT\n\n00:01.000 --> 00:02.500\nHi.\n\n01:02.000 --> 01:04.250\nBye.\n", encoding='utf-8')
+    assert (subtitle_stats(str(vtt))['count'], subtitle_stats(str(vtt))['duration']) == (2, 64.25)
+
+    ass = tmp_path / 'Movie.ass'
+    ass.write_text("[Events]\nFormat: Layer, Start, End, Style, Name, MarginL, MarginR, MarginV, Effect, Text\n"
+                   "Dialogue: 0,0:00:01.00,0:00:02.00,Default,,0,0,0,,Hi.\n"
+                   "Dialogue: 0,0:01:30.50,0:01:32.00,Default,,0,0,0,,Bye.\n", encoding='utf-8')
+    result = subtitle_stats(str(ass))
+    assert (result['count'], result['duration']) == (2, 92.0)
+
+def test_decoding_falls_back_through_bom_utf8_and_cp1252():
+    assert decode_subtitle('Olá'.encode('utf-8-sig')) == ('Olá', 'utf-8-sig')
+    assert decode_subtitle('Olá'.encode('utf-16')) == ('Olá', 'utf-16')
+    assert decode_subtitle('Olá'.encode('utf-8')) == ('Olá', 'utf-8')
+    assert decode_subtitle('Olá'.encode('cp1252')) == ('Olá', 'cp1252')
+
+def test_filename_language():
+    assert filename_language('/tv/Show.S01E01.eng.srt') == 'en'
+    assert filename_language('/tv/Show.S01E01.srt') is None
+    # The video stem itself is never read as a tag
+    assert filename_language('/movies/German.srt') is None
+
+def test_preferred_languages_sort_first(preferred):
+    assert [language_rank(code) for code in ('en', 'fr', None, 'de')] == [0, 1, 2, 3]
+    subtitles = ['/m/Movie.de.srt', '/m/Movie.srt', '/m/Movie.fr.srt', '/m/Movie.en.srt', '/m/Movie.fr.srt']
+    assert order_subtitles(subtitles) == ['/m/Movie.en.srt', '/m/Movie.fr.srt', '/m/Movie.srt', '/m/Movie.de.srt']
+
+def test_detected_language_overrides_the_tag_when_ordering(preferred):
+    subtitles = ['/m/Movie.de.srt', '/m/Movie.srt']
+    ordered = order_subtitles(subtitles, {'/m/Movie.srt': {'language': 'en'}})
+    assert ordered == ['/m/Movie.srt', '/m/Movie.de.srt']
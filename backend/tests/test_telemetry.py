@@ -0,0 +1,58 @@
+import pytest
+
+from subtitle_engine import telemetry
+from subtitle_engine.telemetry import LLMTelemetry
+
+class Clock:
+    def __init__(self):
+        self.now = 100.0
+
+    def __call__(self):
+        return self.now
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = Clock()
+    monkeypatch.setattr(telemetry.time, 'monotonic', clock)
+    return clock
+
+def test_calls_are_aggregated_per_model_and_mode():
+    stats = LLMTelemetry()
+    stats.record_call('llama3', 'simple', {'eval_count': 40, 'eval_duration': 2e9, 'load_duration': 1e9}, 2.5, cues=2)
+    stats.record_call('llama3', 'simple', None, 1.5, error=True)
+    stats.record_call('llama3', 'simple', {}, 1.0, streamed_tokens=10)
+    summary, = stats.get_stats()['models']
+    assert (summary['calls'], summary['cues'], summary['errors'], summary['eval_count']) == (3, 4, 1, 50)
+    assert summary['avg_latency_seconds'] == 1.667
+    assert summary['tokens_per_second'] == 25.0
+    assert summary['error_rate'] == 0.333
+
+def test_eta_follows_measured_cue_throughput(clock):
+    stats = LLMTelemetry()
+    job = stats.start_job('job', '/m/a.srt', 'simple', 'llama3', total_cues=100)
+    assert job.eta_seconds() is None
+    clock.now += 10
+    job.advance(20)
+    assert job.eta_seconds() == pytest.approx(80 * 0.5)
+    assert job.to_dict()['progress'] == 0.2
+
+def test_new_jobs_are_seeded_from_wall_time_of_finished_jobs(clock):
+    stats = LLMTelemetry()
+    job = stats.start_job('first', '/m/a.srt', 'simple', 'llama3', total_cues=100)
+    # Eight concurrent calls of 4 s each finish 8 cues every 4 s of wall time
+    for _ in range(10):
+        clock.now += 4
+        for _ in range(8):
+            job.advance(1)
+    stats.finish_job('first')
+    assert stats.seconds_per_cue('llama3', 'simple') == pytest.approx(0.5)
+    assert stats.start_job('second', '/m/b.srt', 'simple', 'llama3', 100).eta_seconds() == pytest.approx(50)
+    assert stats.seconds_per_cue('llama3', 'other') is None
+
+def test_jobs_without_progress_leave_no_history(clock):
+    stats = LLMTelemetry()
+    stats.start_job('job', '/m/a.srt', 'simple', 'llama3', total_cues=10)
+    clock.now += 30
+    stats.finish_job('job')
+    assert stats.seconds_per_cue('llama3', 'simple') is None
+    assert stats.get_stats()['jobs'] == []
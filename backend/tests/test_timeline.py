@@ -0,0 +1,60 @@
+import random
+
+from subtitle_engine.timeline import CueTimeline
+
+def cue(index, start, end):
+    return {'index': index, 'start_time': start, 'end_time': end, 'text': f'cue {index}'}
+
+CUES = [cue(1, 0.0, 2.0), cue(2, 2.5, 4.0), cue(3, 3.0, 10.0), cue(4, 5.0, 6.0), cue(5, 12.0, 13.0)]
+
+def indexes(cues):
+    return [sub['index'] for sub in cues]
+
+def test_cues_on_screen_at_a_moment():
+    timeline = CueTimeline(CUES)
+    assert indexes(timeline.overlapping(1.0)) == [1]
+    assert indexes(timeline.overlapping(2.2)) == []
+    assert indexes(timeline.overlapping(3.5)) == [2, 3]
+    # A long cue stays visible while shorter ones come and go
+    assert indexes(timeline.overlapping(5.5)) == [3, 4]
+    assert indexes(timeline.overlapping(11.0)) == []
+
+def test_end_times_are_exclusive():
+    timeline = CueTimeline(CUES)
+    assert indexes(timeline.overlapping(2.0)) == []
+    assert indexes(timeline.overlapping(2.5)) == [2]
+
+def test_cues_within_a_range():
+    timeline = CueTimeline(CUES)
+    assert indexes(timeline.overlapping(1.5, 5.0)) == [1, 2, 3]
+    assert indexes(timeline.overlapping(9.0, 20.0)) == [3, 5]
+
+def test_upcoming_cues():
+    timeline = CueTimeline(CUES)
+    assert indexes(timeline.upcoming(2.5, 2)) == [3, 4]
+    assert timeline.upcoming(12.0, 3) == []
+
+def test_unsorted_input_is_ordered_by_start():
+    timeline = CueTimeline(list(reversed(CUES)))
+    assert indexes(timeline.subtitles) == [1, 2, 3, 4, 5]
+    assert indexes(timeline.overlapping(3.5)) == [2, 3]
+
+def test_empty_timeline():
+    timeline = CueTimeline([])
+    assert len(timeline) == 0
+    assert timeline.overlapping(1.0) == []
+    assert timeline.upcoming(0.0, 5) == []
+
+def test_matches_a_linear_scan():
+    rng = random.Random(7)
+    cues = []
+    for index in range(300):
+        start = rng.uniform(0, 600)
+        cues.append(cue(index, start, start + rng.uniform(0.5, 20)))
+    timeline = CueTimeline(cues)
+    for _ in range(200):
+        start = rng.uniform(0, 620)
+        end = start + rng.choice([0, rng.uniform(0, 30)])
+        expected = sorted(sub['index'] for sub in cues
+                          if sub['end_time'] > start and (sub['start_time'] < end if end > start else sub['start_time'] <= start))
+        assert sorted(indexes(timeline.overlapping(start, end))) == expected
@@ -0,0 +1,51 @@
+import numpy as np
+import pytest
+
+from subtitle_engine.timing import TimingStore, apply_timing, is_identity, normalise_timing, retime
+
+CUES = [{'index': 1, 'start_time': 1.0, 'end_time': 2.0, 'text': 'a'},
+        {'index': 2, 'start_time': 10.0, 'end_time': 12.0, 'text': 'b'}]
+
+def test_normalise_sorts_anchors_and_validates():
+    timing = normalise_timing(offset=1, anchors=[[60, 0.5], [0, 0]])
+    assert timing == {'offset': 1.0, 'stretch': 1.0, 'anchors': [[0.0, 0.0], [60.0, 0.5]], 'source': 'manual'}
+    with pytest.raises(ValueError):
+        normalise_timing(stretch=0)
+    with pytest.raises(ValueError):
+        normalise_timing(anchors=[[5, 1], [5, 2]])
+
+def test_identity_timings():
+    assert is_identity(None)
+    assert is_identity(normalise_timing(anchors=[[0, 0], [10, 0]]))
+    assert not is_identity(normalise_timing(offset=0.5))
+    assert not is_identity(normalise_timing(stretch=1.001))
+
+def test_offset_and_stretch():
+    times = np.array([0.0, 10.0, 100.0])
+    assert retime(times, normalise_timing(offset=2.5)).tolist() == [2.5, 12.5, 102.5]
+    assert retime(times, normalise_timing(stretch=25 / 23.976)).round(3).tolist() == [0.0, 10.427, 104.271]
+
+def test_drift_anchors_interpolate_and_hold_outer_values():
+    timing = normalise_timing(anchors=[[10, 0], [20, 2]])
+    assert retime(np.array([0.0, 15.0, 20.0, 50.0]), timing).tolist() == [0.0, 16.0, 22.0, 52.0]
+
+def test_times_never_go_negative():
+    assert retime(np.array([0.5, 3.0]), normalise_timing(offset=-1)).tolist() == [0.0, 2.0]
+
+def test_apply_timing_copies_cues():
+    shifted = apply_timing(CUES, normalise_timing(offset=-1.5))
+    assert [(sub['start_time'], sub['end_time']) for sub in shifted] == [(0.0, 0.5), (8.5, 10.5)]
+    assert shifted[1]['text'] == 'b'
+    assert CUES[0]['start_time'] == 1.0
+
+def test_apply_identity_returns_the_input():
+    assert apply_timing(CUES, None) is CUES
+    assert apply_timing(CUES, normalise_timing()) is CUES
+
+def test_store_persists_and_clears(tmp_path):
+    path = tmp_path / 'timing.json'
+    store = TimingStore(path)
+    store.set('/media/a.srt', normalise_timing(offset=1))
+    assert TimingStore(path).get('/media/a.srt')['offset'] == 1.0
+    store.set('/media/a.srt', normalise_timing())
+    assert TimingStore(path).get('/media/a.srt') is None
@@ -0,0 +1,91 @@
+import json
+import subprocess
+
+import pytest
+from PIL import Image
+
+from media_analysis import trickplay
+from media_analysis.trickplay import MANIFEST_NAME, TrickplayGenerator, _vtt_time, build_trickplay
+
+@pytest.fixture
+def fake_ffmpeg(monkeypatch):
+    """Replace the ffmpeg call with one that writes `frames[0]` solid-colour 32x18 frames"""
+    frames = [0]
+
+    def run(cmd, **kwargs):
+        pattern = cmd[-1]
+        for n in range(frames[0]):
+            Image.new('RGB', (32, 18), (n * 10 % 256, 0, 0)).save(pattern % (n + 1))
+        return subprocess.CompletedProcess(cmd, 0, '', '')
+
+    monkeypatch.setattr(trickplay.subprocess, 'run', run)
+    return frames
+
+class Pool:
+    """Runs jobs inline so on_done fires like it would on the event loop"""
+
+    def __init__(self):
+        self.jobs = []
+
+    def submit(self, key, kind, func, *args, on_done=None, on_error=None):
+        self.jobs.append(key)
+        result = func(*args)
+        if on_done:
+            on_done(result)
+        return True
+
+def vtt_cues(path):
+    return path.read_text(encoding='utf-8').split('\n\n')[1:]
+
+def test_vtt_time():
+    assert _vtt_time(0) == '00:00:00.000'
+    assert _vtt_time(3725.5) == '01:02:05.500'
+
+def test_frames_tile_into_sheets_with_matching_cues(tmp_path, fake_ffmpeg):
+    fake_ffmpeg[0] = 23
+    manifest = build_trickplay('/m/movie.mkv', str(tmp_path / 'out'), interval=10, width=32, columns=4, rows=3)
+    assert manifest['thumbnails'] == 23 and manifest['sprites'] == 2
+    assert (manifest['tile_width'], manifest['tile_height']) == (32, 18)
+
+    with Image.open(tmp_path / 'out' / 'sprite_0.jpg') as sheet:
+        assert sheet.size == (4 * 32, 3 * 18)
+    # The last sheet holds 11 frames: still four columns, three rows
+    with Image.open(tmp_path / 'out' / 'sprite_1.jpg') as sheet:
+        assert sheet.size == (4 * 32, 3 * 18)
+
+    cues = vtt_cues(tmp_path / 'out' / 'thumbnails.vtt')
+    assert len(cues) == 23
+    assert cues[0] == '00:00:00.000 --> 00:00:10.000\nsprite_0.jpg#xywh=0,0,32,18'
+    assert cues[5] == '00:00:50.000 --> 00:01:00.000\nsprite_0.jpg#xywh=32,18,32,18'
+    assert cues[12] == '00:02:00.000 --> 00:02:10.000\nsprite_1.jpg#xywh=0,0,32,18'
+    assert cues[22].rstrip() == '00:03:40.000 --> 00:03:50.000\nsprite_1.jpg#xywh=64,36,32,18'
+
+def test_short_video_gets_a_narrow_sheet(tmp_path, fake_ffmpeg):
+    fake_ffmpeg[0] = 3
+    build_trickplay('/m/clip.mkv', str(tmp_path / 'out'), interval=5, width=32, columns=4, rows=3)
+    with Image.open(tmp_path / 'out' / 'sprite_0.jpg') as sheet:
+        assert sheet.size == (3 * 32, 18)
+
+def test_no_frames_is_an_error(tmp_path, fake_ffmpeg):
+    with pytest.raises(RuntimeError):
+        build_trickplay('/m/empty.mkv', str(tmp_path / 'out'), interval=10, width=32, columns=4, rows=3)
+
+def test_only_changed_files_are_rebuilt(tmp_path, fake_ffmpeg):
+    fake_ffmpeg[0] = 2
+    pool = Pool()
+    generator = TrickplayGenerator(pool, output_dir=str(tmp_path / 'trickplay'), interval=10, width=32)
+    assert generator.enqueue('/m/movie.mkv', 'hash-1')
+    assert generator.get_manifest('hash-1')['thumbnails'] == 2
+    assert not generator.enqueue('/m/movie.mkv', 'hash-1')
+    assert pool.jobs == ['trickplay:hash-1']
+
+def test_new_sprites_replace_the_previous_version(tmp_path, fake_ffmpeg):
+    fake_ffmpeg[0] = 2
+    generator = TrickplayGenerator(Pool(), output_dir=str(tmp_path / 'trickplay'), interval=10, width=32)
+    generator.on_media_added({'filepath': '/m/movie.mkv', 'file_hash': 'hash-1'})
+    generator.on_media_added({'filepath': '/m/other.mkv', 'file_hash': 'hash-other'})
+    generator.on_media_added({'filepath': '/m/movie.mkv', 'file_hash': 'hash-2'})
+
+    remaining = sorted(path.parent.name for path in (tmp_path / 'trickplay').glob(f"*/{MANIFEST_NAME}"))
+    assert remaining == ['hash-2', 'hash-other']
+    assert json.loads((tmp_path / 'trickplay' / 'hash-2' / MANIFEST_NAME).read_text())['video_path'] == '/m/movie.mkv'